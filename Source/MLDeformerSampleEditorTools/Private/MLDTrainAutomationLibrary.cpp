@@ -3,12 +3,16 @@
 #include "Animation/AnimSequence.h"
 #include "Animation/AnimTypes.h"
 #include "Animation/MeshDeformer.h"
+#include "Animation/SkeletalMeshActor.h"
 #include "BoneContainer.h"
+#include "Components/SkeletalMeshComponent.h"
+#include "Editor.h"
 #include "Engine/SkeletalMesh.h"
 #include "GeometryCache.h"
 #include "GeometryCacheTrack.h"
 #include "HAL/PlatformTime.h"
 #include "MLDeformerAsset.h"
+#include "MLDeformerComponent.h"
 #include "MLDeformerEditorModel.h"
 #include "MLDeformerEditorToolkit.h"
 #include "MLDeformerGeomCacheModel.h"
@@ -1492,4 +1496,99 @@ FMldDumpResult UMLDTrainAutomationLibrary::DumpDeformerSetup(const FMldDumpReque
 	return Result;
 }
 
+FMldBenchmarkResult UMLDTrainAutomationLibrary::BenchmarkDeformerInference(const FMldBenchmarkRequest& Request)
+{
+	FMldBenchmarkResult Result;
+
+	UMLDeformerAsset* DeformerAsset = LoadAssetByPath<UMLDeformerAsset>(Request.asset_path);
+	if (!DeformerAsset || !DeformerAsset->GetModel())
+	{
+		Result.message = FString::Printf(TEXT("Failed to load deformer asset with a model: %s"), *Request.asset_path);
+		return Result;
+	}
+
+	UMLDeformerModel* Model = DeformerAsset->GetModel();
+	Result.model_type = ResolveModelType(Model);
+
+	USkeletalMesh* SkeletalMesh = Model->GetSkeletalMesh();
+	if (!SkeletalMesh)
+	{
+		Result.message = TEXT("Deformer model has no skeletal mesh.");
+		return Result;
+	}
+
+	UAnimSequence* AnimSequence = LoadAssetByPath<UAnimSequence>(Request.anim_sequence);
+	if (!AnimSequence)
+	{
+		Result.message = FString::Printf(TEXT("Failed to load anim sequence: %s"), *Request.anim_sequence);
+		return Result;
+	}
+
+	UWorld* World = GEditor ? GEditor->GetEditorWorldContext().World() : nullptr;
+	if (!World)
+	{
+		Result.message = TEXT("No editor world available.");
+		return Result;
+	}
+
+	FActorSpawnParameters SpawnParams;
+	SpawnParams.ObjectFlags = RF_Transient;
+	SpawnParams.SpawnCollisionHandlingOverride = ESpawnActorCollisionHandlingMethod::AlwaysSpawn;
+	ASkeletalMeshActor* Actor = World->SpawnActor<ASkeletalMeshActor>(FVector::ZeroVector, FRotator::ZeroRotator, SpawnParams);
+	if (!Actor)
+	{
+		Result.message = TEXT("Failed to spawn benchmark actor.");
+		return Result;
+	}
+
+	USkeletalMeshComponent* SkelMeshComponent = Actor->GetSkeletalMeshComponent();
+	SkelMeshComponent->SetSkeletalMeshAsset(SkeletalMesh);
+	SkelMeshComponent->bEnableUpdateRateOptimizations = false;
+	SkelMeshComponent->VisibilityBasedAnimTickOption = EVisibilityBasedAnimTickOption::AlwaysTickPoseAndRefreshBones;
+	SkelMeshComponent->SetAnimationMode(EAnimationMode::AnimationSingleNode);
+	SkelMeshComponent->SetAnimation(AnimSequence);
+
+	UMLDeformerComponent* DeformerComponent = NewObject<UMLDeformerComponent>(Actor, NAME_None, RF_Transient);
+	DeformerComponent->RegisterComponent();
+	DeformerComponent->SetupComponent(DeformerAsset, SkelMeshComponent);
+
+	const float DeltaSeconds = FMath::Max(Request.delta_seconds, UE_KINDA_SMALL_NUMBER);
+	const float PlayLength = FMath::Max(AnimSequence->GetPlayLength(), DeltaSeconds);
+	const int32 WarmupFrames = FMath::Max(Request.warmup_frames, 0);
+	const int32 FrameCount = FMath::Max(Request.frame_count, 1);
+	Result.frame_times_ms.Reserve(FrameCount);
+
+	for (int32 Frame = 0; Frame < WarmupFrames + FrameCount; ++Frame)
+	{
+		SkelMeshComponent->SetPosition(FMath::Fmod(Frame * DeltaSeconds, PlayLength), false);
+		SkelMeshComponent->TickAnimation(DeltaSeconds, false);
+		SkelMeshComponent->RefreshBoneTransforms();
+
+		// Only the deformer tick is timed: input gathering from the pose plus network execution.
+		const double StartSec = FPlatformTime::Seconds();
+		DeformerComponent->TickComponent(DeltaSeconds, LEVELTICK_All, nullptr);
+		const double ElapsedMs = (FPlatformTime::Seconds() - StartSec) * 1000.0;
+
+		if (Frame >= WarmupFrames)
+		{
+			Result.frame_times_ms.Add(static_cast<float>(ElapsedMs));
+		}
+	}
+
+	const bool bHadModelInstance = DeformerComponent->GetModelInstance() != nullptr;
+	DeformerComponent->DestroyComponent();
+	Actor->Destroy();
+
+	if (!bHadModelInstance)
+	{
+		Result.frame_times_ms.Reset();
+		Result.message = TEXT("Deformer component has no model instance (network not trained or not loaded).");
+		return Result;
+	}
+
+	Result.success = true;
+	Result.message = FString::Printf(TEXT("Benchmarked %d frames."), FrameCount);
+	return Result;
+}
+
 IMPLEMENT_MODULE(FDefaultModuleImpl, MLDeformerSampleEditorTools)
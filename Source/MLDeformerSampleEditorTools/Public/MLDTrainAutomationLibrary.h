@@ -35,4 +35,10 @@ public:
 	 */
 	UFUNCTION(BlueprintCallable, Category = "MLDeformer|Automation")
 	static FMldDumpResult DumpDeformerSetup(const FMldDumpRequest& Request);
+
+	/**
+	 * Drive a transient skeletal mesh actor with an animation and time each ML Deformer component tick.
+	 */
+	UFUNCTION(BlueprintCallable, Category = "MLDeformer|Automation")
+	static FMldBenchmarkResult BenchmarkDeformerInference(const FMldBenchmarkRequest& Request);
 };
@@ -151,3 +151,48 @@ struct MLDEFORMERSAMPLEEDITORTOOLS_API FMldDumpResult
 	UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "MLDeformer")
 	FString model_overrides_json;
 };
+
+USTRUCT(BlueprintType)
+struct MLDEFORMERSAMPLEEDITORTOOLS_API FMldBenchmarkRequest
+{
+	GENERATED_BODY()
+
+	/** Package path to deformer asset, e.g. /Game/Characters/Emil/Deformers/MLD_NMMl_flesh_upperBody */
+	UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "MLDeformer")
+	FString asset_path;
+
+	/** Animation driving the skeletal mesh while the deformer is ticked. */
+	UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "MLDeformer")
+	FString anim_sequence;
+
+	/** Number of timed frames. */
+	UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "MLDeformer")
+	int32 frame_count = 300;
+
+	/** Untimed frames ticked first so one-time allocations do not skew the distribution. */
+	UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "MLDeformer")
+	int32 warmup_frames = 30;
+
+	/** Simulated frame delta; the animation wraps around its play length. */
+	UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "MLDeformer")
+	float delta_seconds = 1.0f / 30.0f;
+};
+
+USTRUCT(BlueprintType)
+struct MLDEFORMERSAMPLEEDITORTOOLS_API FMldBenchmarkResult
+{
+	GENERATED_BODY()
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "MLDeformer")
+	bool success = false;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "MLDeformer")
+	FString message;
+
+	UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "MLDeformer")
+	FString model_type;
+
+	/** Game-thread time of each timed UMLDeformerComponent tick, in milliseconds. */
+	UPROPERTY(EditAnywhere, BlueprintReadWrite, Category = "MLDeformer")
+	TArray<float> frame_times_ms;
+};
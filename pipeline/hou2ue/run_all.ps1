@@ -15,7 +15,9 @@
 
     [int]$RepeatedErrorThreshold = 6,
 
-    [int]$HoudiniMaxMinutes = 120
+    [int]$HoudiniMaxMinutes = 120,
+
+    [switch]$WarmEditor
 )
 
 $ErrorActionPreference = "Stop"
@@ -288,6 +290,7 @@ function Invoke-PythonScript(
         "ue_capture_mainseq.py" { $StageName }
         "compare_groundtruth.py" { "gt_compare" }
         "build_report.py" { "report" }
+        "ue_train_shards.py" { "train" }
         default { "" }
     }
 
@@ -365,7 +368,20 @@ function Invoke-UnrealPythonScript(
             $reportMtimeBefore = (Get-Item -LiteralPath $reportPath).LastWriteTimeUtc
         }
 
-        $proc = Start-Process -FilePath $ResolvedUEEditorExe -ArgumentList $argList -Wait -PassThru
+        if ($UseStageServer) {
+            # Warm editor: dispatch into the resident stage server (HOU2UE_* env is forwarded by the client).
+            $clientArgs = Convert-ToQuotedArgs -InputArgs @(
+                $ueStageClientScript,
+                "--config", $ResolvedConfigPath,
+                "--profile", $Profile,
+                "--run-dir", $ResolvedRunDir,
+                "--script", $ScriptPath
+            )
+            $proc = Start-Process -FilePath $ResolvedPythonExe -ArgumentList $clientArgs -Wait -PassThru -NoNewWindow
+        }
+        else {
+            $proc = Start-Process -FilePath $ResolvedUEEditorExe -ArgumentList $argList -Wait -PassThru
+        }
         $reportFresh = $false
         if (-not [string]::IsNullOrWhiteSpace($reportPath) -and (Test-Path $reportPath)) {
             $reportMtimeAfter = (Get-Item -LiteralPath $reportPath).LastWriteTimeUtc
@@ -497,12 +513,31 @@ $houdiniExportScript = Join-Path $ScriptsDir "houdini_export_abc.py"
 $ueImportScript = Join-Path $ScriptsDir "ue_import.py"
 $ueSetupScript = Join-Path $ScriptsDir "ue_setup_assets.py"
 $ueTrainScript = Join-Path $ScriptsDir "ue_train.py"
+$ueTrainShardsScript = Join-Path $ScriptsDir "ue_train_shards.py"
 $ueInferScript = Join-Path $ScriptsDir "ue_infer.py"
 $baselineSyncScript = Join-Path $ScriptsDir "sync_reference_baseline.py"
 $dumpReferenceSetupScript = Join-Path $ScriptsDir "dump_reference_setup.py"
 $ueCaptureMainSeqScript = Join-Path $ScriptsDir "ue_capture_mainseq.py"
 $gtCompareScript = Join-Path $ScriptsDir "compare_groundtruth.py"
 $buildReportScript = Join-Path $ScriptsDir "build_report.py"
+$ueStageClientScript = Join-Path $ScriptsDir "ue_stage_client.py"
+
+$UseStageServer = [bool]$WarmEditor
+if ($null -ne $ConfigObj.ue -and $null -ne $ConfigObj.ue.stage_server -and $null -ne $ConfigObj.ue.stage_server.enabled) {
+    $UseStageServer = $UseStageServer -or [bool]$ConfigObj.ue.stage_server.enabled
+}
+
+function Stop-StageServer {
+    if (-not $UseStageServer) {
+        return
+    }
+    try {
+        & $ResolvedPythonExe $ueStageClientScript --config $ResolvedConfigPath --profile $Profile --run-dir $ResolvedRunDir --shutdown
+    }
+    catch {
+        Write-Warning "Failed to stop UE stage server: $($_.Exception.Message)"
+    }
+}
 
 function Assert-Preflight {
     Assert-CommandOrPath $ResolvedHythonExe "Houdini hython"
@@ -527,7 +562,7 @@ function Run-Stage([string]$StageName) {
     switch ($StageName) {
         "baseline_sync" {
             Assert-Python
-            Invoke-PythonScript -Interpreter $ResolvedPythonExe -ScriptPath $baselineSyncScript -StageName "baseline_sync"
+            Invoke-PythonScript -Interpreter $ResolvedPythonExe -ScriptPath $baselineSyncScript -StageName "baseline_sync" -ExtraArgs @("--out-root", $ResolvedOutRoot)
         }
         "preflight" {
             Assert-Preflight
@@ -549,7 +584,7 @@ function Run-Stage([string]$StageName) {
         "ue_setup" {
             Assert-Python
             Assert-UE
-            Invoke-PythonScript -Interpreter $ResolvedPythonExe -ScriptPath $dumpReferenceSetupScript -StageName "reference_setup_dump"
+            Invoke-PythonScript -Interpreter $ResolvedPythonExe -ScriptPath $dumpReferenceSetupScript -StageName "reference_setup_dump" -ExtraArgs @("--out-root", $ResolvedOutRoot)
 
             $skipTrain = $false
             if ($null -ne $ConfigObj.ue -and $null -ne $ConfigObj.ue.training -and $null -ne $ConfigObj.ue.training.skip_train) {
@@ -659,7 +694,30 @@ function Run-Stage([string]$StageName) {
                     "HOU2UE_CUDNN_DETERMINISTIC" = $(if ($cudnnDeterministic) { "1" } else { "0" })
                     "HOU2UE_CUDNN_BENCHMARK" = $(if ($cudnnBenchmark) { "1" } else { "0" })
                 }
-                Invoke-UnrealPythonScript -ScriptPath $ueTrainScript -EnvOverrides $envOverrides
+                $trainParallel = $false
+                if ($null -ne $ConfigObj.ue.training.parallel -and $null -ne $ConfigObj.ue.training.parallel.enabled) {
+                    $trainParallel = [bool]$ConfigObj.ue.training.parallel.enabled
+                }
+
+                if ($trainParallel) {
+                    # Sharded training: ue_train_shards.py launches one editor per shard and merges train_report.json.
+                    $trainEnvBackup = @{}
+                    try {
+                        foreach ($key in $envOverrides.Keys) {
+                            $trainEnvBackup[$key] = [System.Environment]::GetEnvironmentVariable($key, "Process")
+                            [System.Environment]::SetEnvironmentVariable($key, [string]$envOverrides[$key], "Process")
+                        }
+                        Invoke-PythonScript -Interpreter $ResolvedPythonExe -ScriptPath $ueTrainShardsScript -StageName "train" -ExtraArgs @("--out-root", $ResolvedOutRoot)
+                    }
+                    finally {
+                        foreach ($key in $trainEnvBackup.Keys) {
+                            [System.Environment]::SetEnvironmentVariable($key, $trainEnvBackup[$key], "Process")
+                        }
+                    }
+                }
+                else {
+                    Invoke-UnrealPythonScript -ScriptPath $ueTrainScript -EnvOverrides $envOverrides
+                }
             }
         }
         "infer" {
@@ -707,14 +765,24 @@ if ($Stage -eq "full") {
         $ordered = @("baseline_sync", "preflight", "houdini", "convert", "ue_import", "ue_setup", "train", "infer", "gt_reference_capture", "gt_source_capture", "gt_compare", "report")
     }
 
-    foreach ($s in $ordered) {
-        Write-Host "[hou2ue] Running stage: $s"
-        Run-Stage $s
+    try {
+        foreach ($s in $ordered) {
+            Write-Host "[hou2ue] Running stage: $s"
+            Run-Stage $s
+        }
+    }
+    finally {
+        Stop-StageServer
     }
 }
 else {
     Write-Host "[hou2ue] Running stage: $Stage"
-    Run-Stage $Stage
+    try {
+        Run-Stage $Stage
+    }
+    finally {
+        Stop-StageServer
+    }
 }
 
 Write-Host "[hou2ue] Done. RunDir=$ResolvedRunDir"
@@ -6,12 +6,25 @@ from __future__ import annotations
 import argparse
 import hashlib
 import json
+import os
 import shutil
+import time
 import traceback
 from pathlib import Path
-from typing import Any, Dict, List
-
-from common import finalize_report, load_config, make_report, stage_report_path, timestamp_compact, write_json
+from typing import Any, Dict, List, Tuple
+
+from common import (
+    finalize_report,
+    get_nested,
+    make_report,
+    stage_report_path,
+    timestamp_compact,
+    write_json,
+)
+from file_transfer import METHOD_HARDLINK, copy_function, transfer_file
+from perf_history import connect, find_regressions, history_db_path, ingest_run
+from pipeline_config import STRICT_THRESHOLDS, load_pipeline_config
+from report_store import load_report_header, write_report
 
 
 def parse_args() -> argparse.Namespace:
@@ -24,10 +37,11 @@ def parse_args() -> argparse.Namespace:
 
 
 def _load_stage_report(path: Path) -> Dict[str, Any] | None:
+    # Header only: status, errors and profile spans are inline; bulky sections stay in the sidecar.
     if not path.exists():
         return None
     try:
-        return json.loads(path.read_text(encoding="utf-8-sig"))
+        return load_report_header(path)
     except Exception:
         return None
 
@@ -75,20 +89,154 @@ def _copy_latest(run_dir: Path, out_root: Path, profile: str) -> Path:
     if latest_dir.exists():
         shutil.rmtree(latest_dir)
     latest_dir.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copytree(run_dir, latest_dir)
+    shutil.copytree(run_dir, latest_dir, copy_function=copy_function)
     return latest_dir
 
 
-def _strict_thresholds() -> Dict[str, float]:
+def _stage_delta(run_dir: Path, previous: Path | None, staging: Path, link_run_files: bool) -> Dict[str, Any]:
+    """Populate staging from run_dir; files whose size+mtime match the previous latest are hardlinked from it.
+
+    The previous latest is retired by the swap, so its inodes end up owned by the new latest only.
+    Run files are hardlinked only with link_run_files, because stages re-run against latest/<profile>
+    write into it in place and would otherwise rewrite the archived run too.
+    """
+    linked_count = 0
+    copied_count = 0
+    bytes_copied = 0
+    transfer_methods: Dict[str, int] = {}
+
+    for root, dirs, files in os.walk(run_dir):
+        rel_root = Path(root).relative_to(run_dir)
+        (staging / rel_root).mkdir(parents=True, exist_ok=True)
+        dirs.sort()
+        for name in sorted(files):
+            src = Path(root) / name
+            dst = staging / rel_root / name
+            src_stat = src.stat()
+            prev = previous / rel_root / name if previous is not None else None
+            if prev is not None and prev.is_file():
+                prev_stat = prev.stat()
+                if prev_stat.st_size == src_stat.st_size and prev_stat.st_mtime_ns == src_stat.st_mtime_ns:
+                    try:
+                        os.link(prev, dst)
+                        linked_count += 1
+                        continue
+                    except OSError:
+                        pass
+
+            result = transfer_file(src, dst, allow_hardlink=link_run_files)
+            method = str(result["method"])
+            transfer_methods[method] = transfer_methods.get(method, 0) + 1
+            if method == METHOD_HARDLINK:
+                linked_count += 1
+            else:
+                copied_count += 1
+                bytes_copied += int(result["bytes"])
+
     return {
-        "ssim_mean_min": 0.995,
-        "ssim_p05_min": 0.985,
-        "psnr_mean_min": 35.0,
-        "psnr_min_min": 30.0,
-        "edge_iou_mean_min": 0.97,
+        "linked_count": linked_count,
+        "copied_count": copied_count,
+        "bytes_copied": bytes_copied,
+        "transfer_methods": transfer_methods,
     }
 
 
+def _swap_rename(staging: Path, latest_dir: Path, ts: str) -> Path | None:
+    """Move the current latest aside, then rename staging into place; returns the retired directory.
+
+    Not atomic: between the two renames latest/<profile> does not exist, so a reader resolving it in
+    that window sees it missing (never half-written). Use swap: "symlink" where links are available
+    for a single atomic rename.
+    """
+    retired: Path | None = None
+    if latest_dir.is_symlink():
+        target = latest_dir.resolve()
+        latest_dir.unlink()
+        retired = target
+    elif latest_dir.exists():
+        retired = latest_dir.with_name(f".{latest_dir.name}.old-{ts}")
+        os.replace(latest_dir, retired)
+    os.replace(staging, latest_dir)
+    return retired
+
+
+def _swap_symlink(version_dir: Path, latest_dir: Path, ts: str) -> Path | None:
+    """Atomically repoint latest/<profile> at version_dir; returns the retired directory."""
+    link_tmp = latest_dir.with_name(f".{latest_dir.name}.link-{ts}")
+    os.symlink(version_dir, link_tmp, target_is_directory=True)
+    retired: Path | None = None
+    try:
+        if latest_dir.is_symlink():
+            retired = latest_dir.resolve()
+        elif latest_dir.exists():
+            # First publish after switching modes: a real directory cannot be replaced by a link atomically.
+            retired = latest_dir.with_name(f".{latest_dir.name}.old-{ts}")
+            os.replace(latest_dir, retired)
+        os.replace(link_tmp, latest_dir)
+    except BaseException:
+        link_tmp.unlink(missing_ok=True)
+        raise
+    return retired
+
+
+def _publish_latest(run_dir: Path, out_root: Path, profile: str, publish_cfg: Dict[str, Any]) -> Tuple[Path, Dict[str, Any]]:
+    started = time.monotonic()
+    mode = str(publish_cfg.get("mode", "delta") or "delta").strip().lower()
+    swap = str(publish_cfg.get("swap", "rename") or "rename").strip().lower()
+    link_run_files = bool(publish_cfg.get("link_run_files", False))
+    latest_dir = out_root / "latest" / profile
+    summary: Dict[str, Any] = {"mode": mode, "swap": swap, "link_run_files": link_run_files}
+
+    if latest_dir.exists() and latest_dir.resolve() == run_dir.resolve():
+        # Stage re-run against latest/<profile>: it already is the published run.
+        summary.update({"mode": "in_place", "swap": "none"})
+        summary["duration_sec"] = round(time.monotonic() - started, 3)
+        return latest_dir, summary
+    if mode == "copy":
+        _copy_latest(run_dir, out_root, profile)
+        summary["swap"] = "none"
+        summary["duration_sec"] = round(time.monotonic() - started, 3)
+        return latest_dir, summary
+    if mode != "delta":
+        raise RuntimeError(f"Unsupported report.latest_publish.mode: {mode}")
+    if swap not in {"rename", "symlink"}:
+        raise RuntimeError(f"Unsupported report.latest_publish.swap: {swap}")
+
+    ts = f"{timestamp_compact()}_{os.getpid()}"
+    latest_dir.parent.mkdir(parents=True, exist_ok=True)
+    if swap == "symlink":
+        staging = latest_dir.parent / ".versions" / profile / ts
+    else:
+        staging = latest_dir.with_name(f".{latest_dir.name}.staging-{ts}")
+    previous = latest_dir.resolve() if latest_dir.exists() else None
+
+    try:
+        summary.update(_stage_delta(run_dir, previous, staging, link_run_files))
+        retired: Path | None = None
+        if swap == "symlink":
+            try:
+                retired = _swap_symlink(staging, latest_dir, ts)
+            except OSError as exc:
+                # Windows without symlink privilege: fall back to the rename swap.
+                summary["swap"] = "rename"
+                summary["symlink_error"] = str(exc)
+                retired = _swap_rename(staging, latest_dir, ts)
+        else:
+            retired = _swap_rename(staging, latest_dir, ts)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if retired is not None and retired.exists() and retired.resolve() != latest_dir.resolve():
+        shutil.rmtree(retired, ignore_errors=True)
+    summary["duration_sec"] = round(time.monotonic() - started, 3)
+    return latest_dir, summary
+
+
+def _strict_thresholds() -> Dict[str, float]:
+    return dict(STRICT_THRESHOLDS)
+
+
 def _pipeline_thresholds() -> Dict[str, float]:
     """Relaxed thresholds for pipeline-trained models (training_data_source=pipeline).
 
@@ -110,11 +258,117 @@ def _thresholds_hash(thresholds: Dict[str, float]) -> str:
     return hashlib.sha256(blob.encode("utf-8")).hexdigest()
 
 
-def _normalize_threshold_values(raw: Dict[str, Any]) -> Dict[str, float]:
-    out: Dict[str, float] = {}
-    for key in _strict_thresholds().keys():
-        out[key] = float(raw.get(key, 0.0))
-    return out
+def _profile_summary(run_dir: Path, stage_reports: Dict[str, Dict[str, Any] | None]) -> Dict[str, Any]:
+    """Fold every stage's outputs.profile_spans into a flame graph (folded stacks + text) and a top self-time list."""
+    totals: Dict[str, float] = {}
+    for report in stage_reports.values():
+        outputs = (report or {}).get("outputs", {})
+        spans = outputs.get("profile_spans", []) if isinstance(outputs, dict) else []
+        for span in spans if isinstance(spans, list) else []:
+            if isinstance(span, dict) and span.get("path"):
+                path = str(span["path"])
+                totals[path] = totals.get(path, 0.0) + float(span.get("wall_sec", 0.0))
+
+    child_totals: Dict[str, float] = {}
+    for path, wall in totals.items():
+        if "/" in path:
+            parent = path.rsplit("/", 1)[0]
+            child_totals[parent] = child_totals.get(parent, 0.0) + wall
+    self_times = {path: max(0.0, wall - child_totals.get(path, 0.0)) for path, wall in totals.items()}
+    pipeline_wall = sum(wall for path, wall in totals.items() if "/" not in path)
+
+    folded_path = run_dir / "reports" / "profile_flame.folded"
+    text_path = run_dir / "reports" / "profile_flame.txt"
+    folded_path.parent.mkdir(parents=True, exist_ok=True)
+    # Folded stacks ("a;b;c <value>") load directly into flamegraph.pl or speedscope; values are self ms.
+    folded = [
+        f"{path.replace(';', ',').replace(' ', '_').replace('/', ';')} {int(round(self_sec * 1000.0))}"
+        for path, self_sec in sorted(self_times.items())
+    ]
+    folded_path.write_text("\n".join(folded) + ("\n" if folded else ""), encoding="utf-8")
+
+    width = 40
+    # Depth-first, heaviest child first, so the text reads like a flame graph turned sideways.
+    ordered: List[str] = []
+
+    def _visit(parent: str) -> None:
+        children = [p for p in totals if (p.rsplit("/", 1)[0] if "/" in p else "") == parent]
+        for path in sorted(children, key=lambda p: -totals[p]):
+            ordered.append(path)
+            _visit(path)
+
+    _visit("")
+    lines = [f"total {pipeline_wall:.1f}s across {len([p for p in ordered if '/' not in p])} stages"]
+    for path in ordered:
+        depth = path.count("/")
+        share = totals[path] / pipeline_wall if pipeline_wall > 0 else 0.0
+        label = ("  " * depth + path.rsplit("/", 1)[-1])[:48]
+        lines.append(f"{label:<48} {totals[path]:10.2f}s {100.0 * share:6.1f}% {'#' * int(round(share * width))}")
+    text_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    top = sorted(self_times.items(), key=lambda kv: -kv[1])[:15]
+    return {
+        "total_wall_sec": round(pipeline_wall, 3),
+        "stages": [
+            {
+                "stage": path,
+                "wall_sec": round(totals[path], 3),
+                "share": round(totals[path] / pipeline_wall, 4) if pipeline_wall > 0 else 0.0,
+            }
+            for path in ordered
+            if "/" not in path
+        ],
+        "top_self_time": [
+            {
+                "path": path,
+                "self_sec": round(self_sec, 3),
+                "share": round(self_sec / pipeline_wall, 4) if pipeline_wall > 0 else 0.0,
+            }
+            for path, self_sec in top
+        ],
+        "flame_folded": str(folded_path.resolve()),
+        "flame_text": str(text_path.resolve()),
+    }
+
+
+def _record_perf_history(
+    out_root: Path,
+    run_dir: Path,
+    profile: str,
+    pipeline_report: Dict[str, Any],
+    stage_reports: Dict[str, Dict[str, Any] | None],
+    history_cfg: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Ingest this run into <out_root>/history and check it against recent runs; never fails the report."""
+    db_path = history_db_path(out_root)
+    summary: Dict[str, Any] = {"enabled": True, "db": str(db_path.resolve())}
+    try:
+        conn = connect(db_path)
+        try:
+            summary.update(
+                ingest_run(
+                    conn,
+                    run_dir,
+                    profile,
+                    str(pipeline_report.get("started_at", "")),
+                    str(pipeline_report.get("status", "")),
+                    stage_reports,
+                )
+            )
+            result = find_regressions(
+                conn,
+                profile,
+                last_n=int(history_cfg.get("last_n", 10)),
+                time_regression_pct=float(history_cfg.get("time_regression_pct", 30.0)),
+                quality_regression_pct=float(history_cfg.get("quality_regression_pct", 1.0)),
+            )
+        finally:
+            conn.close()
+        summary["compared_runs"] = len(result["runs"])
+        summary["regressions"] = result["regressions"]
+    except Exception as exc:
+        summary["error"] = str(exc)
+    return summary
 
 
 def main() -> int:
@@ -134,7 +388,8 @@ def main() -> int:
     )
 
     try:
-        cfg = load_config(args.config)
+        config = load_pipeline_config(args.config, run_dir)
+        cfg = config.raw
         stages = [
             "baseline_sync",
             "preflight",
@@ -161,14 +416,7 @@ def main() -> int:
         train_determinism_report = _load_stage_report(train_determinism_report_path)
 
         # Determine skip_train early so we know which stages are expected
-        training_cfg_early = (
-            cfg.get("ue", {}).get("training", {})
-            if isinstance(cfg.get("ue"), dict)
-            else {}
-        )
-        if not isinstance(training_cfg_early, dict):
-            training_cfg_early = {}
-        skip_train_flag = bool(training_cfg_early.get("skip_train", False))
+        skip_train_flag = config.training.skip_train
         # Stages that produce GeomCache and are skipped when skip_train=true
         skip_train_bypass_stages = {"preflight", "houdini", "convert", "ue_import"}
 
@@ -187,31 +435,13 @@ def main() -> int:
                 failures.append({"stage": stage, "message": "Stage failed", "errors": sr.get("errors", [])})
 
         # strict threshold enforcement unless explicitly in debug mode
-        compare_cfg = (
-            cfg.get("ue", {}).get("ground_truth", {}).get("compare", {})
-            if isinstance(cfg.get("ue"), dict)
-            else {}
-        )
-        if not isinstance(compare_cfg, dict):
-            compare_cfg = {}
-        thresholds_raw = compare_cfg.get("thresholds", {}) if isinstance(compare_cfg.get("thresholds"), dict) else {}
-        thresholds = _normalize_threshold_values(thresholds_raw)
+        thresholds = dict(config.gt_compare.thresholds)
         strict = _strict_thresholds()
         pipeline = _pipeline_thresholds()
-
-        debug_mode = bool(cfg.get("debug_mode", False))
-        if "debug_mode" in compare_cfg:
-            debug_mode = bool(compare_cfg.get("debug_mode", debug_mode))
+        debug_mode = config.gt_compare.debug_mode
 
         # Determine training_data_source to select the correct threshold baseline
-        training_cfg = (
-            cfg.get("ue", {}).get("training", {})
-            if isinstance(cfg.get("ue"), dict)
-            else {}
-        )
-        if not isinstance(training_cfg, dict):
-            training_cfg = {}
-        training_data_source = str(training_cfg.get("training_data_source", "reference") or "reference").strip().lower()
+        training_data_source = config.training.training_data_source
         is_pipeline_source = training_data_source == "pipeline"
 
         if is_pipeline_source:
@@ -242,7 +472,7 @@ def main() -> int:
         if not isinstance(strict_clone_cfg, dict):
             strict_clone_cfg = {}
         strict_clone_enabled = bool(strict_clone_cfg.get("enabled", False))
-        skip_train = bool(training_cfg.get("skip_train", False))
+        skip_train = config.training.skip_train
         if strict_clone_enabled:
             if reference_setup_dump_report is None:
                 failures.append(
@@ -386,7 +616,23 @@ def main() -> int:
         resolved_yaml_path = run_dir / "resolved_config.yaml"
         resolved_yaml_path.write_text(_yaml_dump(resolved_snapshot) + "\n", encoding="utf-8")
 
-        latest_dir = _copy_latest(run_dir, out_root, args.profile)
+        history_cfg = get_nested(cfg, ("report", "perf_history"), {})
+        if not isinstance(history_cfg, dict):
+            history_cfg = {}
+        timed_reports = dict(stage_reports)
+        timed_reports["reference_setup_dump"] = reference_setup_dump_report
+        perf_history: Dict[str, Any] = {"enabled": False}
+        if bool(history_cfg.get("enabled", True)):
+            perf_history = _record_perf_history(
+                out_root, run_dir, args.profile, pipeline_report, timed_reports, history_cfg
+            )
+        profile_summary = _profile_summary(run_dir, timed_reports)
+
+        # Publish last, so latest/<profile> snapshots everything this stage wrote into run_dir.
+        publish_cfg = get_nested(cfg, ("report", "latest_publish"), {})
+        if not isinstance(publish_cfg, dict):
+            publish_cfg = {}
+        latest_dir, latest_publish = _publish_latest(run_dir, out_root, args.profile, publish_cfg)
 
         finalize_report(
             stage_report,
@@ -396,10 +642,13 @@ def main() -> int:
                 "pipeline_report_latest": str((run_dir / "reports" / "pipeline_report_latest.json").resolve()),
                 "resolved_config_yaml": str(resolved_yaml_path.resolve()),
                 "latest_copy_dir": str(latest_dir.resolve()),
+                "latest_publish": latest_publish,
+                "perf_history": perf_history,
+                "profile_summary": profile_summary,
             },
             errors=failures,
         )
-        write_json(report_path, stage_report)
+        write_report(report_path, stage_report)
         return 0 if status == "success" else 1
 
     except Exception as exc:
@@ -409,7 +658,7 @@ def main() -> int:
             outputs={},
             errors=[{"message": str(exc), "traceback": traceback.format_exc()}],
         )
-        write_json(report_path, stage_report)
+        write_report(report_path, stage_report)
         return 1
 
 
@@ -3,11 +3,16 @@
 
 from __future__ import annotations
 
+import contextlib
 import datetime as _dt
+import hashlib
 import json
 import os
+import sys
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 
 REPORT_KEYS = (
@@ -39,9 +44,250 @@ def read_text(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
-def write_json(path: Path, data: Any) -> None:
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write via a per-writer temp file and os.replace, so readers see the old or the new file, never a torn one."""
     ensure_dir(path.parent)
-    path.write_text(json.dumps(data, ensure_ascii=True, indent=2), encoding="utf-8")
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    for attempt in range(6):
+        try:
+            os.replace(tmp, path)
+            return
+        except PermissionError:
+            # Windows refuses to replace a file another process has open; readers hold it only briefly.
+            if attempt == 5:
+                tmp.unlink(missing_ok=True)
+                raise
+            time.sleep(0.05 * (2**attempt))
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def write_json(path: Path, data: Any) -> None:
+    atomic_write_text(path, json.dumps(data, ensure_ascii=True, indent=2))
+
+
+@contextlib.contextmanager
+def file_lock(path: Path, timeout_sec: float = 120.0) -> Iterator[Path]:
+    """Exclusive advisory lock on <path>.lock, across processes and threads; raises TimeoutError."""
+    lock_path = path.with_name(path.name + ".lock")
+    ensure_dir(lock_path.parent)
+    deadline = time.monotonic() + timeout_sec
+    with lock_path.open("a+b") as handle:
+        while True:
+            try:
+                if os.name == "nt":
+                    import msvcrt
+
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    import fcntl
+
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out after {timeout_sec:.0f}s waiting for lock: {lock_path}")
+                time.sleep(0.05)
+        try:
+            yield lock_path
+        finally:
+            if os.name == "nt":
+                import msvcrt
+
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """Linear-interpolated percentile (numpy's default method) without requiring numpy."""
+    data = sorted(float(v) for v in values)
+    if not data:
+        return 0.0
+    pos = (len(data) - 1) * min(max(float(q), 0.0), 100.0) / 100.0
+    lower = int(pos)
+    upper = min(lower + 1, len(data) - 1)
+    return data[lower] + (data[upper] - data[lower]) * (pos - lower)
+
+
+def _win_process_counters() -> Tuple[int, int, int, int]:
+    """(rss, peak rss, bytes read, bytes written) of this process via psapi/kernel32."""
+    import ctypes
+    from ctypes import wintypes
+
+    class _MemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    class _IoCounters(ctypes.Structure):
+        _fields_ = [
+            ("ReadOperationCount", ctypes.c_ulonglong),
+            ("WriteOperationCount", ctypes.c_ulonglong),
+            ("OtherOperationCount", ctypes.c_ulonglong),
+            ("ReadTransferCount", ctypes.c_ulonglong),
+            ("WriteTransferCount", ctypes.c_ulonglong),
+            ("OtherTransferCount", ctypes.c_ulonglong),
+        ]
+
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    mem = _MemoryCounters()
+    mem.cb = ctypes.sizeof(_MemoryCounters)
+    rss = peak = 0
+    if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(mem), mem.cb):
+        rss, peak = int(mem.WorkingSetSize), int(mem.PeakWorkingSetSize)
+    io = _IoCounters()
+    read = written = 0
+    if ctypes.windll.kernel32.GetProcessIoCounters(handle, ctypes.byref(io)):
+        read, written = int(io.ReadTransferCount), int(io.WriteTransferCount)
+    return rss, peak, read, written
+
+
+def current_rss_bytes() -> int:
+    if sys.platform == "win32":
+        return _win_process_counters()[0]
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def process_resources() -> Dict[str, float]:
+    """CPU seconds, peak RSS and cumulative read/write bytes of this process; 0 where a counter is unavailable.
+
+    I/O bytes are syscall-level (page-cache hits included), matching what Windows reports.
+    """
+    cpu_sec = time.process_time()
+    if sys.platform == "win32":
+        try:
+            _, peak, read, written = _win_process_counters()
+        except Exception:
+            peak = read = written = 0
+        return {"cpu_sec": cpu_sec, "rss_peak_bytes": peak, "read_bytes": read, "write_bytes": written}
+
+    peak = read = written = 0
+    try:
+        import resource
+
+        # ru_maxrss is KiB on Linux, bytes on macOS.
+        maxrss = int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+        peak = maxrss if sys.platform == "darwin" else maxrss * 1024
+    except Exception:
+        pass
+    try:
+        with open("/proc/self/io", "r", encoding="ascii") as handle:
+            counters = dict(line.split(":", 1) for line in handle.read().splitlines() if ":" in line)
+        read, written = int(counters.get("rchar", 0)), int(counters.get("wchar", 0))
+    except (OSError, ValueError):
+        pass
+    return {"cpu_sec": cpu_sec, "rss_peak_bytes": peak, "read_bytes": read, "write_bytes": written}
+
+
+_SPAN_LOCK = threading.Lock()
+_SPAN_LOCAL = threading.local()
+_SPANS: List[Dict[str, Any]] = []
+_REPORT_STARTS: Dict[int, Tuple[float, Dict[str, float]]] = {}
+_MIB = 1024.0 * 1024.0
+
+
+def _span_record(
+    name: str,
+    path: str,
+    depth: int,
+    started: float,
+    before: Dict[str, float],
+    status: str,
+) -> Dict[str, Any]:
+    after = process_resources()
+    return {
+        "name": name,
+        "path": path,
+        "depth": depth,
+        "status": status,
+        "start_mono": started,
+        "wall_sec": round(time.monotonic() - started, 6),
+        "cpu_sec": round(after["cpu_sec"] - before["cpu_sec"], 6),
+        # Process high-water mark when the span ended, and how much the span raised it.
+        "rss_peak_mb": round(after["rss_peak_bytes"] / _MIB, 1),
+        "rss_peak_growth_mb": round((after["rss_peak_bytes"] - before["rss_peak_bytes"]) / _MIB, 1),
+        "read_bytes": int(after["read_bytes"] - before["read_bytes"]),
+        "write_bytes": int(after["write_bytes"] - before["write_bytes"]),
+    }
+
+
+@contextlib.contextmanager
+def profile_span(name: str) -> Iterator[Dict[str, Any]]:
+    """Time a named sub-step; nested spans get a '/'-joined path. The yielded dict is merged into the span."""
+    stack: List[str] = getattr(_SPAN_LOCAL, "stack", None) or []
+    _SPAN_LOCAL.stack = stack
+    # '/' separates path levels, so names such as Houdini node paths are escaped.
+    segment = name.replace("/", "|")
+    path = "/".join(stack + [segment])
+    depth = len(stack)
+    stack.append(segment)
+    extra: Dict[str, Any] = {}
+    status = "ok"
+    before = process_resources()
+    started = time.monotonic()
+    try:
+        yield extra
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        stack.pop()
+        span = _span_record(name, path, depth, started, before, status)
+        span.update(extra)
+        with _SPAN_LOCK:
+            _SPANS.append(span)
+
+
+def begin_report_profile(report: Dict[str, Any]) -> None:
+    _REPORT_STARTS[id(report)] = (time.monotonic(), process_resources())
+
+
+def report_profile_spans(report: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """A root span covering make_report..finalize_report, then every span that started inside that window."""
+    stage = str(report.get("stage", "stage"))
+    started, before = _REPORT_STARTS.pop(id(report), (time.monotonic(), process_resources()))
+    spans = [_span_record(stage, stage, 0, started, before, str(report.get("status", "")))]
+    with _SPAN_LOCK:
+        children = [dict(s) for s in _SPANS if s["start_mono"] >= started]
+    for span in sorted(children, key=lambda s: s["start_mono"]):
+        span["path"] = f"{stage}/{span['path']}"
+        span["depth"] = int(span["depth"]) + 1
+        spans.append(span)
+    for span in spans:
+        span["start_offset_sec"] = round(span.pop("start_mono") - started, 6)
+    return spans
 
 
 class ConfigError(RuntimeError):
@@ -110,7 +356,7 @@ def profile_data(config: Dict[str, Any], profile: str) -> Dict[str, Any]:
 
 
 def make_report(stage: str, profile: str, inputs: Dict[str, Any] | None = None) -> Dict[str, Any]:
-    return {
+    report = {
         "stage": stage,
         "profile": profile,
         "started_at": utc_now_iso(),
@@ -120,6 +366,8 @@ def make_report(stage: str, profile: str, inputs: Dict[str, Any] | None = None)
         "outputs": {},
         "errors": [],
     }
+    begin_report_profile(report)
+    return report
 
 
 def finalize_report(
@@ -132,6 +380,7 @@ def finalize_report(
     report["status"] = status
     report["outputs"] = outputs or {}
     report["errors"] = errors or []
+    report["outputs"]["profile_spans"] = report_profile_spans(report)
     # keep report schema stable
     for key in REPORT_KEYS:
         report.setdefault(key, [] if key == "errors" else {})
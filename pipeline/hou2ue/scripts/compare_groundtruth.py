@@ -14,7 +14,9 @@ from typing import Any, Dict, List, Tuple
 import numpy as np
 from PIL import Image
 
-from common import finalize_report, load_config, make_report, require_nested, stage_report_path, write_json
+from common import finalize_report, make_report, require_nested, stage_report_path
+from pipeline_config import load_pipeline_config
+from report_store import merge_report, write_report
 
 
 def parse_args() -> argparse.Namespace:
@@ -173,58 +175,39 @@ def _body_roi(gray: np.ndarray) -> np.ndarray:
     return gray[y0:y1, x0:x1]
 
 
-def _safe_read_json(path: Path) -> Dict[str, Any]:
-    if not path.exists():
-        return {}
-    try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
-        return {}
-
-
 def _update_infer_report(
     run_dir: Path,
     compare_enabled: bool,
     compare_status: str,
     compare_report_path: Path,
     compare_metrics: Dict[str, Any],
-) -> None:
+) -> Dict[str, Any]:
+    """Annotate infer_report.json with the compare result; returns what happened, for the gt_compare report."""
     infer_path = run_dir / "reports" / "infer_report.json"
-    if not infer_path.exists():
-        return
-
-    data = _safe_read_json(infer_path)
-    if not isinstance(data, dict):
-        return
-
-    outputs = data.get("outputs", {})
-    if not isinstance(outputs, dict):
-        outputs = {}
-
-    outputs["ground_truth_compare_enabled"] = bool(compare_enabled)
-    outputs["ground_truth_compare_report"] = str(compare_report_path.resolve())
-    outputs["ground_truth_compare_status"] = str(compare_status)
-    outputs["ground_truth_compare_metrics"] = compare_metrics
-    data["outputs"] = outputs
-
-    errors = data.get("errors", [])
-    if not isinstance(errors, list):
-        errors = []
-
+    outputs = {
+        "ground_truth_compare_enabled": bool(compare_enabled),
+        "ground_truth_compare_report": str(compare_report_path.resolve()),
+        "ground_truth_compare_status": str(compare_status),
+        "ground_truth_compare_metrics": compare_metrics,
+    }
+    errors: List[Dict[str, Any]] = []
+    status = None
     if compare_enabled and compare_status != "success":
-        data["status"] = "failed"
-        marker = "ground truth compare stage failed"
-        if not any(isinstance(x, dict) and x.get("message") == marker for x in errors):
-            errors.append(
-                {
-                    "message": marker,
-                    "gt_compare_report": str(compare_report_path.resolve()),
-                    "ground_truth_compare_status": compare_status,
-                }
-            )
-    data["errors"] = errors
-
-    infer_path.write_text(json.dumps(data, ensure_ascii=True, indent=2), encoding="utf-8")
+        status = "failed"
+        errors.append(
+            {
+                "message": "ground truth compare stage failed",
+                "gt_compare_report": str(compare_report_path.resolve()),
+                "ground_truth_compare_status": compare_status,
+            }
+        )
+    # Locked read-modify-write: ue_infer may still be writing this report when the compare finishes.
+    try:
+        merged = merge_report(infer_path, outputs=outputs, errors=errors, status=status)
+    except (ValueError, RuntimeError, TimeoutError, OSError) as exc:
+        # Unparseable report, sidecar mismatch or lock timeout: the compare result itself still stands.
+        return {"status": "failed", "path": str(infer_path), "message": f"{type(exc).__name__}: {exc}"}
+    return {"status": "updated" if merged is not None else "missing", "path": str(infer_path), "message": ""}
 
 
 def main() -> int:
@@ -242,39 +225,29 @@ def main() -> int:
     )
 
     try:
-        cfg = load_config(args.config)
-        gt_cfg = require_nested(cfg, ("ue", "ground_truth"))
-
-        enabled = bool(gt_cfg.get("enabled", False))
-        if not enabled:
+        config = load_pipeline_config(args.config, run_dir)
+        require_nested(config.raw, ("ue", "ground_truth"))
+        gt_compare = config.gt_compare
+        if not gt_compare.enabled:
             finalize_report(
                 report,
                 status="success",
                 outputs={"enabled": False, "skipped": True, "reason": "ue.ground_truth.enabled=false"},
                 errors=[],
             )
-            write_json(report_path, report)
-            _update_infer_report(run_dir, False, "disabled", report_path, {})
+            report["outputs"]["infer_report_update"] = _update_infer_report(run_dir, False, "disabled", report_path, {})
+            write_report(report_path, report)
             return 0
 
-        compare_cfg = gt_cfg.get("compare", {}) if isinstance(gt_cfg.get("compare"), dict) else {}
-        thresholds = compare_cfg.get("thresholds", {}) if isinstance(compare_cfg.get("thresholds"), dict) else {}
-        metrics_profile = str(compare_cfg.get("metrics_profile", "strict") or "strict")
-
-        ssim_mean_min = float(thresholds.get("ssim_mean_min", 0.995))
-        ssim_p05_min = float(thresholds.get("ssim_p05_min", 0.985))
-        psnr_mean_min = float(thresholds.get("psnr_mean_min", 35.0))
-        psnr_min_min = float(thresholds.get("psnr_min_min", 30.0))
-        edge_iou_mean_min = float(thresholds.get("edge_iou_mean_min", 0.97))
-        thresholds_obj = {
-            "ssim_mean_min": ssim_mean_min,
-            "ssim_p05_min": ssim_p05_min,
-            "psnr_mean_min": psnr_mean_min,
-            "psnr_min_min": psnr_min_min,
-            "edge_iou_mean_min": edge_iou_mean_min,
-        }
+        metrics_profile = gt_compare.metrics_profile
+        thresholds_obj = dict(gt_compare.thresholds)
+        ssim_mean_min = thresholds_obj["ssim_mean_min"]
+        ssim_p05_min = thresholds_obj["ssim_p05_min"]
+        psnr_mean_min = thresholds_obj["psnr_mean_min"]
+        psnr_min_min = thresholds_obj["psnr_min_min"]
+        edge_iou_mean_min = thresholds_obj["edge_iou_mean_min"]
         thresholds_hash = _thresholds_hash(thresholds_obj)
-        fail_on_count_mismatch = bool(compare_cfg.get("fail_on_frame_count_mismatch", True))
+        fail_on_count_mismatch = gt_compare.fail_on_frame_count_mismatch
 
         ref_dir = run_dir / "workspace" / "staging" / args.profile / "gt" / "reference" / "frames"
         src_dir = run_dir / "workspace" / "staging" / args.profile / "gt" / "source" / "frames"
@@ -466,15 +439,14 @@ def main() -> int:
         }
 
         finalize_report(report, status=status, outputs=outputs, errors=errors)
-        write_json(report_path, report)
-
-        _update_infer_report(
+        report["outputs"]["infer_report_update"] = _update_infer_report(
             run_dir=run_dir,
             compare_enabled=True,
             compare_status=status,
             compare_report_path=report_path,
             compare_metrics=metrics_summary,
         )
+        write_report(report_path, report)
 
         return 0 if status == "success" else 1
 
@@ -485,14 +457,14 @@ def main() -> int:
             outputs={},
             errors=[{"message": str(exc), "traceback": traceback.format_exc()}],
         )
-        write_json(report_path, report)
-        _update_infer_report(
+        report["outputs"]["infer_report_update"] = _update_infer_report(
             run_dir=run_dir,
             compare_enabled=True,
             compare_status="failed",
             compare_report_path=report_path,
             compare_metrics={},
         )
+        write_report(report_path, report)
         return 1
 
 
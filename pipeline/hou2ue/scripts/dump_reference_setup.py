@@ -1,17 +1,33 @@
 #!/usr/bin/env python3
-"""Run UE in reference project and dump deformer setup JSON via C++ bridge."""
+"""Run UE in reference project and dump deformer setup JSON via C++ bridge.
+
+Dumps are cached under <out_root>/cache/reference_setup_dump, keyed by the content hashes of the
+.uproject and deformer .uasset files of every project the dump may run against.
+"""
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import os
-import subprocess
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List
+
+from common import atomic_write_text, finalize_report, make_report, require_nested, stage_report_path, utc_now_iso
+from editor_process import resolve_editor_cmd, run_guarded_process
+from hash_cache import HashCache
+from pipeline_config import load_pipeline_config
+from report_store import write_report
+from train_cache import game_path_to_file, package_name
 
-from common import finalize_report, load_config, make_report, require_nested, stage_report_path, write_json
+DUMP_CACHE_VERSION = 1
+FALLBACK_REASON = "reference_project_missing_editor_tools_module_fallback_to_source_project"
+# Speculative mode: the source dump finished first and the still-running reference dump was cancelled.
+SPECULATIVE_SOURCE_WON = "speculative_source_won"
 
 
 def parse_args() -> argparse.Namespace:
@@ -19,6 +35,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--config", required=True)
     parser.add_argument("--profile", required=True, choices=["smoke", "full"])
     parser.add_argument("--run-dir", required=True)
+    parser.add_argument("--out-root", default="")
     return parser.parse_args()
 
 
@@ -31,21 +48,167 @@ def _resolve_path(base: Path, value: str) -> Path:
     return path if path.is_absolute() else (base / path).resolve()
 
 
-def _resolve_editor_cmd(ue_editor_exe: str) -> Path:
-    exe_path = Path(ue_editor_exe)
-    if not exe_path.exists():
-        raise RuntimeError(f"UE editor executable not found: {exe_path}")
-    if exe_path.name.lower() == "unrealeditor-cmd.exe":
-        return exe_path
-    candidate = exe_path.with_name("UnrealEditor-Cmd.exe")
-    return candidate if candidate.exists() else exe_path
+def _out_root(args: argparse.Namespace, run_dir: Path) -> Path:
+    if args.out_root:
+        return Path(args.out_root)
+    # <out_root>/runs/<timestamp>_<profile>
+    resolved = run_dir.resolve()
+    return resolved.parent.parent if resolved.parent.name == "runs" else resolved
 
 
-def _tail(path: Path, lines: int = 120) -> List[str]:
+def _load_json(path: Path) -> Dict[str, Any]:
     if not path.exists():
-        return []
-    data = path.read_text(encoding="utf-8", errors="ignore").splitlines()
-    return data[-lines:]
+        return {}
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def dump_fingerprint(
+    uprojects: List[Path],
+    deformers: List[List[str]],
+    dump_script: Path,
+    hash_file: Callable[[Path], str],
+) -> Dict[str, Any] | None:
+    """Return {"fingerprint", "inputs"}, or None when a deformer lives outside /Game and cannot be hashed."""
+    projects: Dict[str, Any] = {}
+    for uproject in uprojects:
+        assets: Dict[str, str] = {}
+        for _, asset_path in deformers:
+            if not package_name(asset_path).startswith("/Game/"):
+                return None
+            path = game_path_to_file(uproject.parent, asset_path)
+            assets[package_name(asset_path)] = hash_file(path) if path.is_file() else ""
+        projects[str(uproject.resolve())] = {"uproject": hash_file(uproject), "assets": assets}
+
+    inputs = {
+        "version": DUMP_CACHE_VERSION,
+        "dump_script": hash_file(dump_script),
+        "deformers": deformers,
+        "projects": projects,
+    }
+    canonical = json.dumps(inputs, ensure_ascii=True, sort_keys=True, separators=(",", ":"))
+    return {"fingerprint": hashlib.sha256(canonical.encode("utf-8")).hexdigest(), "inputs": inputs}
+
+
+def _cache_entry_path(cache_root: Path, fingerprint: str) -> Path:
+    return cache_root / fingerprint[:2] / f"{fingerprint}.json"
+
+
+def _cache_lookup(cache_root: Path, fingerprint: str) -> Dict[str, Any] | None:
+    entry = _load_json(_cache_entry_path(cache_root, fingerprint))
+    if int(entry.get("version", 0)) != DUMP_CACHE_VERSION or not isinstance(entry.get("dump"), dict):
+        return None
+    if str(entry["dump"].get("status", "")) != "success":
+        return None
+    return entry
+
+
+def _cache_store(
+    cache_root: Path,
+    fingerprint: str,
+    inputs: Dict[str, Any],
+    run_result: Dict[str, Any],
+    fallback_reason: str,
+) -> Path:
+    path = _cache_entry_path(cache_root, fingerprint)
+    entry = {
+        "version": DUMP_CACHE_VERSION,
+        "fingerprint": fingerprint,
+        "created_at": utc_now_iso(),
+        "capture_uproject": run_result["uproject"],
+        "fallback_reason": fallback_reason,
+        "inputs": inputs,
+        "dump": run_result["dump_payload"],
+    }
+    atomic_write_text(path, json.dumps(entry, ensure_ascii=True, indent=2))
+    return path
+
+
+def _run_dump(
+    target: Dict[str, Any],
+    editor_cmd: Path,
+    ue_dump_script: Path,
+    env: Dict[str, str],
+    guard: Dict[str, Any],
+    cancel: threading.Event | None = None,
+) -> Dict[str, Any]:
+    cmd = [
+        str(editor_cmd),
+        str(target["uproject"]),
+        f"-ExecutePythonScript={ue_dump_script.as_posix()}",
+        "-unattended",
+        "-nop4",
+        "-nosplash",
+        "-NoSound",
+        "-stdout",
+        "-FullStdOutLogOutput",
+        "-log",
+    ]
+    dump_out: Path = target["dump_output"]
+    dump_out.unlink(missing_ok=True)
+    run_env = dict(env)
+    run_env["HOU2UE_DUMP_OUTPUT"] = str(dump_out)
+
+    process = run_guarded_process(
+        cmd,
+        target["stdout_path"],
+        target["stderr_path"],
+        timeout_minutes=guard["timeout_minutes"],
+        no_activity_minutes=guard["no_activity_minutes"],
+        repeated_error_threshold=guard["repeated_error_threshold"],
+        env=run_env,
+        poll_sec=guard["poll_sec"],
+        cancel=cancel,
+    )
+
+    dump_payload = _load_json(dump_out)
+    dump_status = str(dump_payload.get("status", "missing")) if dump_payload else "missing"
+    return {
+        "target": target["name"],
+        "cmd": cmd,
+        "returncode": int(process["exit_code"]),
+        "abort_reason": process["abort_reason"],
+        "repeated_error_line": process["repeated_error_line"],
+        "duration_sec": process["duration_sec"],
+        "dump_payload": dump_payload,
+        "dump_status": dump_status,
+        "success": not process["abort_reason"] and int(process["exit_code"]) == 0 and dump_status == "success",
+        "uproject": str(Path(target["uproject"]).resolve()),
+        "stdout_path": process["stdout_path"],
+        "stderr_path": process["stderr_path"],
+        "stdout_tail": process["stdout_tail"],
+        "stderr_tail": process["stderr_tail"],
+    }
+
+
+def _run_speculative(targets: List[Dict[str, Any]], launch: Callable[..., Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Start every target at once; the first success cancels the rest. Results come back in completion order."""
+    cancel = threading.Event()
+    results: List[Dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+        futures = [pool.submit(launch, target, cancel) for target in targets]
+        for future in as_completed(futures):
+            results.append(future.result())
+            if results[-1]["success"]:
+                cancel.set()
+    return results
+
+
+def _fallback_reason(attempts: List[Dict[str, Any]], run_result: Dict[str, Any]) -> str:
+    """Why the source project was used or tried; '' when only the reference project was involved."""
+    reference = next(a for a in attempts if a["target"] == "reference")
+    if len(attempts) == 1 or reference["success"]:
+        return ""
+    if run_result["target"] != "reference" and reference["abort_reason"] == "cancelled":
+        return SPECULATIVE_SOURCE_WON
+    return FALLBACK_REASON
+
+
+def _attempt_summary(run_result: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in run_result.items() if key not in ("dump_payload", "stdout_tail", "stderr_tail")}
 
 
 def main() -> int:
@@ -64,7 +227,8 @@ def main() -> int:
     )
 
     try:
-        cfg = load_config(args.config)
+        config = load_pipeline_config(args.config, run_dir)
+        cfg = config.raw
         baseline_cfg = require_nested(cfg, ("reference_baseline",))
         strict_clone_cfg = baseline_cfg.get("strict_clone", {}) if isinstance(baseline_cfg.get("strict_clone"), dict) else {}
         enabled = bool(strict_clone_cfg.get("enabled", False))
@@ -77,14 +241,25 @@ def main() -> int:
                 outputs={"enabled": False, "skipped": True, "reason": "reference_baseline.strict_clone.enabled=false"},
                 errors=[],
             )
-            write_json(stage_report, report)
+            write_report(stage_report, report)
             return 0
 
         if source and source != "refference_deformer_dump":
             raise RuntimeError(f"Unsupported reference_baseline.strict_clone.source: {source}")
 
+        speculative = bool(strict_clone_cfg.get("speculative", False))
+        cache_cfg = strict_clone_cfg.get("cache", {}) if isinstance(strict_clone_cfg.get("cache"), dict) else {}
+        cache_enabled = bool(cache_cfg.get("enabled", True))
+        guard_cfg = strict_clone_cfg.get("guard", {}) if isinstance(strict_clone_cfg.get("guard"), dict) else {}
+        guard = {
+            "timeout_minutes": int(guard_cfg.get("timeout_minutes", 60)),
+            "no_activity_minutes": int(guard_cfg.get("no_activity_minutes", 20)),
+            "repeated_error_threshold": int(guard_cfg.get("repeated_error_threshold", 8)),
+            "poll_sec": float(guard_cfg.get("poll_sec", 5.0)),
+        }
+
         project_root = _project_root()
-        editor_cmd = _resolve_editor_cmd(str(require_nested(cfg, ("paths", "ue_editor_exe"))))
+        editor_cmd = resolve_editor_cmd(str(require_nested(cfg, ("paths", "ue_editor_exe"))))
         reference_uproject = _resolve_path(project_root, str(require_nested(baseline_cfg, ("reference_uproject",))))
         source_uproject = _resolve_path(project_root, str(require_nested(cfg, ("paths", "uproject"))))
         if not reference_uproject.exists():
@@ -94,89 +269,121 @@ def main() -> int:
         if not ue_dump_script.exists():
             raise RuntimeError(f"UE dump script missing: {ue_dump_script}")
 
-        dump_out = (run_dir / "reports" / "reference_setup_dump.json").resolve()
-        stdout_path = run_dir / "reports" / "logs" / "reference_setup_dump.stdout.log"
-        stderr_path = run_dir / "reports" / "logs" / "reference_setup_dump.stderr.log"
-        stdout_path.parent.mkdir(parents=True, exist_ok=True)
+        reports_dir = run_dir / "reports"
+        dump_out = (reports_dir / "reference_setup_dump.json").resolve()
         dump_out.parent.mkdir(parents=True, exist_ok=True)
         dump_out.unlink(missing_ok=True)
 
+        targets = [
+            {
+                "name": "reference",
+                "uproject": reference_uproject,
+                "dump_output": (reports_dir / "reference_setup_dump.reference.json").resolve(),
+                "stdout_path": reports_dir / "logs" / "reference_setup_dump.stdout.log",
+                "stderr_path": reports_dir / "logs" / "reference_setup_dump.stderr.log",
+            }
+        ]
+        if source_uproject.exists() and source_uproject.resolve() != reference_uproject.resolve():
+            targets.append(
+                {
+                    "name": "source",
+                    "uproject": source_uproject,
+                    "dump_output": (reports_dir / "reference_setup_dump.source.json").resolve(),
+                    "stdout_path": reports_dir / "logs" / "reference_setup_dump.source.stdout.log",
+                    "stderr_path": reports_dir / "logs" / "reference_setup_dump.source.stderr.log",
+                }
+            )
+
+        assets_cfg = require_nested(cfg, ("ue", "deformer_assets"))
+        deformers = [
+            [str(key), str(assets_cfg[key].get("asset_path", ""))]
+            for key in require_nested(cfg, ("ue", "training_order"))
+            if isinstance(assets_cfg.get(key), dict)
+        ]
+        cache_root = _out_root(args, run_dir) / "cache" / "reference_setup_dump"
+        cache_info: Dict[str, Any] = {"enabled": cache_enabled, "hit": False, "fingerprint": "", "entry": "", "stored": False}
+        key = None
+        cached = None
+        if cache_enabled:
+            hashes = HashCache(_out_root(args, run_dir) / "cache" / "reference_setup_hashes.json")
+            key = dump_fingerprint([t["uproject"] for t in targets], deformers, ue_dump_script, hashes.sha256)
+            hashes.save()
+            if key is not None:
+                cache_info["fingerprint"] = key["fingerprint"]
+                cached = _cache_lookup(cache_root, key["fingerprint"])
+
+        if cached is not None:
+            atomic_write_text(dump_out, json.dumps(cached["dump"], ensure_ascii=True, indent=2))
+            cache_info["hit"] = True
+            cache_info["entry"] = str(_cache_entry_path(cache_root, key["fingerprint"]).resolve())
+            capture_uproject = str(cached.get("capture_uproject", ""))
+            fallback_reason = str(
+                cached.get("fallback_reason", FALLBACK_REASON if capture_uproject != str(reference_uproject.resolve()) else "")
+            )
+            finalize_report(
+                report,
+                status="success",
+                outputs={
+                    "enabled": True,
+                    "source": "refference_deformer_dump",
+                    "reference_uproject": str(reference_uproject.resolve()),
+                    "capture_uproject": capture_uproject,
+                    "dump_output": str(dump_out),
+                    "dump_status": "success",
+                    "mode": "cache",
+                    "fallback_used": bool(fallback_reason),
+                    "fallback_reason": fallback_reason,
+                    "attempts": [],
+                    "cache": cache_info,
+                    "command": [],
+                },
+                errors=[],
+            )
+            write_report(stage_report, report)
+            return 0
+
         env = os.environ.copy()
         env["HOU2UE_CONFIG"] = str(Path(args.config).resolve())
         env["HOU2UE_PROFILE"] = args.profile
         env["HOU2UE_RUN_DIR"] = str(run_dir.resolve())
         env["HOU2UE_DUMP_KIND"] = "reference"
-        env["HOU2UE_DUMP_OUTPUT"] = str(dump_out)
-
-        def _run_dump(target_uproject: Path) -> Dict[str, Any]:
-            cmd = [
-                str(editor_cmd),
-                str(target_uproject),
-                f"-ExecutePythonScript={ue_dump_script.as_posix()}",
-                "-unattended",
-                "-nop4",
-                "-nosplash",
-                "-NoSound",
-                "-stdout",
-                "-FullStdOutLogOutput",
-                "-log",
-            ]
-
-            with stdout_path.open("w", encoding="utf-8", errors="ignore") as out_handle, stderr_path.open(
-                "w", encoding="utf-8", errors="ignore"
-            ) as err_handle:
-                proc = subprocess.run(
-                    cmd,
-                    env=env,
-                    stdout=out_handle,
-                    stderr=err_handle,
-                    cwd=str(project_root),
-                    timeout=60 * 60,
-                    check=False,
-                )
 
-            dump_payload: Dict[str, Any] = {}
-            if dump_out.exists():
-                try:
-                    dump_payload = json.loads(dump_out.read_text(encoding="utf-8"))
-                except Exception:
-                    dump_payload = {}
-            dump_status = str(dump_payload.get("status", "missing")) if isinstance(dump_payload, dict) else "missing"
-            return {
-                "cmd": cmd,
-                "returncode": int(proc.returncode),
-                "dump_payload": dump_payload,
-                "dump_status": dump_status,
-                "success": int(proc.returncode) == 0 and dump_status == "success",
-                "uproject": str(target_uproject.resolve()),
-            }
-
-        run_result = _run_dump(reference_uproject)
-        fallback_used = False
-        fallback_reason = ""
-        if (
-            not run_result["success"]
-            and source_uproject.exists()
-            and source_uproject.resolve() != reference_uproject.resolve()
-        ):
-            fallback_used = True
-            fallback_reason = "reference_project_missing_editor_tools_module_fallback_to_source_project"
-            run_result = _run_dump(source_uproject)
-
-        dump_status = str(run_result.get("dump_status", "missing"))
-        success = bool(run_result.get("success", False))
+        def _launch(target: Dict[str, Any], cancel: threading.Event | None = None) -> Dict[str, Any]:
+            return _run_dump(target, editor_cmd, ue_dump_script, env, guard, cancel)
+
+        if speculative and len(targets) > 1:
+            attempts = _run_speculative(targets, _launch)
+        else:
+            attempts = [_launch(targets[0])]
+            if not attempts[0]["success"] and len(targets) > 1:
+                attempts.append(_launch(targets[1]))
+
+        winner = next((a for a in attempts if a["success"]), None)
+        # On failure the reference attempt is the one reported; every attempt stays listed below.
+        run_result = winner or next(a for a in attempts if a["target"] == "reference")
+        success = winner is not None
+        fallback_reason = _fallback_reason(attempts, run_result)
+        if success:
+            atomic_write_text(dump_out, json.dumps(run_result["dump_payload"], ensure_ascii=True, indent=2))
+            if key is not None:
+                cache_info["entry"] = str(_cache_store(cache_root, key["fingerprint"], key["inputs"], run_result, fallback_reason).resolve())
+                cache_info["stored"] = True
 
         errors: List[Dict[str, Any]] = []
         if not success:
-            errors.append(
-                {
-                    "message": "reference setup dump failed",
-                    "exit_code": int(run_result.get("returncode", -1)),
-                    "dump_status": dump_status,
-                    "stdout_tail": _tail(stdout_path, 80),
-                    "stderr_tail": _tail(stderr_path, 80),
-                }
-            )
+            for attempt in attempts:
+                errors.append(
+                    {
+                        "message": f"reference setup dump failed ({attempt['target']} project)",
+                        "uproject": attempt["uproject"],
+                        "exit_code": attempt["returncode"],
+                        "abort_reason": attempt["abort_reason"],
+                        "repeated_error_line": attempt["repeated_error_line"],
+                        "dump_status": attempt["dump_status"],
+                        "stdout_tail": attempt["stdout_tail"],
+                        "stderr_tail": attempt["stderr_tail"],
+                    }
+                )
 
         finalize_report(
             report,
@@ -185,18 +392,21 @@ def main() -> int:
                 "enabled": True,
                 "source": "refference_deformer_dump",
                 "reference_uproject": str(reference_uproject.resolve()),
-                "capture_uproject": str(run_result.get("uproject", "")),
+                "capture_uproject": run_result["uproject"],
                 "dump_output": str(dump_out),
-                "dump_status": dump_status,
-                "fallback_used": fallback_used,
+                "dump_status": run_result["dump_status"],
+                "mode": "speculative" if speculative and len(targets) > 1 else "sequential",
+                "fallback_used": bool(fallback_reason),
                 "fallback_reason": fallback_reason,
-                "stdout_log": str(stdout_path.resolve()),
-                "stderr_log": str(stderr_path.resolve()),
-                "command": run_result.get("cmd", []),
+                "attempts": [_attempt_summary(a) for a in attempts],
+                "cache": cache_info,
+                "stdout_log": run_result["stdout_path"],
+                "stderr_log": run_result["stderr_path"],
+                "command": run_result["cmd"],
             },
             errors=errors,
         )
-        write_json(stage_report, report)
+        write_report(stage_report, report)
         return 0 if success else 1
 
     except Exception as exc:
@@ -206,7 +416,7 @@ def main() -> int:
             outputs={},
             errors=[{"message": str(exc), "traceback": traceback.format_exc()}],
         )
-        write_json(stage_report, report)
+        write_report(stage_report, report)
         return 1
 
 
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Launch and supervise UnrealEditor-Cmd processes from host Python (capture, dumps, orchestrator).
+
+`run_guarded_process` streams a command's stdout/stderr to files and kills the process tree on a
+timeout, a stall in output, an error line that keeps repeating, or an external cancel event.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+
+def resolve_editor_cmd(ue_editor_exe: str) -> Path:
+    exe_path = Path(ue_editor_exe)
+    if not exe_path.exists():
+        raise RuntimeError(f"UE editor executable not found: {exe_path}")
+
+    if exe_path.name.lower() == "unrealeditor-cmd.exe":
+        return exe_path
+    candidate = exe_path.with_name("UnrealEditor-Cmd.exe")
+    if candidate.exists():
+        return candidate
+    return exe_path
+
+
+def tail_lines(path: Path, max_lines: int = 120) -> List[str]:
+    if not path.exists():
+        return []
+    out: deque[str] = deque(maxlen=max_lines)
+    with path.open("r", encoding="utf-8", errors="ignore") as handle:
+        for line in handle:
+            out.append(line.rstrip("\n"))
+    return list(out)
+
+
+def detect_repeated_error_line(log_paths: List[Path], threshold: int) -> Tuple[str, int]:
+    if threshold <= 0:
+        return "", 0
+
+    pattern = re.compile(r"(error|exception|traceback|fatal|failed|assert)", flags=re.IGNORECASE)
+    counts: Dict[str, int] = {}
+    for log_path in log_paths:
+        for raw in tail_lines(log_path, max_lines=500):
+            line = raw.strip()
+            if not line or not pattern.search(line):
+                continue
+            counts[line] = counts.get(line, 0) + 1
+
+    if not counts:
+        return "", 0
+    line, count = max(counts.items(), key=lambda kv: kv[1])
+    if count >= threshold:
+        return line, count
+    return "", 0
+
+
+def kill_process_tree(pid: int) -> None:
+    if pid <= 0:
+        return
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/PID", str(pid), "/T", "/F"], check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+    try:
+        os.kill(pid, 9)
+    except OSError:
+        pass
+
+
+def run_guarded_process(
+    cmd: List[str],
+    stdout_path: Path,
+    stderr_path: Path,
+    timeout_minutes: int,
+    no_activity_minutes: int,
+    repeated_error_threshold: int,
+    env: Dict[str, str] | None = None,
+    poll_sec: float = 5.0,
+    cancel: threading.Event | None = None,
+) -> Dict[str, Any]:
+    stdout_path.parent.mkdir(parents=True, exist_ok=True)
+    stderr_path.parent.mkdir(parents=True, exist_ok=True)
+    stdout_path.unlink(missing_ok=True)
+    stderr_path.unlink(missing_ok=True)
+
+    start = time.monotonic()
+    last_activity = start
+    last_sizes = (0, 0)
+    abort_reason = ""
+    repeated_error_line = ""
+
+    with stdout_path.open("w", encoding="utf-8", errors="ignore") as out_handle, stderr_path.open("w", encoding="utf-8", errors="ignore") as err_handle:
+        proc = subprocess.Popen(cmd, stdout=out_handle, stderr=err_handle, env=env)
+
+        while proc.poll() is None:
+            if cancel is not None:
+                # Another caller (e.g. a speculative twin that already succeeded) may ask for an early stop.
+                if cancel.wait(poll_sec):
+                    abort_reason = "cancelled"
+                    kill_process_tree(proc.pid)
+                    break
+            else:
+                time.sleep(poll_sec)
+
+            std_size = stdout_path.stat().st_size if stdout_path.exists() else 0
+            err_size = stderr_path.stat().st_size if stderr_path.exists() else 0
+            if (std_size, err_size) != last_sizes:
+                last_sizes = (std_size, err_size)
+                last_activity = time.monotonic()
+
+            line, count = detect_repeated_error_line([stdout_path, stderr_path], repeated_error_threshold)
+            if line:
+                abort_reason = "repeated_error"
+                repeated_error_line = f"{line} (x{count})"
+                kill_process_tree(proc.pid)
+                break
+
+            now = time.monotonic()
+            if now - start > timeout_minutes * 60:
+                abort_reason = "timeout"
+                kill_process_tree(proc.pid)
+                break
+            if now - last_activity > no_activity_minutes * 60:
+                abort_reason = "no_activity"
+                kill_process_tree(proc.pid)
+                break
+
+        try:
+            exit_code = proc.wait(timeout=20)
+        except subprocess.TimeoutExpired:
+            kill_process_tree(proc.pid)
+            exit_code = -9
+
+    return {
+        "exit_code": int(exit_code),
+        "duration_sec": round(time.monotonic() - start, 3),
+        "abort_reason": abort_reason,
+        "repeated_error_line": repeated_error_line,
+        "stdout_path": str(stdout_path.resolve()),
+        "stderr_path": str(stderr_path.resolve()),
+        "stdout_tail": tail_lines(stdout_path, 80),
+        "stderr_tail": tail_lines(stderr_path, 80),
+    }
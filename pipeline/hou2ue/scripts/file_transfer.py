@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""File transfer layer: reflink, hardlink, copy_file_range, then buffered copy (first that works wins)."""
+
+from __future__ import annotations
+
+import errno
+import hashlib
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Dict, Set, Tuple
+
+METHOD_REFLINK = "reflink"
+METHOD_HARDLINK = "hardlink"
+METHOD_COPY_FILE_RANGE = "copy_file_range"
+METHOD_BUFFERED = "buffered"
+
+BUFFER_BYTES = 4 * 1024 * 1024
+COPY_FILE_RANGE_CHUNK = 64 * 1024 * 1024
+
+# linux/fs.h: _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+# (src_dev, dst_dev) pairs where a fast path already failed; avoids one failing syscall per file.
+_REFLINK_UNSUPPORTED: Set[Tuple[int, int]] = set()
+_COPY_FILE_RANGE_UNSUPPORTED: Set[Tuple[int, int]] = set()
+
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTTY,
+    errno.EPERM,
+    errno.EBADF,
+    getattr(errno, "EOPNOTSUPP", errno.EINVAL),
+    getattr(errno, "ENOTSUP", errno.EINVAL),
+}
+
+
+def _device_pair(src: Path, dst: Path) -> Tuple[int, int]:
+    return int(os.stat(src).st_dev), int(os.stat(dst.parent).st_dev)
+
+
+def _try_reflink(src: Path, tmp: Path, devices: Tuple[int, int]) -> bool:
+    if not sys.platform.startswith("linux") or devices in _REFLINK_UNSUPPORTED:
+        return False
+    import fcntl
+
+    try:
+        with src.open("rb") as reader, tmp.open("wb") as writer:
+            fcntl.ioctl(writer.fileno(), _FICLONE, reader.fileno())
+        return True
+    except OSError as exc:
+        tmp.unlink(missing_ok=True)
+        if exc.errno in _UNSUPPORTED_ERRNOS:
+            _REFLINK_UNSUPPORTED.add(devices)
+        return False
+
+
+def _try_copy_file_range(src: Path, tmp: Path, devices: Tuple[int, int]) -> int:
+    """Kernel-side copy; returns bytes written, or -1 when the fast path is unavailable."""
+    if not hasattr(os, "copy_file_range") or devices in _COPY_FILE_RANGE_UNSUPPORTED:
+        return -1
+    written = 0
+    try:
+        with src.open("rb") as reader, tmp.open("wb") as writer:
+            while True:
+                count = os.copy_file_range(reader.fileno(), writer.fileno(), COPY_FILE_RANGE_CHUNK)
+                if count == 0:
+                    break
+                written += count
+        return written
+    except OSError as exc:
+        tmp.unlink(missing_ok=True)
+        if exc.errno in _UNSUPPORTED_ERRNOS:
+            _COPY_FILE_RANGE_UNSUPPORTED.add(devices)
+        return -1
+
+
+def _buffered_copy(src: Path, tmp: Path, digest: Any = None) -> int:
+    written = 0
+    with src.open("rb") as reader, tmp.open("wb") as writer:
+        while True:
+            chunk = reader.read(BUFFER_BYTES)
+            if not chunk:
+                break
+            if digest is not None:
+                digest.update(chunk)
+            writer.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def transfer_file(
+    src: Path,
+    dst: Path,
+    allow_hardlink: bool = False,
+    allow_fast_copy: bool = True,
+    hash_buffered: bool = False,
+) -> Dict[str, Any]:
+    """Materialize src at dst through a temp file + os.replace, so dst never holds a partial file.
+
+    Hardlinks share the inode with src and are only safe when neither side is later modified in
+    place (true for backups and for targets that are always replaced, never rewritten).
+    Returns {"method", "bytes", "sha256"}; sha256 is set only for buffered copies with
+    hash_buffered=True, since fast paths never move the bytes through Python.
+    """
+    src = Path(src)
+    dst = Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f"{dst.name}.hou2ue_tmp")
+    tmp.unlink(missing_ok=True)
+    size = int(os.stat(src).st_size)
+
+    try:
+        if allow_hardlink:
+            try:
+                os.link(src, tmp)
+                os.replace(tmp, dst)
+                return {"method": METHOD_HARDLINK, "bytes": 0, "sha256": ""}
+            except OSError:
+                tmp.unlink(missing_ok=True)
+
+        method = METHOD_BUFFERED
+        written = -1
+        sha256 = ""
+        if allow_fast_copy:
+            devices = _device_pair(src, dst)
+            if _try_reflink(src, tmp, devices):
+                method = METHOD_REFLINK
+                written = size
+            else:
+                written = _try_copy_file_range(src, tmp, devices)
+                if written >= 0:
+                    method = METHOD_COPY_FILE_RANGE
+        if written < 0:
+            digest = hashlib.sha256() if hash_buffered else None
+            written = _buffered_copy(src, tmp, digest)
+            sha256 = digest.hexdigest() if digest is not None else ""
+
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+        return {"method": method, "bytes": written, "sha256": sha256}
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def copy_function(src: str, dst: str) -> str:
+    """Drop-in `copy_function` for shutil.copytree that goes through transfer_file (no hardlinks)."""
+    transfer_file(Path(src), Path(dst))
+    return dst
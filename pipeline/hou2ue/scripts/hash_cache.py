@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Persistent sha256 cache keyed by (absolute path, size, mtime_ns, inode).
+
+Stored as a JSON sidecar under the workspace out-root so it survives across runs. A file is
+re-hashed only when one of the stat fields changed; everything else is served from cache.
+Processes sharing one cache file (e.g. parallel train shards) merge on save: under a file lock,
+the entries this instance recorded are laid over whatever is on disk at that moment.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Set, Tuple
+
+from common import atomic_write_text, file_lock, sha256_file, utc_now_iso
+
+CACHE_VERSION = 1
+
+
+def _stat_key(st: os.stat_result) -> Tuple[int, int, int]:
+    return int(st.st_size), int(st.st_mtime_ns), int(st.st_ino)
+
+
+class HashCache:
+    """Thread-safe sha256 cache; call save() once the run is done."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._recorded: Set[str] = set()
+        self._entries = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+        if not isinstance(payload, dict) or int(payload.get("version", 0)) != CACHE_VERSION:
+            return {}
+        entries = payload.get("entries", {})
+        if not isinstance(entries, dict):
+            return {}
+        return {str(k): v for k, v in entries.items() if isinstance(v, dict)}
+
+    def lookup(self, path: Path, st: os.stat_result | None = None) -> str:
+        """Return the cached digest if the stat key still matches, else ''. Never hashes."""
+        key = str(Path(path).resolve())
+        st = st or os.stat(key)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return ""
+        if (int(entry.get("size", -1)), int(entry.get("mtime_ns", -1)), int(entry.get("inode", -1))) != _stat_key(st):
+            return ""
+        return str(entry.get("sha256", ""))
+
+    def record(self, path: Path, digest: str, st: os.stat_result | None = None) -> None:
+        key = str(Path(path).resolve())
+        st = st or os.stat(key)
+        size, mtime_ns, inode = _stat_key(st)
+        with self._lock:
+            self._entries[key] = {"size": size, "mtime_ns": mtime_ns, "inode": inode, "sha256": digest}
+            self._recorded.add(key)
+
+    def sha256(self, path: Path) -> str:
+        st = os.stat(path)
+        cached = self.lookup(path, st)
+        if cached:
+            with self._lock:
+                self.hits += 1
+            return cached
+
+        digest = sha256_file(Path(path))
+        after = os.stat(path)
+        with self._lock:
+            self.misses += 1
+        # Only remember the digest if the file did not change while it was being read.
+        if _stat_key(after) == _stat_key(st):
+            self.record(path, digest, after)
+        return digest
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": str(self.path.resolve()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._recorded:
+                return
+            with file_lock(self.path):
+                entries = self._load()
+                entries.update({key: self._entries[key] for key in self._recorded})
+                payload = {"version": CACHE_VERSION, "updated_at": utc_now_iso(), "entries": entries}
+                atomic_write_text(self.path, json.dumps(payload, ensure_ascii=True, separators=(",", ":")))
+            self._entries = entries
+            self._recorded.clear()
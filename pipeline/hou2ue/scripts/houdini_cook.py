@@ -21,14 +21,16 @@ from typing import Any, Dict, List, Tuple
 from common import (
     ConfigError,
     finalize_report,
-    load_config,
     make_report,
     profile_data,
+    profile_span,
     require_nested,
     stage_report_path,
     timestamp_compact,
     write_json,
 )
+from pipeline_config import load_pipeline_config
+from report_store import write_report
 
 
 def _log(msg: str) -> None:
@@ -204,7 +206,8 @@ def main() -> int:
 
     try:
         _log(f"start profile={args.profile} run_dir={run_dir}")
-        cfg = load_config(args.config)
+        config = load_pipeline_config(args.config, run_dir)
+        cfg = config.raw
         _log("config loaded")
         profile_cfg = profile_data(cfg, args.profile)
 
@@ -289,18 +292,19 @@ def main() -> int:
             for rest_path in rest_nodes:
                 _log(f"rest cook start: {rest_path}")
                 rest_node = _require_node(hou, rest_path)
-                start = time.perf_counter()
-                try:
-                    rest_node.cook(force=True)
-                    rest_durations[rest_path] = round(time.perf_counter() - start, 3)
-                    _log(f"rest cook done: {rest_path} ({rest_durations[rest_path]}s)")
-                except Exception as exc:
-                    if can_reuse:
-                        warnings.append(f"REST cook failed but reuse is enabled ({rest_path}): {exc}")
+                with profile_span(f"rest_cook:{rest_path}"):
+                    start = time.perf_counter()
+                    try:
+                        rest_node.cook(force=True)
                         rest_durations[rest_path] = round(time.perf_counter() - start, 3)
-                        _log(f"rest cook failed (reuse fallback): {rest_path} ({rest_durations[rest_path]}s) {exc}")
-                    else:
-                        raise
+                        _log(f"rest cook done: {rest_path} ({rest_durations[rest_path]}s)")
+                    except Exception as exc:
+                        if can_reuse:
+                            warnings.append(f"REST cook failed but reuse is enabled ({rest_path}): {exc}")
+                            rest_durations[rest_path] = round(time.perf_counter() - start, 3)
+                            _log(f"rest cook failed (reuse fallback): {rest_path} ({rest_durations[rest_path]}s) {exc}")
+                        else:
+                            raise
 
         if can_reuse and skip_pdg_when_reusing:
             warnings.append(
@@ -309,19 +313,20 @@ def main() -> int:
             _log("pdg cook skipped (reuse enabled)")
         else:
             _log("pdg cook start")
-            pdg_start = time.perf_counter()
-            try:
-                _cook_pdg(pdg_root_node)
-                pdg_duration = round(time.perf_counter() - pdg_start, 3)
-                did_cook_pdg = True
-                _log(f"pdg cook done ({pdg_duration}s)")
-            except Exception as exc:
-                pdg_duration = round(time.perf_counter() - pdg_start, 3)
-                if can_reuse:
-                    warnings.append(f"PDG cook failed but reuse is enabled: {exc}")
-                    _log(f"pdg cook failed (reuse fallback) ({pdg_duration}s) {exc}")
-                else:
-                    raise
+            with profile_span("pdg_cook"):
+                pdg_start = time.perf_counter()
+                try:
+                    _cook_pdg(pdg_root_node)
+                    pdg_duration = round(time.perf_counter() - pdg_start, 3)
+                    did_cook_pdg = True
+                    _log(f"pdg cook done ({pdg_duration}s)")
+                except Exception as exc:
+                    pdg_duration = round(time.perf_counter() - pdg_start, 3)
+                    if can_reuse:
+                        warnings.append(f"PDG cook failed but reuse is enabled: {exc}")
+                        _log(f"pdg cook failed (reuse fallback) ({pdg_duration}s) {exc}")
+                    else:
+                        raise
 
         output_groups_all = _collect_output_groups(output_root)
         output_groups_exact = _filter_groups_by_prefix(output_groups_all, out_prefix)
@@ -472,7 +477,7 @@ def main() -> int:
             },
             errors=errors,
         )
-        write_json(report_path, report)
+        write_report(report_path, report)
         _log(f"done status={status} report={report_path}")
         return 0 if status == "success" else 1
 
@@ -489,7 +494,7 @@ def main() -> int:
                 }
             ],
         )
-        write_json(report_path, report)
+        write_report(report_path, report)
         return 1
 
 
@@ -12,7 +12,6 @@ from __future__ import annotations
 import argparse
 import csv
 import json
-import os
 import re
 import shutil
 import subprocess
@@ -24,13 +23,15 @@ from common import (
     apply_template,
     ConfigError,
     finalize_report,
-    load_config,
     load_json,
     make_report,
     require_nested,
     stage_report_path,
     write_json,
 )
+from file_transfer import transfer_file
+from pipeline_config import load_pipeline_config
+from report_store import write_report
 
 
 def parse_args() -> argparse.Namespace:
@@ -61,43 +62,6 @@ def _find_hython(cfg: Dict[str, Any]) -> Path:
     return hython
 
 
-def _coord_config(cfg: Dict[str, Any]) -> Dict[str, Any]:
-    houdini_cfg = cfg.get("houdini", {})
-    if not isinstance(houdini_cfg, dict):
-        houdini_cfg = {}
-    coord_cfg = houdini_cfg.get("coord_system", {})
-    if not isinstance(coord_cfg, dict):
-        coord_cfg = {}
-
-    matrix = coord_cfg.get("matrix_3x3", [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
-    if (
-        not isinstance(matrix, list)
-        or len(matrix) != 3
-        or any(not isinstance(row, list) or len(row) != 3 for row in matrix)
-    ):
-        raise RuntimeError("houdini.coord_system.matrix_3x3 must be a 3x3 array")
-
-    translation = coord_cfg.get("translation_offset", [0.0, 0.0, 0.0])
-    if not isinstance(translation, list) or len(translation) != 3:
-        raise RuntimeError("houdini.coord_system.translation_offset must be [x,y,z]")
-
-    validate_cfg = coord_cfg.get("validate", {})
-    if not isinstance(validate_cfg, dict):
-        validate_cfg = {}
-
-    return {
-        "mode": str(coord_cfg.get("mode", "explicit") or "explicit"),
-        "houdini_unit": str(coord_cfg.get("houdini_unit", "m") or "m"),
-        "ue_unit": str(coord_cfg.get("ue_unit", "cm") or "cm"),
-        "scale_factor": float(coord_cfg.get("scale_factor", 100.0)),
-        "matrix_3x3": [[float(v) for v in row] for row in matrix],
-        "translation_offset": [float(v) for v in translation],
-        "validate_enabled": bool(validate_cfg.get("enabled", True)),
-        "validate_tolerance": float(validate_cfg.get("tolerance", 0.15)),
-        "validate_fail_on_mismatch": bool(validate_cfg.get("fail_on_mismatch", True)),
-    }
-
-
 def _parse_coord_payload(stdout_text: str) -> Dict[str, Any]:
     marker = "__HOU2UE_COORD__"
     for line in stdout_text.splitlines():
@@ -283,14 +247,9 @@ def _extract_source_frame(path: Path) -> int:
     return -1
 
 
-def _hardlink_or_copy(src: Path, dst: Path) -> None:
-    dst.parent.mkdir(parents=True, exist_ok=True)
-    if dst.exists():
-        dst.unlink()
-    try:
-        os.link(src, dst)
-    except Exception:
-        shutil.copy2(src, dst)
+def _hardlink_or_copy(src: Path, dst: Path) -> str:
+    # Sequence frames are read-only inputs for hython, so sharing the inode is safe.
+    return str(transfer_file(src, dst, allow_hardlink=True)["method"])
 
 
 def _build_sequence_files(source_files: List[Path], seq_dir: Path) -> Tuple[str, int]:
@@ -659,7 +618,8 @@ def main() -> int:
     )
 
     try:
-        cfg = load_config(args.config)
+        config = load_pipeline_config(args.config, run_dir)
+        cfg = config.raw
         run_manifest_path = run_dir / "manifests" / "run_manifest.json"
         if not run_manifest_path.exists():
             raise RuntimeError(f"Missing run_manifest.json: {run_manifest_path}")
@@ -676,7 +636,7 @@ def main() -> int:
 
         stitched_abc = export_dir / f"GC_upperBodyFlesh_{args.profile}.abc"
         hython = _find_hython(cfg)
-        coord_cfg = _coord_config(cfg)
+        coord_cfg = config.coord_system.as_dict()
         coord_entries: Dict[str, Any] = {}
 
         flesh_source_mode = str(flesh_source.get("mode", "pdg_bgeo"))
@@ -724,7 +684,7 @@ def main() -> int:
 
             if all(str(p).lower().endswith(".abc") for p in tissue_files):
                 if len(tissue_files) == 1:
-                    shutil.copy2(tissue_files[0], stitched_abc)
+                    transfer_file(tissue_files[0], stitched_abc)
                     export_mode = "copy_single_abc"
                 else:
                     raise RuntimeError(
@@ -835,7 +795,7 @@ def main() -> int:
             },
             errors=[],
         )
-        write_json(report_path, report)
+        write_report(report_path, report)
         return 0
 
     except (ConfigError, RuntimeError, Exception) as exc:
@@ -850,7 +810,7 @@ def main() -> int:
                 }
             ],
         )
-        write_json(report_path, report)
+        write_report(report_path, report)
         return 1
 
 
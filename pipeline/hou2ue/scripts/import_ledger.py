@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Import ledger: remember which source fingerprint each UE asset was last imported from.
+
+An entry is keyed by destination asset and holds the source fingerprint (path, size, mtime_ns,
+sha256), the import options key and the stat of the saved .uasset. A re-import is skipped only
+when the source content (sha256 + size) and options match and the .uasset on disk is still the
+one written by that import, so a baseline sync or manual re-import invalidates the entry.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from common import atomic_write_text, utc_now_iso
+
+LEDGER_VERSION = 1
+
+
+def source_fingerprint(path: Path, hash_file: Callable[[Path], str]) -> Dict[str, Any]:
+    st = os.stat(path)
+    return {
+        "path": str(Path(path).resolve()),
+        "size": int(st.st_size),
+        "mtime_ns": int(st.st_mtime_ns),
+        "sha256": hash_file(Path(path)),
+    }
+
+
+def _file_stat(path: Path) -> Dict[str, int]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {}
+    return {"size": int(st.st_size), "mtime_ns": int(st.st_mtime_ns)}
+
+
+class ImportLedger:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        if not isinstance(payload, dict) or int(payload.get("version", 0)) != LEDGER_VERSION:
+            return
+        entries = payload.get("entries", {})
+        if isinstance(entries, dict):
+            self._entries = {str(k): v for k, v in entries.items() if isinstance(v, dict)}
+
+    def check(self, destination: str, fingerprint: Dict[str, Any], options_key: str, asset_file: Path) -> str:
+        """Return '' when the import can be skipped, else the reason it cannot."""
+        entry = self._entries.get(destination)
+        if entry is None:
+            return "not_in_ledger"
+        source = entry.get("source", {}) if isinstance(entry.get("source"), dict) else {}
+        if str(source.get("sha256", "")) != fingerprint["sha256"] or int(source.get("size", -1)) != fingerprint["size"]:
+            return "source_changed"
+        if str(entry.get("options_key", "")) != options_key:
+            return "options_changed"
+        asset_stat = _file_stat(asset_file)
+        if not asset_stat:
+            return "asset_missing"
+        if asset_stat != entry.get("asset_stat"):
+            return "asset_modified"
+        return ""
+
+    def record(self, destination: str, fingerprint: Dict[str, Any], options_key: str, asset_file: Path) -> None:
+        """Call after the asset was saved, so asset_stat matches the file on disk."""
+        self._entries[destination] = {
+            "source": dict(fingerprint),
+            "options_key": options_key,
+            "asset_file": str(asset_file),
+            "asset_stat": _file_stat(asset_file),
+            "imported_at": utc_now_iso(),
+        }
+        self._dirty = True
+
+    def forget(self, destination: str) -> None:
+        if self._entries.pop(destination, None) is not None:
+            self._dirty = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": str(self.path.resolve()), "entries": len(self._entries)}
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        payload = {"version": LEDGER_VERSION, "updated_at": utc_now_iso(), "entries": self._entries}
+        atomic_write_text(self.path, json.dumps(payload, ensure_ascii=True, indent=2))
+        self._dirty = False
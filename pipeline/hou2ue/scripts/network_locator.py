@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Locate trained ML Deformer network files (.nmn/.ubnne) with a persistent directory-mtime index.
+
+Every directory under the roots is still visited and stat'ed on each snapshot: a directory's mtime
+only reflects its own entries, so an unchanged mtime says nothing about its subtree. What the index
+saves is the listing: a directory is re-read with scandir only when its mtime changed (an entry was
+added, removed or renamed); otherwise its cached subdirectory and candidate-file lists are reused.
+Known candidate files are always re-stat'ed, which also catches networks rewritten in place.
+The snapshot has the same shape and content as a full os.walk over the roots.
+
+Parallel train shards share one index file. save() merges under a file lock: this index's entries
+replace those for the roots it walked, and entries for other roots on disk are kept.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from common import atomic_write_text, file_lock
+
+INDEX_VERSION = 1
+NETWORK_SUFFIXES: Tuple[str, ...] = (".nmn", ".ubnne")
+
+# A directory modified within this window of being listed may change again within the same
+# mtime tick, so it is always re-listed next time.
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def network_roots(project_dir: Path) -> List[Path]:
+    return [project_dir / "Intermediate", project_dir / "Saved", project_dir / "Content"]
+
+
+class NetworkFileIndex:
+    def __init__(self, index_path: Path | None = None, suffixes: Tuple[str, ...] = NETWORK_SUFFIXES) -> None:
+        self.index_path = index_path
+        self.suffixes = tuple(s.lower() for s in suffixes)
+        self.dirs_listed = 0
+        self.dirs_reused = 0
+        self._roots: List[str] = []
+        self._dirs = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self.index_path is None or not self.index_path.exists():
+            return {}
+        try:
+            payload = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+        if not isinstance(payload, dict) or int(payload.get("version", 0)) != INDEX_VERSION:
+            return {}
+        if [s.lower() for s in payload.get("suffixes", [])] != list(self.suffixes):
+            return {}
+        dirs = payload.get("dirs", {})
+        if not isinstance(dirs, dict):
+            return {}
+        return {str(k): v for k, v in dirs.items() if isinstance(v, dict)}
+
+    def _list_dir(self, path: str, mtime_ns: int) -> Dict[str, Any]:
+        subdirs: List[str] = []
+        files: List[str] = []
+        scanned_ns = time.time_ns()
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    # Mirror os.walk(followlinks=False): symlinked dirs are listed but not entered.
+                    if not entry.is_symlink():
+                        subdirs.append(entry.name)
+                elif entry.name.lower().endswith(self.suffixes):
+                    files.append(entry.name)
+        self.dirs_listed += 1
+        return {"mtime_ns": mtime_ns, "scanned_ns": scanned_ns, "subdirs": subdirs, "files": files}
+
+    def snapshot(self, roots: Iterable[Path]) -> Dict[str, float]:
+        """Return {path: st_mtime} for every network file under roots."""
+        snap: Dict[str, float] = {}
+        visited: Dict[str, Dict[str, Any]] = {}
+        self._roots = [str(root) for root in roots]
+        stack = list(reversed(self._roots))
+        while stack:
+            path = stack.pop()
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+
+            entry = self._dirs.get(path)
+            fresh = (
+                entry is not None
+                and int(entry.get("mtime_ns", -1)) == st.st_mtime_ns
+                and int(entry.get("scanned_ns", 0)) - st.st_mtime_ns > _RACY_WINDOW_NS
+            )
+            if fresh:
+                self.dirs_reused += 1
+            else:
+                try:
+                    entry = self._list_dir(path, st.st_mtime_ns)
+                except OSError:
+                    continue
+            visited[path] = entry
+
+            for name in entry.get("files", []):
+                file_path = os.path.join(path, name)
+                try:
+                    snap[file_path] = os.stat(file_path).st_mtime
+                except OSError:
+                    continue
+            for name in reversed(entry.get("subdirs", [])):
+                stack.append(os.path.join(path, name))
+
+        self._dirs = visited
+        return snap
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "index_path": str(self.index_path) if self.index_path is not None else "",
+            "dirs_listed": self.dirs_listed,
+            "dirs_reused": self.dirs_reused,
+            "dirs_indexed": len(self._dirs),
+        }
+
+    def save(self) -> None:
+        if self.index_path is None:
+            return
+        with file_lock(self.index_path):
+            # The last snapshot is authoritative under its roots (directories it did not visit are
+            # gone); whatever another writer indexed elsewhere is kept.
+            dirs = {path: entry for path, entry in self._load().items() if not self._under_roots(path)}
+            dirs.update(self._dirs)
+            payload = {"version": INDEX_VERSION, "suffixes": list(self.suffixes), "dirs": dirs}
+            atomic_write_text(self.index_path, json.dumps(payload, ensure_ascii=True, separators=(",", ":")))
+
+    def _under_roots(self, path: str) -> bool:
+        return any(path == root or path.startswith(root.rstrip(os.sep) + os.sep) for root in self._roots)
@@ -12,12 +12,13 @@ from typing import Any, Dict, List
 from common import (
     ConfigError,
     finalize_report,
-    load_config,
     make_report,
     require_nested,
     stage_report_path,
     write_json,
 )
+from pipeline_config import load_pipeline_config
+from report_store import write_report
 
 
 def _require_node(hou_mod: Any, node_path: str):
@@ -69,7 +70,8 @@ def main() -> int:
     )
 
     try:
-        cfg = load_config(args.config)
+        config = load_pipeline_config(args.config, run_dir)
+        cfg = config.raw
         hip_path = Path(require_nested(cfg, ("paths", "hip_file")))
         if not hip_path.exists():
             raise RuntimeError(f"HIP file is missing: {hip_path}")
@@ -154,7 +156,7 @@ def main() -> int:
             },
             errors=[],
         )
-        write_json(report_path, report)
+        write_report(report_path, report)
         return 0
 
     except (ConfigError, RuntimeError, Exception) as exc:
@@ -169,7 +171,7 @@ def main() -> int:
                 }
             ],
         )
-        write_json(report_path, report)
+        write_report(report_path, report)
         return 1
 
 
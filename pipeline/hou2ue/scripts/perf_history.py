@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""Cross-run performance history: ingest stage timings and key metrics into SQLite, report trends and regressions."""
+
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import json
+import sqlite3
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from common import utc_now_iso
+
+SCHEMA_VERSION = 1
+
+# Metrics where a larger value is better; everything else (times, bytes, latency) is lower-is-better.
+HIGHER_IS_BETTER = "higher"
+LOWER_IS_BETTER = "lower"
+
+# Image-quality metrics from gt_compare outputs.metrics; counts such as frame_count_compared are not quality.
+QUALITY_METRICS = (
+    "ssim_mean",
+    "ssim_p05",
+    "psnr_mean",
+    "psnr_min",
+    "edge_iou_mean",
+    "body_roi_ssim_mean",
+    "body_roi_ssim_p05",
+    "body_roi_psnr_mean",
+    "body_roi_psnr_min",
+    "color_ssim_mean",
+    "color_ssim_p05",
+    "color_psnr_mean",
+    "color_psnr_min",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    profile TEXT NOT NULL,
+    run_dir TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    stage TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    direction TEXT NOT NULL,
+    PRIMARY KEY (run_id, stage, metric)
+);
+CREATE INDEX IF NOT EXISTS runs_profile_started ON runs(profile, started_at);
+"""
+
+
+def history_db_path(out_root: Path) -> Path:
+    return Path(out_root) / "history" / "perf_history.sqlite"
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=30.0)
+    conn.executescript(_SCHEMA)
+    conn.execute("INSERT OR IGNORE INTO meta(key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+    return conn
+
+
+def _parse_iso(value: Any) -> _dt.datetime | None:
+    text = str(value or "").strip()
+    if not text:
+        return None
+    try:
+        return _dt.datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _num(value: Any) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def extract_metrics(report: Dict[str, Any]) -> List[Tuple[str, float, str]]:
+    """(metric, value, direction) rows for one stage report; every stage gets at least wall_sec."""
+    rows: List[Tuple[str, float, str]] = []
+    started = _parse_iso(report.get("started_at"))
+    ended = _parse_iso(report.get("ended_at"))
+    if started is not None and ended is not None:
+        rows.append(("wall_sec", max(0.0, (ended - started).total_seconds()), LOWER_IS_BETTER))
+
+    outputs = report.get("outputs", {}) if isinstance(report.get("outputs"), dict) else {}
+
+    durations = outputs.get("durations_sec", {}) if isinstance(outputs.get("durations_sec"), dict) else {}
+    pdg = _num(durations.get("pdg_cook"))
+    if pdg is not None:
+        rows.append(("pdg_cook_sec", pdg, LOWER_IS_BETTER))
+    rest = durations.get("rest_nodes", {}) if isinstance(durations.get("rest_nodes"), dict) else {}
+    if rest:
+        rows.append(("rest_cook_sec", sum(v for v in (_num(x) for x in rest.values()) if v is not None), LOWER_IS_BETTER))
+
+    for row in outputs.get("results", []) if isinstance(outputs.get("results"), list) else []:
+        if isinstance(row, dict) and _num(row.get("duration_sec")) is not None and row.get("key"):
+            rows.append((f"train_sec:{row['key']}", float(row["duration_sec"]), LOWER_IS_BETTER))
+
+    metrics = outputs.get("metrics", {}) if isinstance(outputs.get("metrics"), dict) else {}
+    for name in QUALITY_METRICS:
+        if _num(metrics.get(name)) is not None:
+            rows.append((name, float(metrics[name]), HIGHER_IS_BETTER))
+
+    for name in ("total_main_mem_bytes", "total_gpu_mem_bytes"):
+        if _num(outputs.get(name)) is not None:
+            rows.append((name, float(outputs[name]), LOWER_IS_BETTER))
+    for row in outputs.get("latency", []) if isinstance(outputs.get("latency"), list) else []:
+        if isinstance(row, dict) and row.get("success"):
+            asset = str(row.get("asset_path", "")).rsplit("/", 1)[-1]
+            anim = str(row.get("anim_sequence", "")).rsplit("/", 1)[-1]
+            rows.append((f"latency_p95_ms:{asset}:{anim}", float(row.get("p95_ms", 0.0)), LOWER_IS_BETTER))
+
+    # Sub-step spans (the root span duplicates wall_sec); repeated paths are summed.
+    span_totals: Dict[str, float] = {}
+    for span in outputs.get("profile_spans", []) if isinstance(outputs.get("profile_spans"), list) else []:
+        if isinstance(span, dict) and int(span.get("depth", 0)) > 0 and _num(span.get("wall_sec")) is not None:
+            path = str(span.get("path", "")).split("/", 1)[-1]
+            span_totals[path] = span_totals.get(path, 0.0) + float(span["wall_sec"])
+    for path, wall in sorted(span_totals.items()):
+        rows.append((f"span_sec:{path}", wall, LOWER_IS_BETTER))
+    return rows
+
+
+def ingest_run(
+    conn: sqlite3.Connection,
+    run_dir: Path,
+    profile: str,
+    started_at: str,
+    status: str,
+    stage_reports: Dict[str, Dict[str, Any] | None],
+) -> Dict[str, Any]:
+    """Record one run; re-ingesting the same run_dir replaces its rows, so the store stays one row set per run."""
+    run_id = Path(run_dir).resolve().name
+    rows: List[Tuple[str, str, str, float, str]] = []
+    for stage, report in stage_reports.items():
+        if not isinstance(report, dict):
+            continue
+        for metric, value, direction in extract_metrics(report):
+            rows.append((run_id, stage, metric, value, direction))
+
+    with conn:
+        conn.execute("DELETE FROM metrics WHERE run_id = ?", (run_id,))
+        conn.execute(
+            "INSERT OR REPLACE INTO runs(run_id, profile, run_dir, started_at, status, ingested_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (run_id, profile, str(Path(run_dir).resolve()), started_at or utc_now_iso(), status, utc_now_iso()),
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO metrics(run_id, stage, metric, value, direction) VALUES (?, ?, ?, ?, ?)", rows
+        )
+    return {"run_id": run_id, "metric_count": len(rows)}
+
+
+def recent_runs(conn: sqlite3.Connection, profile: str, last_n: int) -> List[str]:
+    cur = conn.execute(
+        "SELECT run_id FROM runs WHERE profile = ? ORDER BY started_at DESC, run_id DESC LIMIT ?",
+        (profile, max(1, int(last_n))),
+    )
+    return [row[0] for row in cur.fetchall()][::-1]
+
+
+def metric_series(conn: sqlite3.Connection, run_ids: List[str]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """{(stage, metric): {"direction", "values": {run_id: value}}} over the given runs."""
+    series: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    if not run_ids:
+        return series
+    marks = ",".join("?" for _ in run_ids)
+    cur = conn.execute(f"SELECT run_id, stage, metric, value, direction FROM metrics WHERE run_id IN ({marks})", run_ids)
+    for run_id, stage, metric, value, direction in cur.fetchall():
+        entry = series.setdefault((stage, metric), {"direction": direction, "values": {}})
+        entry["values"][run_id] = float(value)
+    return series
+
+
+def find_regressions(
+    conn: sqlite3.Connection,
+    profile: str,
+    last_n: int = 10,
+    time_regression_pct: float = 30.0,
+    quality_regression_pct: float = 1.0,
+) -> Dict[str, Any]:
+    """Compare the newest run of a profile against the median of the previous runs in the window."""
+    run_ids = recent_runs(conn, profile, last_n)
+    result: Dict[str, Any] = {"profile": profile, "runs": run_ids, "regressions": []}
+    if len(run_ids) < 2:
+        return result
+
+    current, previous = run_ids[-1], run_ids[:-1]
+    for (stage, metric), entry in sorted(metric_series(conn, run_ids).items()):
+        values = entry["values"]
+        history = [values[r] for r in previous if r in values]
+        if current not in values or not history:
+            continue
+        baseline = statistics.median(history)
+        if abs(baseline) < 1e-9:
+            continue
+        change_pct = 100.0 * (values[current] - baseline) / abs(baseline)
+        if entry["direction"] == HIGHER_IS_BETTER:
+            regressed = change_pct < -quality_regression_pct
+        else:
+            regressed = change_pct > time_regression_pct
+        if regressed:
+            result["regressions"].append(
+                {
+                    "stage": stage,
+                    "metric": metric,
+                    "direction": entry["direction"],
+                    "run_id": current,
+                    "value": round(values[current], 6),
+                    "baseline_median": round(baseline, 6),
+                    "change_pct": round(change_pct, 3),
+                    "history_runs": len(history),
+                }
+            )
+    return result
+
+
+def _format_trend(conn: sqlite3.Connection, profile: str, last_n: int) -> str:
+    run_ids = recent_runs(conn, profile, last_n)
+    if not run_ids:
+        return f"No runs recorded for profile '{profile}'."
+    series = metric_series(conn, run_ids)
+    lines = [f"profile={profile} runs={len(run_ids)} (oldest -> newest)"]
+    for run_index, run_id in enumerate(run_ids):
+        lines.append(f"  [{run_index}] {run_id}")
+    lines.append("")
+    lines.append("stage wall_sec:")
+    for (stage, metric), entry in sorted(series.items()):
+        if metric != "wall_sec":
+            continue
+        cells = [f"{entry['values'][r]:9.1f}" if r in entry["values"] else f"{'-':>9}" for r in run_ids]
+        lines.append(f"  {stage:<24}" + " ".join(cells))
+    return "\n".join(lines)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Show per-stage wall-time trends and regressions across runs")
+    parser.add_argument("--out-root", required=True)
+    parser.add_argument("--profile", required=True, choices=["smoke", "full"])
+    parser.add_argument("--last", type=int, default=10, help="Number of most recent runs to consider")
+    parser.add_argument("--time-regression-pct", type=float, default=30.0)
+    parser.add_argument("--quality-regression-pct", type=float, default=1.0)
+    parser.add_argument("--json", action="store_true", help="Print the regression result as JSON")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    db_path = history_db_path(Path(args.out_root))
+    if not db_path.exists():
+        print(f"No perf history at {db_path}", file=sys.stderr)
+        return 1
+
+    conn = connect(db_path)
+    try:
+        result = find_regressions(
+            conn,
+            args.profile,
+            last_n=args.last,
+            time_regression_pct=args.time_regression_pct,
+            quality_regression_pct=args.quality_regression_pct,
+        )
+        if args.json:
+            print(json.dumps(result, ensure_ascii=True, indent=2))
+        else:
+            print(_format_trend(conn, args.profile, args.last))
+            print("")
+            if result["regressions"]:
+                print(f"regressions in {result['runs'][-1]}:")
+                for item in result["regressions"]:
+                    print(
+                        f"  {item['stage']}.{item['metric']}: {item['value']:g} vs median {item['baseline_median']:g}"
+                        f" ({item['change_pct']:+.1f}%)"
+                    )
+            else:
+                print("no regressions")
+    finally:
+        conn.close()
+    return 1 if args.fail_on_regression and result["regressions"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Typed pipeline config, cached per run as run_dir/manifests/config.resolved.
+
+`load_pipeline_config` compiles the JSON-compatible YAML into slotted dataclasses. Only the typed
+sections (houdini.coord_system, ue.training determinism/parallel, ue.ground_truth compare) are
+validated and defaulted here, once per run; their defaults live only in the `_compile_*` functions.
+With a run_dir, the compiled object is pickled next to the run manifests, and later stages,
+including hython and UE Python, unpickle it as long as the source file is unchanged.
+
+Everything else has no typed view and is read through `PipelineConfig.raw` / `PipelineConfig.get`,
+with defaults applied by the stage that reads it. That includes orchestrator,
+reference_baseline.strict_clone, ue.training.cache / telemetry, ue.infer latency_benchmark /
+memory_budget and report.latest_publish / perf_history.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from common import ConfigError, atomic_write_bytes, get_nested, load_config, sha256_file
+
+# Bump when any dataclass below changes shape; older snapshots are then recompiled.
+CONFIG_SCHEMA_VERSION = 1
+# Protocol 4 loads in every interpreter the pipeline runs under (hython, UE Python, host Python).
+_PICKLE_PROTOCOL = 4
+
+STRICT_THRESHOLDS = {
+    "ssim_mean_min": 0.995,
+    "ssim_p05_min": 0.985,
+    "psnr_mean_min": 35.0,
+    "psnr_min_min": 30.0,
+    "edge_iou_mean_min": 0.97,
+}
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off")
+
+_MEMO: Dict[Tuple[str, int, int], "PipelineConfig"] = {}
+
+
+def as_bool(value: Any, default: bool) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    if isinstance(value, str):
+        v = value.strip().lower()
+        if v in _TRUE:
+            return True
+        if v in _FALSE:
+            return False
+    return default
+
+
+@dataclass
+class CoordSystemConfig:
+    __slots__ = (
+        "mode",
+        "houdini_unit",
+        "ue_unit",
+        "scale_factor",
+        "matrix_3x3",
+        "translation_offset",
+        "validate_enabled",
+        "validate_tolerance",
+        "validate_fail_on_mismatch",
+    )
+    mode: str
+    houdini_unit: str
+    ue_unit: str
+    scale_factor: float
+    matrix_3x3: List[List[float]]
+    translation_offset: List[float]
+    validate_enabled: bool
+    validate_tolerance: float
+    validate_fail_on_mismatch: bool
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+@dataclass
+class DeterminismConfig:
+    __slots__ = ("enabled", "seed", "torch_deterministic", "cudnn_deterministic", "cudnn_benchmark")
+    enabled: bool
+    seed: int
+    torch_deterministic: bool
+    cudnn_deterministic: bool
+    cudnn_benchmark: bool
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+@dataclass
+class TrainingConfig:
+    __slots__ = ("skip_train", "training_data_source", "determinism", "parallel_enabled", "shards", "timeout_minutes")
+    skip_train: bool
+    training_data_source: str
+    determinism: DeterminismConfig
+    parallel_enabled: bool
+    shards: int
+    timeout_minutes: float
+
+
+@dataclass
+class GroundTruthCompareConfig:
+    __slots__ = ("enabled", "metrics_profile", "thresholds", "fail_on_frame_count_mismatch", "debug_mode")
+    enabled: bool
+    metrics_profile: str
+    thresholds: Dict[str, float]
+    fail_on_frame_count_mismatch: bool
+    # Top-level debug_mode, overridden by ue.ground_truth.compare.debug_mode when present.
+    debug_mode: bool
+
+
+@dataclass
+class PipelineConfig:
+    __slots__ = ("schema_version", "source", "raw", "debug_mode", "coord_system", "training", "gt_compare")
+    schema_version: int
+    source: Dict[str, Any]
+    raw: Dict[str, Any]
+    debug_mode: bool
+    coord_system: CoordSystemConfig
+    training: TrainingConfig
+    gt_compare: GroundTruthCompareConfig
+
+    def get(self, *keys: str, default: Any = None) -> Any:
+        return get_nested(self.raw, keys, default)
+
+
+def _section(data: Any, key: str) -> Dict[str, Any]:
+    value = data.get(key, {}) if isinstance(data, dict) else {}
+    if not isinstance(value, dict):
+        raise ConfigError(f"Config section '{key}' must be an object")
+    return value
+
+
+def _compile_coord_system(raw: Dict[str, Any]) -> CoordSystemConfig:
+    coord_cfg = _section(_section(raw, "houdini"), "coord_system")
+    matrix = coord_cfg.get("matrix_3x3", [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    if (
+        not isinstance(matrix, list)
+        or len(matrix) != 3
+        or any(not isinstance(row, list) or len(row) != 3 for row in matrix)
+    ):
+        raise ConfigError("houdini.coord_system.matrix_3x3 must be a 3x3 array")
+    translation = coord_cfg.get("translation_offset", [0.0, 0.0, 0.0])
+    if not isinstance(translation, list) or len(translation) != 3:
+        raise ConfigError("houdini.coord_system.translation_offset must be [x,y,z]")
+    validate_cfg = _section(coord_cfg, "validate")
+    return CoordSystemConfig(
+        mode=str(coord_cfg.get("mode", "explicit") or "explicit"),
+        houdini_unit=str(coord_cfg.get("houdini_unit", "m") or "m"),
+        ue_unit=str(coord_cfg.get("ue_unit", "cm") or "cm"),
+        scale_factor=float(coord_cfg.get("scale_factor", 100.0)),
+        matrix_3x3=[[float(v) for v in row] for row in matrix],
+        translation_offset=[float(v) for v in translation],
+        validate_enabled=as_bool(validate_cfg.get("enabled", True), True),
+        validate_tolerance=float(validate_cfg.get("tolerance", 0.15)),
+        validate_fail_on_mismatch=as_bool(validate_cfg.get("fail_on_mismatch", True), True),
+    )
+
+
+def _compile_training(raw: Dict[str, Any]) -> TrainingConfig:
+    training_cfg = _section(_section(raw, "ue"), "training")
+    det_cfg = _section(training_cfg, "determinism")
+    parallel_cfg = _section(training_cfg, "parallel")
+    return TrainingConfig(
+        skip_train=as_bool(training_cfg.get("skip_train", False), False),
+        training_data_source=str(training_cfg.get("training_data_source", "reference") or "reference").strip().lower(),
+        determinism=DeterminismConfig(
+            enabled=as_bool(det_cfg.get("enabled", True), True),
+            seed=int(det_cfg.get("seed", 3407)),
+            torch_deterministic=as_bool(det_cfg.get("torch_deterministic", True), True),
+            cudnn_deterministic=as_bool(det_cfg.get("cudnn_deterministic", True), True),
+            cudnn_benchmark=as_bool(det_cfg.get("cudnn_benchmark", False), False),
+        ),
+        parallel_enabled=as_bool(parallel_cfg.get("enabled", False), False),
+        shards=max(1, int(parallel_cfg.get("shards", 2))),
+        timeout_minutes=float(parallel_cfg.get("timeout_minutes", 240)),
+    )
+
+
+def _compile_gt_compare(raw: Dict[str, Any]) -> GroundTruthCompareConfig:
+    gt_cfg = _section(_section(raw, "ue"), "ground_truth")
+    compare_cfg = _section(gt_cfg, "compare")
+    thresholds_cfg = _section(compare_cfg, "thresholds")
+    debug_mode = as_bool(raw.get("debug_mode", False), False)
+    if "debug_mode" in compare_cfg:
+        debug_mode = as_bool(compare_cfg.get("debug_mode"), debug_mode)
+    return GroundTruthCompareConfig(
+        enabled=as_bool(gt_cfg.get("enabled", False), False),
+        metrics_profile=str(compare_cfg.get("metrics_profile", "strict") or "strict"),
+        thresholds={key: float(thresholds_cfg.get(key, default)) for key, default in STRICT_THRESHOLDS.items()},
+        fail_on_frame_count_mismatch=as_bool(compare_cfg.get("fail_on_frame_count_mismatch", True), True),
+        debug_mode=debug_mode,
+    )
+
+
+def compile_config(raw: Dict[str, Any], source: Dict[str, Any] | None = None) -> PipelineConfig:
+    return PipelineConfig(
+        schema_version=CONFIG_SCHEMA_VERSION,
+        source=dict(source or {}),
+        raw=raw,
+        debug_mode=as_bool(raw.get("debug_mode", False), False),
+        coord_system=_compile_coord_system(raw),
+        training=_compile_training(raw),
+        gt_compare=_compile_gt_compare(raw),
+    )
+
+
+def snapshot_path(run_dir: Path) -> Path:
+    return Path(run_dir) / "manifests" / "config.resolved"
+
+
+def _source_stat(path: Path) -> Dict[str, Any]:
+    st = os.stat(path)
+    return {"path": str(path.resolve()), "size": int(st.st_size), "mtime_ns": int(st.st_mtime_ns)}
+
+
+def _load_snapshot(path: Path, source: Dict[str, Any]) -> PipelineConfig | None:
+    try:
+        with path.open("rb") as handle:
+            snapshot = pickle.load(handle)
+    except Exception:
+        return None
+    if not isinstance(snapshot, PipelineConfig) or snapshot.schema_version != CONFIG_SCHEMA_VERSION:
+        return None
+    cached = snapshot.source
+    if cached.get("path") != source["path"]:
+        return None
+    if (cached.get("size"), cached.get("mtime_ns")) != (source["size"], source["mtime_ns"]):
+        # Touched but possibly identical (e.g. copied into place again): fall back to the content hash.
+        if cached.get("sha256") != sha256_file(Path(source["path"])):
+            return None
+        snapshot.source = dict(cached, mtime_ns=source["mtime_ns"])
+    return snapshot
+
+
+def write_snapshot(run_dir: Path, config: PipelineConfig) -> Path:
+    path = snapshot_path(run_dir)
+    atomic_write_bytes(path, pickle.dumps(config, protocol=_PICKLE_PROTOCOL))
+    return path
+
+
+def load_pipeline_config(config_path: str | Path, run_dir: str | Path | None = None) -> PipelineConfig:
+    """Compiled config for config_path; reuses the run's snapshot, else compiles and (with run_dir) stores one."""
+    path = Path(config_path)
+    if not path.exists():
+        raise ConfigError(f"Config does not exist: {path}")
+    source = _source_stat(path)
+    memo_key = (source["path"], source["size"], source["mtime_ns"])
+    if memo_key in _MEMO:
+        return _MEMO[memo_key]
+
+    snap = snapshot_path(Path(run_dir)) if run_dir is not None else None
+    config = _load_snapshot(snap, source) if snap is not None and snap.exists() else None
+    if config is None:
+        source["sha256"] = sha256_file(path)
+        config = compile_config(load_config(path), source)
+        if run_dir is not None:
+            write_snapshot(Path(run_dir), config)
+    _MEMO[memo_key] = config
+    return config
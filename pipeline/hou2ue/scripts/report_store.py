@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""Stage report store: a small JSON header plus a compressed sidecar for bulky output sections.
+
+`write_report` keeps `<stage>_report.json` at its usual path, and the stage, status, timestamps and
+errors stay inline. Inside `outputs`, any list or string of SIDECAR_MIN_BYTES or more (log tails,
+per-frame metrics, file lists) moves to `<stage>_report.sidecar.zlib`, a concatenation of
+zlib-compressed JSON blobs. The header keeps a `{"$sidecar": ...}` reference to it holding the blob's
+offset and length. Readers that only need status (build_report, run_pipeline, run_all.ps1) parse the
+header alone. `load_report` resolves every reference. `export_report_json` / the `export` command
+rebuild the full JSON on demand.
+
+Every write is atomic (temp file + os.replace). Writes, full loads and read-modify-write updates
+hold the report's advisory lock, so a header never pairs with another writer's sidecar and
+concurrent `merge_report` calls from parallel stages do not lose each other's annotations.
+Only common.py is imported, so UE Python can use this module too.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from common import atomic_write_bytes, atomic_write_text, file_lock
+
+SIDECAR_SUFFIX = ".sidecar.zlib"
+SIDECAR_MIN_BYTES = 2048
+REF_KEY = "$sidecar"
+# Output sections that header-only readers rely on (build_report flame summary, perf_history); never moved.
+HEADER_KEYS = frozenset({"profile_spans", "results", "latency"})
+
+
+def sidecar_path(report_path: Path) -> Path:
+    report_path = Path(report_path)
+    return report_path.with_name(report_path.stem + SIDECAR_SUFFIX)
+
+
+def is_ref(value: Any) -> bool:
+    return isinstance(value, dict) and REF_KEY in value
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=True, separators=(",", ":")).encode("utf-8")
+
+
+def _split(node: Any, sidecar_name: str, blobs: List[bytes], offset: List[int]) -> Any:
+    """Copy of node with bulky list/str values replaced by sidecar references."""
+    if not isinstance(node, dict):
+        return node
+    out: Dict[str, Any] = {}
+    for key, value in node.items():
+        if isinstance(value, dict) and not is_ref(value):
+            out[key] = _split(value, sidecar_name, blobs, offset)
+            continue
+        if key in HEADER_KEYS or not isinstance(value, (list, str)):
+            out[key] = value
+            continue
+        raw = _encode(value)
+        if len(raw) < SIDECAR_MIN_BYTES:
+            out[key] = value
+            continue
+        blob = zlib.compress(raw, 6)
+        out[key] = {
+            REF_KEY: sidecar_name,
+            "offset": offset[0],
+            "length": len(blob),
+            "raw_bytes": len(raw),
+            "crc32": zlib.crc32(blob),
+            "items": len(value),
+        }
+        blobs.append(blob)
+        offset[0] += len(blob)
+    return out
+
+
+def split_report(report: Dict[str, Any], sidecar_name: str) -> Tuple[Dict[str, Any], bytes]:
+    """(header, sidecar bytes) for a report; the sidecar is empty when nothing is bulky."""
+    blobs: List[bytes] = []
+    header = dict(report)
+    if isinstance(report.get("outputs"), dict):
+        header["outputs"] = _split(report["outputs"], sidecar_name, blobs, [0])
+    return header, b"".join(blobs)
+
+
+def _write_locked(path: Path, report: Dict[str, Any]) -> None:
+    side = sidecar_path(path)
+    header, payload = split_report(report, side.name)
+    if payload:
+        # Sidecar first: a header never points at sections that are not on disk yet.
+        atomic_write_bytes(side, payload)
+    elif side.exists():
+        side.unlink()
+    atomic_write_text(path, json.dumps(header, ensure_ascii=True, indent=2))
+
+
+def write_report(path: Path, report: Dict[str, Any]) -> Path:
+    """Write report as header JSON at path plus (when needed) its sidecar; returns path."""
+    path = Path(path)
+    with file_lock(path):
+        _write_locked(path, report)
+    return path
+
+
+def load_report_header(path: Path) -> Dict[str, Any]:
+    """The header as written: status fields inline, bulky sections as references."""
+    data = json.loads(Path(path).read_text(encoding="utf-8-sig"))
+    if not isinstance(data, dict):
+        raise RuntimeError(f"Report root must be an object: {path}")
+    return data
+
+
+def resolve_section(report_path: Path, ref: Dict[str, Any]) -> Any:
+    """Read one referenced section from the report's sidecar."""
+    side = Path(report_path).with_name(str(ref[REF_KEY]))
+    with side.open("rb") as handle:
+        handle.seek(int(ref["offset"]))
+        blob = handle.read(int(ref["length"]))
+    if len(blob) != int(ref["length"]) or zlib.crc32(blob) != int(ref["crc32"]):
+        raise RuntimeError(f"Report sidecar does not match its header: {side} (offset {ref['offset']})")
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def _resolve(node: Any, report_path: Path) -> Any:
+    if is_ref(node):
+        return resolve_section(report_path, node)
+    if isinstance(node, dict):
+        return {key: _resolve(value, report_path) for key, value in node.items()}
+    return node
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    """The full report, identical to what was passed to write_report."""
+    path = Path(path)
+    with file_lock(path):
+        return _resolve(load_report_header(path), path)
+
+
+def update_report(
+    path: Path,
+    mutate: Callable[[Dict[str, Any]], Dict[str, Any] | None],
+) -> Dict[str, Any] | None:
+    """Read-modify-write under the report lock; mutate edits in place or returns a replacement.
+
+    Returns the written report, or None when the report does not exist (nothing is created).
+    """
+    path = Path(path)
+    with file_lock(path):
+        if not path.exists():
+            return None
+        report = _resolve(load_report_header(path), path)
+        replaced = mutate(report)
+        if replaced is not None:
+            report = replaced
+        _write_locked(path, report)
+        return report
+
+
+def merge_report(
+    path: Path,
+    outputs: Dict[str, Any] | None = None,
+    errors: List[Dict[str, Any]] | None = None,
+    status: str | None = None,
+) -> Dict[str, Any] | None:
+    """Annotate another stage's report: set output keys, append errors not already present by message,
+    and apply status unless it would turn a failed report back into a success."""
+
+    def _merge(report: Dict[str, Any]) -> None:
+        current = report.get("outputs")
+        report["outputs"] = dict(current) if isinstance(current, dict) else {}
+        report["outputs"].update(outputs or {})
+        existing = report.get("errors")
+        merged = list(existing) if isinstance(existing, list) else []
+        seen = {e.get("message") for e in merged if isinstance(e, dict)}
+        for err in errors or []:
+            if err.get("message") not in seen:
+                merged.append(err)
+                seen.add(err.get("message"))
+        report["errors"] = merged
+        if status and not (status == "success" and report.get("status") == "failed"):
+            report["status"] = status
+
+    return update_report(path, _merge)
+
+
+def export_report_json(path: Path, out_path: Path | None = None) -> Path:
+    """Write the full report as plain JSON; defaults to <stage>_report.full.json next to it."""
+    path = Path(path)
+    target = Path(out_path) if out_path is not None else path.with_name(path.stem + ".full.json")
+    atomic_write_text(target, json.dumps(load_report(path), ensure_ascii=True, indent=2))
+    return target
+
+
+def _expand_targets(values: List[str]) -> List[Path]:
+    targets: List[Path] = []
+    for value in values:
+        path = Path(value)
+        if path.is_dir():
+            reports_dir = path / "reports" if (path / "reports").is_dir() else path
+            targets.extend(sorted(reports_dir.glob("*_report.json")))
+        else:
+            targets.append(path)
+    return targets
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export stage reports (header + sidecar) as full JSON")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Write <stage>_report.full.json for reports or run dirs")
+    export.add_argument("paths", nargs="+", help="Report files, run dirs or reports dirs")
+    export.add_argument("--out-dir", default="", help="Directory for exported files (default: next to each report)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    out_dir = Path(args.out_dir) if args.out_dir else None
+    for path in _expand_targets(args.paths):
+        out_path = out_dir / f"{path.stem}.json" if out_dir is not None else None
+        print(export_report_json(path, out_path))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
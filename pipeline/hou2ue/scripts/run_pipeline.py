@@ -0,0 +1,804 @@
+#!/usr/bin/env python3
+"""Cross-platform pipeline orchestrator: run stages as a DAG, concurrently, under Houdini/UE/CPU budgets.
+
+Each stage declares the run_dir files (manifests and reports) it reads and writes; a stage depends on
+every stage that writes one of its inputs. Stage scripts are launched exactly as run_all.ps1 launches
+them, so they keep writing their own <stage>_report.json; this script adds orchestrator_report.json.
+With --incremental only stages whose fingerprint (stage_fingerprints.py) changed are re-run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from common import (
+    finalize_report,
+    get_nested,
+    make_report,
+    profile_span,
+    require_nested,
+    sha256_file,
+    stage_report_path,
+    timestamp_compact,
+    utc_now_iso,
+    write_json,
+)
+from editor_process import resolve_editor_cmd, run_guarded_process
+from pipeline_config import DeterminismConfig, PipelineConfig, load_pipeline_config, write_snapshot
+from report_store import write_report
+from stage_fingerprints import FingerprintStore, plan_stale, stage_components
+from ue_train_shards import shard_keys
+
+STAGES = [
+    "baseline_sync",
+    "preflight",
+    "houdini",
+    "convert",
+    "ue_import",
+    "reference_setup_dump",
+    "ue_setup",
+    "train",
+    "infer",
+    "gt_reference_capture",
+    "gt_source_capture",
+    "gt_compare",
+    "report",
+]
+
+# Stages that produce GeomCache never consumed when training is skipped.
+SKIP_TRAIN_BYPASS_STAGES = {"preflight", "houdini", "convert", "ue_import"}
+
+SKIP_TRAIN_DEFORMER_FILES = [
+    "Content/Characters/Emil/Deformers/MLD_NMMl_flesh_upperBody.uasset",
+    "Content/Characters/Emil/Deformers/MLD_NN_upperCostume.uasset",
+    "Content/Characters/Emil/Deformers/MLD_NN_lowerCostume.uasset",
+]
+
+STAGE_TIMEOUT_MINUTES = {
+    "reference_setup_dump": 180,
+    "baseline_sync": 360,
+    "preflight": 30,
+    "houdini": 120,
+    "convert": 90,
+    "ue_import": 90,
+    "ue_setup": 60,
+    "train": 240,
+    "infer": 240,
+    "gt_reference_capture": 240,
+    "gt_source_capture": 240,
+    "gt_compare": 60,
+    "report": 30,
+}
+
+_GT_CAPTURE_KEYS = [
+    "ue.ground_truth.enabled",
+    "ue.ground_truth.driver",
+    "ue.ground_truth.map",
+    "ue.ground_truth.level_sequence",
+    "ue.ground_truth.capture",
+    "ue.infer.demo",
+]
+
+# Config subtrees each stage's outputs depend on ("{profile}" is the run profile). Tool paths, timeouts and
+# orchestrator settings are left out on purpose: they change how a stage runs, not what it produces.
+STAGE_CONFIG_KEYS = {
+    "baseline_sync": ["reference_baseline", "paths.uproject"],
+    "preflight": ["paths.hip_file", "houdini.nodes"],
+    "houdini": ["paths.hip_file", "houdini", "profiles.{profile}", "defaults.input_animation_fbx"],
+    "convert": [
+        "paths.art_source_root",
+        "houdini",
+        "profiles.{profile}",
+        "ue.flesh_geomcache_source",
+        "ue.nnm_geomcache_sources",
+        "ue.dynamic_assets",
+    ],
+    "ue_import": ["paths.art_source_root", "houdini.coord_system", "ue.imports", "ue.dynamic_assets", "reference_baseline"],
+    "reference_setup_dump": ["reference_baseline", "paths.uproject"],
+    "ue_setup": ["reference_baseline", "ue.deformer_assets", "ue.training_order", "ue.training.skip_train"],
+    "train": [
+        "reference_baseline.reference_uproject",
+        "ue.deformer_assets",
+        "ue.training_order",
+        "ue.training.skip_train",
+        "ue.training.determinism",
+    ],
+    "infer": ["ue.infer"],
+    "gt_reference_capture": _GT_CAPTURE_KEYS + ["reference_baseline.reference_uproject"],
+    "gt_source_capture": _GT_CAPTURE_KEYS + ["paths.uproject"],
+    "gt_compare": ["ue.ground_truth.enabled", "ue.ground_truth.compare"],
+    "report": [
+        "debug_mode",
+        "report",
+        "reference_baseline.strict_clone",
+        "ue.training.skip_train",
+        "ue.ground_truth.compare.thresholds",
+    ],
+}
+
+DEFAULT_RESOURCES = {"houdini": 1, "ue": 2, "cpu": 0}
+
+_FATAL_STDERR = re.compile(r"(?i)(can't open file|traceback|fatal|exception)")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the hou2ue pipeline as a parallel stage DAG")
+    parser.add_argument("--stage", default="full", choices=STAGES + ["full"])
+    parser.add_argument("--profile", default="smoke", choices=["smoke", "full"])
+    parser.add_argument("--config", default="pipeline/hou2ue/config/pipeline.yaml")
+    parser.add_argument("--out-root", default="pipeline/hou2ue/workspace")
+    parser.add_argument("--run-dir", default="")
+    parser.add_argument("--no-activity-minutes", type=int, default=30)
+    parser.add_argument("--repeated-error-threshold", type=int, default=6)
+    parser.add_argument("--houdini-max-minutes", type=int, default=120)
+    parser.add_argument("--warm-editor", action="store_true", help="Dispatch UE stages through the warm stage server")
+    parser.add_argument("--keep-going", action="store_true", help="Keep running independent stages after a failure")
+    parser.add_argument("--incremental", action="store_true", help="Re-run only stages whose fingerprint changed")
+    parser.add_argument("--stub", action="store_true", help="Run stage_stub.py in place of every stage (no Houdini/UE)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the stage plan and exit")
+    return parser.parse_args()
+
+
+def _project_root() -> Path:
+    return Path(__file__).resolve().parents[3]
+
+
+def _resolve_path(base: Path, value: str) -> Path:
+    path = Path(value)
+    return path if path.is_absolute() else (base / path).resolve()
+
+
+def _resolve_exe(value: str) -> str:
+    return shutil.which(value) or value
+
+
+def _reports(*stages: str) -> List[str]:
+    return [f"reports/{stage}_report.json" for stage in stages]
+
+
+def _train_shard_count(config: PipelineConfig, budget: Dict[str, int]) -> int:
+    """Editors ue_train_shards.py will launch: configured shards, capped at the UE budget and the shard groups."""
+    if not config.training.parallel_enabled:
+        return 0
+    order = [str(v) for v in config.get("ue", "training_order", default=[]) or []]
+    deformer_cfg = config.get("ue", "deformer_assets", default={})
+    shards = min(config.training.shards, max(1, budget.get("ue", 1)))
+    return len(shard_keys(order, shards, deformer_cfg if isinstance(deformer_cfg, dict) else {})) if order else shards
+
+
+def _has_dump_fallback(cfg: Dict[str, Any]) -> bool:
+    """Same test as dump_reference_setup.py: the source project is a second dump target."""
+    if not bool(get_nested(cfg, ("reference_baseline", "strict_clone", "enabled"), False)):
+        return False
+    project_root = _project_root()
+    reference = get_nested(cfg, ("reference_baseline", "reference_uproject"), "")
+    source = get_nested(cfg, ("paths", "uproject"), "")
+    if not reference or not source:
+        return False
+    source_uproject = _resolve_path(project_root, str(source))
+    return source_uproject.exists() and source_uproject.resolve() != _resolve_path(project_root, str(reference)).resolve()
+
+
+def build_stage_graph(config: PipelineConfig, warm_editor: bool, budget: Dict[str, int]) -> List[Dict[str, Any]]:
+    """Declare every stage with its launcher, inputs/outputs (run_dir-relative) and resource needs."""
+    cfg = config.raw
+    skip_train = config.training.skip_train
+    train_shards = _train_shard_count(config, budget)
+
+    houdini = {"houdini": 1, "cpu": 4}
+    # Editors on one .uproject share Saved/ and DDC locks, so each project is also an exclusive lock.
+    ue_source = {"ue": 1, "cpu": 2, "ue_source_project": 1}
+    ue_reference = {"ue": 1, "cpu": 2, "ue_reference_project": 1}
+    strict_clone = get_nested(cfg, ("reference_baseline", "strict_clone"), {})
+    if isinstance(strict_clone, dict) and bool(strict_clone.get("speculative", False)):
+        # Speculative dumps run an editor on the reference and the source project at the same time.
+        dump_resources = {"ue": 2, "cpu": 4, "ue_reference_project": 1, "ue_source_project": 1}
+    elif _has_dump_fallback(cfg):
+        # The reference dump may fall back to an editor on the source project within the same stage.
+        dump_resources = dict(ue_reference, ue_source_project=1)
+    else:
+        dump_resources = ue_reference
+    if skip_train:
+        train_resources = {"cpu": 1, "ue_source_project": 1}
+    elif train_shards:
+        train_resources = {"ue": train_shards, "cpu": 2 * train_shards, "ue_source_project": 1}
+    else:
+        train_resources = ue_source
+
+    stages: List[Dict[str, Any]] = [
+        {
+            "name": "baseline_sync",
+            "kind": "python",
+            "script": "sync_reference_baseline.py",
+            "args": ["--out-root", "{out_root}"],
+            # Writes into the source project's Content, so no source-project editor may run meanwhile.
+            "resources": {"cpu": 1, "ue_source_project": 1},
+            "inputs": [],
+            "outputs": _reports("baseline_sync"),
+        },
+        {
+            "name": "preflight",
+            "kind": "hython",
+            "script": "parse_hip.py",
+            "resources": houdini,
+            "inputs": [],
+            "outputs": ["manifests/hip_manifest.json"] + _reports("preflight"),
+        },
+        {
+            "name": "houdini",
+            "kind": "hython",
+            "script": "houdini_cook.py",
+            "resources": houdini,
+            "inputs": ["manifests/hip_manifest.json"],
+            "outputs": ["manifests/run_manifest.json"] + _reports("houdini"),
+        },
+        {
+            "name": "convert",
+            "kind": "python",
+            "script": "houdini_export_abc.py",
+            "resources": houdini,
+            "inputs": ["manifests/run_manifest.json"],
+            "outputs": ["manifests/coord_validation_manifest.json"] + _reports("convert"),
+        },
+        {
+            "name": "ue_import",
+            "kind": "unreal",
+            "script": "ue_import.py",
+            "resources": ue_source,
+            "inputs": ["manifests/coord_validation_manifest.json"] + _reports("baseline_sync"),
+            "outputs": _reports("ue_import"),
+        },
+        {
+            "name": "reference_setup_dump",
+            "kind": "python",
+            "script": "dump_reference_setup.py",
+            "args": ["--out-root", "{out_root}"],
+            "resources": dump_resources,
+            "inputs": _reports("baseline_sync"),
+            "outputs": ["reports/reference_setup_dump.json"] + _reports("reference_setup_dump"),
+        },
+        {
+            "name": "ue_setup",
+            "kind": "builtin" if skip_train else "unreal",
+            "script": "run_pipeline.py" if skip_train else "ue_setup_assets.py",
+            "resources": {"cpu": 1} if skip_train else ue_source,
+            "inputs": ["reports/reference_setup_dump.json"] + _reports("ue_import"),
+            "outputs": ["reports/setup_diff_report.json"] + _reports("ue_setup"),
+        },
+        {
+            "name": "train",
+            "kind": "builtin" if skip_train else ("python" if train_shards else "unreal"),
+            "script": "run_pipeline.py" if skip_train else "ue_train_shards.py" if train_shards else "ue_train.py",
+            "args": ["--out-root", "{out_root}", "--shards", str(train_shards)] if train_shards and not skip_train else [],
+            "resources": train_resources,
+            "inputs": _reports("ue_setup"),
+            "outputs": ["reports/train_determinism_report.json"] + _reports("train"),
+        },
+        {
+            "name": "infer",
+            "kind": "unreal",
+            "script": "ue_infer.py",
+            "resources": ue_source,
+            "inputs": _reports("train"),
+            "outputs": _reports("infer"),
+        },
+        {
+            "name": "gt_reference_capture",
+            "kind": "python",
+            "script": "ue_capture_mainseq.py",
+            "args": ["--capture-kind", "reference"],
+            # Renders the reference project only, so it can start with the first wave.
+            "resources": ue_reference,
+            "inputs": [],
+            "outputs": _reports("gt_reference_capture"),
+        },
+        {
+            "name": "gt_source_capture",
+            "kind": "python",
+            "script": "ue_capture_mainseq.py",
+            "args": ["--capture-kind", "source"],
+            "resources": ue_source,
+            "inputs": _reports("infer"),
+            "outputs": _reports("gt_source_capture"),
+        },
+        {
+            "name": "gt_compare",
+            "kind": "python",
+            "script": "compare_groundtruth.py",
+            "resources": {"cpu": 1},
+            "inputs": _reports("gt_reference_capture", "gt_source_capture", "infer"),
+            "outputs": _reports("gt_compare"),
+        },
+        {
+            "name": "report",
+            "kind": "python",
+            "script": "build_report.py",
+            "args": ["--out-root", "{out_root}"],
+            "resources": {"cpu": 1},
+            "inputs": _reports(*[s for s in STAGES if s != "report"]),
+            "outputs": _reports("report"),
+        },
+    ]
+
+    if skip_train:
+        stages = [s for s in stages if s["name"] not in SKIP_TRAIN_BYPASS_STAGES]
+    resource_overrides = get_nested(cfg, ("orchestrator", "stage_resources"), {})
+    if not isinstance(resource_overrides, dict):
+        resource_overrides = {}
+    for stage in stages:
+        stage.setdefault("args", [])
+        stage["config_keys"] = STAGE_CONFIG_KEYS[stage["name"]]
+        if warm_editor and stage["kind"] == "unreal":
+            # One resident editor serves every dispatch, so source-project UE stages serialize on it anyway.
+            stage["resources"] = dict(stage["resources"], ue_stage_server=1)
+        if isinstance(resource_overrides.get(stage["name"]), dict):
+            stage["resources"] = {str(k): int(v) for k, v in resource_overrides[stage["name"]].items()}
+
+    producers = {out: s["name"] for s in stages for out in s["outputs"]}
+    for stage in stages:
+        stage["deps"] = sorted(
+            {producers[i] for i in stage["inputs"] if i in producers and producers[i] != stage["name"]},
+            key=STAGES.index,
+        )
+    return stages
+
+
+def resolve_budget(cfg: Dict[str, Any]) -> Dict[str, int]:
+    budget = dict(DEFAULT_RESOURCES)
+    configured = get_nested(cfg, ("orchestrator", "resources"), {})
+    if isinstance(configured, dict):
+        budget.update({str(k): int(v) for k, v in configured.items()})
+    if budget.get("cpu", 0) <= 0:
+        budget["cpu"] = os.cpu_count() or 1
+    return budget
+
+
+def _clamped_needs(stage: Dict[str, Any], budget: Dict[str, int]) -> Dict[str, int]:
+    # Resources outside the budget are exclusive locks; a need above the budget is clamped so the stage can run alone.
+    return {name: max(0, min(int(amount), budget.get(name, 1))) for name, amount in stage["resources"].items()}
+
+
+def plan_waves(stages: List[Dict[str, Any]]) -> List[List[str]]:
+    """Topological levels: every stage in a wave only depends on earlier waves."""
+    level: Dict[str, int] = {}
+    for stage in stages:
+        level[stage["name"]] = 1 + max((level[d] for d in stage["deps"] if d in level), default=-1)
+    waves: List[List[str]] = [[] for _ in range(1 + max(level.values(), default=-1))]
+    for stage in stages:
+        waves[level[stage["name"]]].append(stage["name"])
+    return waves
+
+
+def run_graph(
+    stages: List[Dict[str, Any]],
+    budget: Dict[str, int],
+    run_stage: Callable[[Dict[str, Any]], Dict[str, Any]],
+    keep_going: bool,
+) -> Dict[str, Dict[str, Any]]:
+    """Start every stage whose deps succeeded and whose resources fit; declaration order breaks ties."""
+    by_name = {s["name"]: s for s in stages}
+    pending = [s["name"] for s in stages]
+    in_use: Dict[str, int] = {}
+    running: Dict[Future, str] = {}
+    results: Dict[str, Dict[str, Any]] = {}
+    ready_at: Dict[str, float] = {}
+    started = time.monotonic()
+    stopping = False
+
+    def _fits(needs: Dict[str, int]) -> bool:
+        return all(in_use.get(name, 0) + amount <= budget.get(name, 1) for name, amount in needs.items())
+
+    def _timed(stage: Dict[str, Any]) -> Dict[str, Any]:
+        begin = time.monotonic()
+        with profile_span(f"stage:{stage['name']}"):
+            try:
+                result = run_stage(stage)
+            except Exception as exc:
+                result = {"status": "failed", "message": str(exc), "traceback": traceback.format_exc()}
+        result["start_offset_sec"] = round(begin - started, 3)
+        result["duration_sec"] = round(time.monotonic() - begin, 3)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, len(stages))) as pool:
+        while pending or running:
+            for name in list(pending):
+                stage = by_name[name]
+                dep_status = [results.get(d, {}).get("status") for d in stage["deps"] if d in by_name]
+                if stopping or any(s is not None and s != "success" for s in dep_status):
+                    pending.remove(name)
+                    results[name] = {"status": "cancelled" if stopping else "blocked", "message": "upstream stage failed"}
+                    continue
+                if any(s is None for s in dep_status):
+                    continue
+                ready_at.setdefault(name, time.monotonic())
+                needs = _clamped_needs(stage, budget)
+                if not _fits(needs):
+                    continue
+                for res, amount in needs.items():
+                    in_use[res] = in_use.get(res, 0) + amount
+                pending.remove(name)
+                print(f"[run_pipeline] start {name} resources={needs}", flush=True)
+                running[pool.submit(_timed, stage)] = name
+
+            if not running:
+                break
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                result = future.result()
+                result["wait_sec"] = round(max(0.0, started + result["start_offset_sec"] - ready_at.get(name, started)), 3)
+                results[name] = result
+                for res, amount in _clamped_needs(by_name[name], budget).items():
+                    in_use[res] -= amount
+                print(f"[run_pipeline] {result['status']:<9} {name} ({result['duration_sec']:.1f}s)", flush=True)
+                if result["status"] != "success" and not keep_going:
+                    stopping = True
+    return results
+
+
+def critical_path(stages: List[Dict[str, Any]], results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Longest chain of measured stage durations through the DAG."""
+    best: Dict[str, tuple[float, List[str]]] = {}
+    for stage in stages:
+        own = float(results.get(stage["name"], {}).get("duration_sec", 0.0))
+        upstream = max((best[d] for d in stage["deps"] if d in best), key=lambda item: item[0], default=(0.0, []))
+        best[stage["name"]] = (upstream[0] + own, upstream[1] + [stage["name"]])
+    total, path = max(best.values(), key=lambda item: item[0], default=(0.0, []))
+    return {"stages": path, "duration_sec": round(total, 3)}
+
+
+def _load_json(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8-sig"))
+    except Exception:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def _train_env(determinism: DeterminismConfig) -> Dict[str, str]:
+    def _flag(value: bool) -> str:
+        return "1" if value else "0"
+
+    return {
+        "HOU2UE_TRAIN_DETERMINISM_ENABLED": _flag(determinism.enabled),
+        "HOU2UE_TRAIN_SEED": str(determinism.seed),
+        "HOU2UE_TORCH_DETERMINISTIC": _flag(determinism.torch_deterministic),
+        "HOU2UE_CUDNN_DETERMINISTIC": _flag(determinism.cudnn_deterministic),
+        "HOU2UE_CUDNN_BENCHMARK": _flag(determinism.cudnn_benchmark),
+    }
+
+
+def _skip_train_report(ctx: Dict[str, Any], stage: str) -> Dict[str, Any]:
+    """skip_train stand-ins for ue_setup/train, as written by run_all.ps1."""
+    report = make_report(stage, ctx["profile"], ctx["report_inputs"])
+    outputs: Dict[str, Any] = {"skipped": True}
+    if stage == "ue_setup":
+        outputs["reason"] = "skip_train enabled - preserving reference deformer weights from baseline_sync"
+    else:
+        ref_uproject = str(require_nested(ctx["cfg"], ("reference_baseline", "reference_uproject")))
+        ref_root = _resolve_path(ctx["project_root"], str(Path(ref_uproject).parent))
+        copies: List[Dict[str, Any]] = []
+        for rel in SKIP_TRAIN_DEFORMER_FILES:
+            src, dst = ref_root / rel, ctx["project_root"] / rel
+            if not src.exists():
+                copies.append({"file": rel, "copied": False, "error": f"Source not found: {src}"})
+                continue
+            shutil.copy2(src, dst)
+            src_hash, dst_hash = sha256_file(src), sha256_file(dst)
+            copies.append({"file": rel, "copied": True, "sha256_match": src_hash == dst_hash, "sha256": src_hash})
+        outputs.update(
+            {
+                "reason": "skip_train enabled - using reference deformer weights directly",
+                "reference_root": str(ref_root),
+                "deformer_copies": copies,
+            }
+        )
+    finalize_report(report, status="success", outputs=outputs, errors=[])
+    write_report(stage_report_path(ctx["run_dir"], stage), report)
+    return {"status": "success", "message": "skip_train stand-in report written"}
+
+
+def _stage_command(ctx: Dict[str, Any], stage: Dict[str, Any]) -> List[str]:
+    run_args = ["--config", str(ctx["config_path"]), "--profile", ctx["profile"], "--run-dir", str(ctx["run_dir"])]
+    if ctx["stub"]:
+        sleep = str(float(get_nested(ctx["cfg"], ("orchestrator", "stub_sleep_sec"), 0.5)))
+        return [sys.executable, str(ctx["scripts_dir"] / "stage_stub.py")] + run_args + ["--stage", stage["name"], "--sleep-sec", sleep]
+
+    script = ctx["scripts_dir"] / stage["script"]
+    extra = [ctx["out_root"] if a == "{out_root}" else a for a in stage["args"]]
+    if stage["kind"] == "hython":
+        return [ctx["hython_exe"], str(script)] + run_args + extra
+    if stage["kind"] == "python":
+        return [ctx["python_exe"], str(script)] + run_args + extra
+    if ctx["warm_editor"]:
+        client = ctx["scripts_dir"] / "ue_stage_client.py"
+        return [ctx["python_exe"], str(client)] + run_args + ["--script", str(script)]
+    return [
+        str(resolve_editor_cmd(ctx["ue_editor_exe"])),
+        str(ctx["uproject"]),
+        f"-ExecutePythonScript={script.as_posix()}",
+        "-unattended",
+        "-nop4",
+        "-nosplash",
+        "-NoSound",
+        "-stdout",
+        "-FullStdOutLogOutput",
+    ]
+
+
+def _run_stage(ctx: Dict[str, Any], stage: Dict[str, Any]) -> Dict[str, Any]:
+    name = stage["name"]
+    if stage["kind"] == "builtin" and not ctx["stub"]:
+        return _skip_train_report(ctx, name)
+
+    report_path = stage_report_path(ctx["run_dir"], name)
+    mtime_before = report_path.stat().st_mtime_ns if report_path.exists() else None
+    env = dict(ctx["env"])
+    if name == "train":
+        env.update(_train_env(ctx["config"].training.determinism))
+    cmd = _stage_command(ctx, stage)
+    timeout = int(ctx["timeouts"].get(name, 120))
+    reports_dir = ctx["run_dir"] / "reports"
+    process = run_guarded_process(
+        cmd,
+        reports_dir / f"guard_{name}.stdout.log",
+        reports_dir / f"guard_{name}.stderr.log",
+        timeout_minutes=timeout,
+        no_activity_minutes=ctx["no_activity_minutes"],
+        repeated_error_threshold=ctx["repeated_error_threshold"],
+        env=env,
+        poll_sec=ctx["poll_sec"],
+    )
+    result: Dict[str, Any] = {
+        "status": "failed",
+        "command": cmd,
+        "exit_code": process["exit_code"],
+        "abort_reason": process["abort_reason"],
+        "stdout_path": process["stdout_path"],
+        "stderr_path": process["stderr_path"],
+        "report_path": str(report_path.resolve()),
+        "message": "",
+    }
+
+    report = _load_json(report_path)
+    fresh = bool(report) and (mtime_before is None or report_path.stat().st_mtime_ns > mtime_before)
+    report_ok = fresh and str(report.get("status", "")) == "success"
+    if process["abort_reason"]:
+        result["message"] = f"{process['abort_reason']} {process['repeated_error_line']}".strip()
+    elif stage["kind"] == "unreal" and not ctx["stub"]:
+        # UnrealEditor may exit non-zero after a clean run; a fresh success report wins, as in run_all.ps1.
+        if report_ok:
+            result["status"] = "success"
+        else:
+            result["message"] = "missing, stale or failed stage report" if process["exit_code"] == 0 else f"exit code {process['exit_code']}"
+    elif process["exit_code"] != 0:
+        result["message"] = f"exit code {process['exit_code']}"
+    elif report and not report_ok:
+        result["message"] = "stage report is stale or indicates failure"
+    elif not report and any(_FATAL_STDERR.search(line) for line in process["stderr_tail"]):
+        result["message"] = "fatal output on stderr"
+    else:
+        result["status"] = "success"
+    if result["status"] != "success":
+        result["stderr_tail"] = process["stderr_tail"][-40:]
+    return result
+
+
+def _check_tools(ctx: Dict[str, Any], stages: List[Dict[str, Any]]) -> None:
+    kinds = {s["kind"] for s in stages}
+    needs_houdini = any(s["resources"].get("houdini") for s in stages)
+    checks = [("Python", ctx["python_exe"], bool(kinds & {"python", "unreal"}))]
+    checks.append(("Houdini hython", ctx["hython_exe"], needs_houdini))
+    checks.append(("UnrealEditor", ctx["ue_editor_exe"], any(s["resources"].get("ue") for s in stages)))
+    for label, exe, needed in checks:
+        if needed and not exe:
+            raise RuntimeError(f"{label} is not configured.")
+        if needed and not Path(exe).exists() and shutil.which(exe) is None:
+            raise RuntimeError(f"{label} not found: {exe}")
+    if needs_houdini and not ctx["hip_path"].exists():
+        raise RuntimeError(f"HIP file not found: {ctx['hip_path']}")
+
+
+def _report_ok(run_dir: Path, stage: str) -> bool:
+    return str(_load_json(stage_report_path(run_dir, stage)).get("status", "")) == "success"
+
+
+def _resolve_run_dir(args: argparse.Namespace, project_root: Path, out_root: Path) -> Path:
+    if args.run_dir:
+        return _resolve_path(project_root, args.run_dir)
+    if args.stage in {"baseline_sync", "preflight", "houdini", "full"} and not args.incremental:
+        return out_root / "runs" / f"{timestamp_compact()}_{args.profile}"
+    latest = out_root / "latest" / args.profile
+    if latest.exists():
+        return latest.resolve()
+    raise RuntimeError(
+        f"No existing run directory for stage '{args.stage}'. Run preflight/houdini/full first, or pass --run-dir explicitly."
+    )
+
+
+def main() -> int:
+    args = parse_args()
+    project_root = _project_root()
+    config_path = _resolve_path(project_root, args.config)
+    out_root = _resolve_path(project_root, args.out_root)
+    # Typed sections are compiled here; every stage process reloads them from run_dir/manifests/config.resolved.
+    config = load_pipeline_config(config_path)
+    cfg = config.raw
+    warm_editor = bool(args.warm_editor or get_nested(cfg, ("ue", "stage_server", "enabled"), False))
+
+    budget = resolve_budget(cfg)
+    stages = build_stage_graph(config, warm_editor, budget)
+    if args.stage != "full":
+        # Single stage against an existing run dir, like run_all.ps1 -Stage <name>. Deps stay declared
+        # for the fingerprint; run_graph ignores deps outside the graph.
+        stages = [s for s in stages if s["name"] == args.stage]
+    scripts_dir = Path(__file__).resolve().parent
+
+    run_dir = _resolve_run_dir(args, project_root, out_root) if args.incremental or not args.dry_run else None
+    store = FingerprintStore(run_dir / "manifests" / "stage_fingerprints.json") if run_dir is not None else None
+
+    def _components(stage: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+        return stage_components(stage, cfg, args.profile, run_dir, scripts_dir, store.output_hashes())
+
+    stale: Dict[str, List[str]] = {}
+    to_run = stages
+    if args.incremental:
+        stale = plan_stale(stages, store, _components, lambda name: _report_ok(run_dir, name))
+        to_run = [s for s in stages if s["name"] in stale]
+        for stage in stages:
+            print(f"[run_pipeline] {stage['name']:<22} {'stale: ' + ', '.join(stale[stage['name']]) if stage['name'] in stale else 'up to date'}")
+
+    if args.dry_run:
+        for index, wave in enumerate(plan_waves(to_run)):
+            print(f"wave {index}: {', '.join(wave)}")
+        for stage in to_run:
+            print(f"  {stage['name']:<22} deps={stage['deps']} resources={_clamped_needs(stage, budget)}")
+        print(f"budget={budget}")
+        return 0
+
+    out_root.mkdir(parents=True, exist_ok=True)
+    for sub in ("reports", "manifests"):
+        (run_dir / sub).mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(config_path, run_dir / "pipeline_config.input.yaml")
+    write_snapshot(run_dir, config)
+    write_json(
+        run_dir / "run_info.json",
+        {
+            "stage": args.stage,
+            "profile": args.profile,
+            "config": str(config_path),
+            "out_root": str(out_root),
+            "run_dir": str(run_dir),
+            "created_at": utc_now_iso(),
+            "orchestrator": "run_pipeline.py",
+        },
+    )
+
+    report_inputs = {"config": str(config_path), "run_dir": str(run_dir.resolve()), "profile": args.profile}
+    report = make_report("orchestrator", args.profile, dict(report_inputs, stage=args.stage, stub=args.stub))
+    report_path = stage_report_path(run_dir, "orchestrator")
+    timeouts = dict(STAGE_TIMEOUT_MINUTES, houdini=args.houdini_max_minutes)
+    configured_timeouts = get_nested(cfg, ("orchestrator", "timeout_minutes"), {})
+    if isinstance(configured_timeouts, dict):
+        timeouts.update({str(k): int(v) for k, v in configured_timeouts.items()})
+
+    env = os.environ.copy()
+    env.update(
+        {
+            "HOU2UE_CONFIG": str(config_path),
+            "HOU2UE_PROFILE": args.profile,
+            "HOU2UE_RUN_DIR": str(run_dir.resolve()),
+            "HOU2UE_OUT_ROOT": str(out_root),
+        }
+    )
+    ctx: Dict[str, Any] = {
+        "cfg": cfg,
+        "config": config,
+        "profile": args.profile,
+        "project_root": project_root,
+        "config_path": config_path,
+        "out_root": str(out_root),
+        "run_dir": run_dir,
+        "scripts_dir": scripts_dir,
+        "report_inputs": report_inputs,
+        "stub": args.stub,
+        "warm_editor": warm_editor,
+        "env": env,
+        "timeouts": timeouts,
+        "no_activity_minutes": args.no_activity_minutes,
+        "repeated_error_threshold": args.repeated_error_threshold,
+        "poll_sec": float(get_nested(cfg, ("orchestrator", "poll_sec"), 5.0)),
+        "python_exe": _resolve_exe(str(get_nested(cfg, ("paths", "python_exe"), "") or sys.executable)),
+        "hython_exe": str(get_nested(cfg, ("paths", "houdini", "hython_exe"), "") or ""),
+        "ue_editor_exe": str(get_nested(cfg, ("paths", "ue_editor_exe"), "") or ""),
+        "uproject": _resolve_path(project_root, str(get_nested(cfg, ("paths", "uproject"), ""))),
+        "hip_path": _resolve_path(project_root, str(get_nested(cfg, ("paths", "hip_file"), ""))),
+    }
+
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        if not args.stub:
+            _check_tools(ctx, stages)
+        wall_started = time.monotonic()
+        keep_going = bool(args.keep_going or get_nested(cfg, ("orchestrator", "keep_going"), False))
+
+        def _run_and_record(stage: Dict[str, Any]) -> Dict[str, Any]:
+            # Fingerprint at launch: upstream stages have finished, so inputs and upstream hashes are final.
+            components = _components(stage)
+            result = _run_stage(ctx, stage)
+            if result["status"] == "success":
+                store.record(stage, components, run_dir)
+            return result
+
+        results = run_graph(to_run, budget, _run_and_record, keep_going)
+        wall_sec = time.monotonic() - wall_started
+    except Exception as exc:
+        finalize_report(
+            report,
+            status="failed",
+            outputs={"stages": results},
+            errors=[{"message": str(exc), "traceback": traceback.format_exc()}],
+        )
+        write_report(report_path, report)
+        return 1
+    finally:
+        if warm_editor and not args.stub:
+            client = [ctx["python_exe"], str(ctx["scripts_dir"] / "ue_stage_client.py"), "--config", str(config_path)]
+            client += ["--profile", args.profile, "--run-dir", str(run_dir), "--shutdown"]
+            try:
+                subprocess.run(client, env=env, check=False, timeout=120)
+            except Exception as exc:
+                print(f"[run_pipeline] Failed to stop UE stage server: {exc}", flush=True)
+
+    serial_sec = sum(float(r.get("duration_sec", 0.0)) for r in results.values())
+    failed = [name for name, r in results.items() if r["status"] != "success"]
+    finalize_report(
+        report,
+        status="success" if not failed else "failed",
+        outputs={
+            "run_dir": str(run_dir.resolve()),
+            "budget": budget,
+            "waves": plan_waves(to_run),
+            "incremental": {
+                "enabled": args.incremental,
+                "stale": stale,
+                "up_to_date": [s["name"] for s in stages if args.incremental and s["name"] not in stale],
+                "fingerprints": str(store.path.resolve()),
+            },
+            "stages": [
+                dict(
+                    results.get(s["name"], {"status": "up_to_date" if args.incremental else "not_run"}),
+                    name=s["name"],
+                    kind=s["kind"],
+                    deps=s["deps"],
+                    resources=_clamped_needs(s, budget),
+                )
+                for s in stages
+            ],
+            "wall_sec": round(wall_sec, 3),
+            "serial_sec": round(serial_sec, 3),
+            "parallel_speedup": round(serial_sec / wall_sec, 3) if wall_sec > 0 else 0.0,
+            "critical_path": critical_path(to_run, results),
+        },
+        errors=[{"stage": name, "message": str(results[name].get("message", ""))} for name in failed],
+    )
+    write_report(report_path, report)
+    print(f"[run_pipeline] Done. RunDir={run_dir} status={report['status']} wall={wall_sec:.1f}s", flush=True)
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
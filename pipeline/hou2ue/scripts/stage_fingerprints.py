@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Stage fingerprints for incremental runs: config subtrees, script sources, input manifests and upstream outputs.
+
+A stage's fingerprint hashes four components: the config subtrees it reads, its script plus every local
+module it imports, the run_dir manifests it consumes, and the recorded output hash of each upstream
+stage. Stage reports are never hashed as inputs (they carry timestamps); upstream change reaches a
+stage through the upstream output hash instead.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from common import atomic_write_text, sha256_file, utc_now_iso
+
+FINGERPRINT_VERSION = 1
+COMPONENTS = ("config", "script", "inputs", "upstream")
+
+_LOCAL_IMPORT = re.compile(r"^\s*(?:from|import)\s+([A-Za-z_]\w*)", re.MULTILINE)
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def config_subtree(cfg: Dict[str, Any], dotted: str, profile: str) -> Any:
+    node: Any = cfg
+    for key in dotted.format(profile=profile).split("."):
+        if not isinstance(node, dict) or key not in node:
+            return None
+        node = node[key]
+    return node
+
+
+def script_closure(script: Path) -> List[Path]:
+    """The script and every module in its directory it imports, transitively."""
+    seen: Dict[str, Path] = {}
+    queue = [script]
+    while queue:
+        path = queue.pop()
+        if path.name in seen or not path.is_file():
+            continue
+        seen[path.name] = path
+        for name in _LOCAL_IMPORT.findall(path.read_text(encoding="utf-8-sig", errors="ignore")):
+            queue.append(script.parent / f"{name}.py")
+    return [seen[name] for name in sorted(seen)]
+
+
+def is_report(rel: str) -> bool:
+    return rel.endswith("_report.json")
+
+
+def stage_components(
+    stage: Dict[str, Any],
+    cfg: Dict[str, Any],
+    profile: str,
+    run_dir: Path,
+    scripts_dir: Path,
+    upstream_hashes: Dict[str, str],
+) -> Dict[str, Dict[str, str]]:
+    inputs: Dict[str, str] = {}
+    for rel in stage["inputs"]:
+        if not is_report(rel):
+            path = run_dir / rel
+            inputs[rel] = sha256_file(path) if path.is_file() else "missing"
+    return {
+        "config": {
+            key.format(profile=profile): _digest(config_subtree(cfg, key, profile)) for key in stage.get("config_keys", [])
+        },
+        "script": {p.name: sha256_file(p) for p in script_closure(scripts_dir / stage["script"])},
+        "inputs": inputs,
+        "upstream": {dep: upstream_hashes.get(dep, "") for dep in stage["deps"]},
+    }
+
+
+def fingerprint(components: Dict[str, Dict[str, str]]) -> str:
+    return _digest({name: components.get(name, {}) for name in COMPONENTS})
+
+
+def diff_components(old: Dict[str, Any], new: Dict[str, Dict[str, str]]) -> List[str]:
+    """'component:key' for every entry that was added, removed or changed."""
+    changed: List[str] = []
+    for name in COMPONENTS:
+        before = old.get(name, {}) if isinstance(old.get(name), dict) else {}
+        after = new.get(name, {})
+        for key in sorted(set(before) | set(after)):
+            if before.get(key) != after.get(key):
+                changed.append(f"{name}:{key}")
+    return changed
+
+
+class FingerprintStore:
+    """run_dir/manifests/stage_fingerprints.json; record() is safe to call from stage worker threads."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return
+        if not isinstance(payload, dict) or int(payload.get("version", 0)) != FINGERPRINT_VERSION:
+            return
+        stages = payload.get("stages", {})
+        if isinstance(stages, dict):
+            self._entries = {str(k): v for k, v in stages.items() if isinstance(v, dict)}
+
+    def get(self, stage: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._entries.get(stage, {}))
+
+    def output_hashes(self) -> Dict[str, str]:
+        with self._lock:
+            return {name: str(entry.get("output_hash", "")) for name, entry in self._entries.items()}
+
+    def record(self, stage: Dict[str, Any], components: Dict[str, Dict[str, str]], run_dir: Path) -> str:
+        """Store the fingerprint a successful stage ran with; returns its output hash."""
+        fp = fingerprint(components)
+        outputs = {}
+        for rel in stage["outputs"]:
+            if not is_report(rel):
+                path = run_dir / rel
+                outputs[rel] = sha256_file(path) if path.is_file() else "missing"
+        output_hash = _digest({"fingerprint": fp, "outputs": outputs})
+        with self._lock:
+            self._entries[stage["name"]] = {
+                "fingerprint": fp,
+                "output_hash": output_hash,
+                "components": components,
+                "outputs": outputs,
+                "recorded_at": utc_now_iso(),
+            }
+            self._save_locked()
+        return output_hash
+
+    def _save_locked(self) -> None:
+        payload = {"version": FINGERPRINT_VERSION, "updated_at": utc_now_iso(), "stages": self._entries}
+        atomic_write_text(self.path, json.dumps(payload, ensure_ascii=True, indent=2))
+
+
+def plan_stale(
+    stages: List[Dict[str, Any]],
+    store: FingerprintStore,
+    components_for: Callable[[Dict[str, Any]], Dict[str, Dict[str, str]]],
+    report_ok: Callable[[str], bool],
+) -> Dict[str, List[str]]:
+    """{stage: reasons} for every stage that must re-run; stages must be in topological order."""
+    stale: Dict[str, List[str]] = {}
+    for stage in stages:
+        name = stage["name"]
+        entry = store.get(name)
+        if not entry:
+            stale[name] = ["no_fingerprint"]
+            continue
+        reasons = [f"upstream:{dep}" for dep in stage["deps"] if dep in stale]
+        if not report_ok(name):
+            reasons.append("report_missing_or_failed")
+        if not reasons:
+            current = components_for(stage)
+            if entry.get("fingerprint") != fingerprint(current):
+                reasons = diff_components(entry.get("components", {}), current) or ["fingerprint_changed"]
+        if reasons:
+            stale[name] = reasons
+    return stale
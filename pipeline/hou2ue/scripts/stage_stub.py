@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Stand-in for any pipeline stage: sleep, then write a success (or forced failure) <stage>_report.json."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from common import finalize_report, make_report, stage_report_path
+from report_store import write_report
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stub pipeline stage for orchestrator dry runs")
+    parser.add_argument("--config", required=True)
+    parser.add_argument("--profile", required=True, choices=["smoke", "full"])
+    parser.add_argument("--run-dir", required=True)
+    parser.add_argument("--stage", required=True)
+    parser.add_argument("--sleep-sec", type=float, default=0.0)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    run_dir = Path(args.run_dir)
+    report = make_report(
+        stage=args.stage,
+        profile=args.profile,
+        inputs={
+            "config": str(Path(args.config).resolve()),
+            "run_dir": str(run_dir.resolve()),
+            "profile": args.profile,
+        },
+    )
+    time.sleep(max(0.0, args.sleep_sec))
+
+    # HOU2UE_STUB_FAIL=train,infer forces those stages to fail, to exercise the orchestrator's failure path.
+    failing = {s.strip() for s in os.environ.get("HOU2UE_STUB_FAIL", "").split(",") if s.strip()}
+    failed = args.stage in failing
+    finalize_report(
+        report,
+        status="failed" if failed else "success",
+        outputs={"stub": True, "sleep_sec": args.sleep_sec},
+        errors=[{"message": "Forced stub failure (HOU2UE_STUB_FAIL)"}] if failed else [],
+    )
+    write_report(stage_report_path(run_dir, args.stage), report)
+    print(f"[stage_stub] {args.stage}: {report['status']}", flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
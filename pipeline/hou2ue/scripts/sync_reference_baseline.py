@@ -4,22 +4,28 @@
 from __future__ import annotations
 
 import argparse
-import hashlib
+import os
 import shutil
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Tuple
 
 from common import (
     ConfigError,
     finalize_report,
-    load_config,
     make_report,
+    profile_span,
     require_nested,
+    sha256_file,
     stage_report_path,
     timestamp_compact,
-    write_json,
 )
+from file_transfer import transfer_file
+from hash_cache import HashCache
+from pipeline_config import load_pipeline_config
+from report_store import write_report
 
 
 def parse_args() -> argparse.Namespace:
@@ -27,6 +33,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--config", required=True)
     parser.add_argument("--profile", required=True, choices=["smoke", "full"])
     parser.add_argument("--run-dir", required=True)
+    parser.add_argument("--out-root", default="", help="Workspace root holding the persistent hash cache")
     return parser.parse_args()
 
 
@@ -39,15 +46,16 @@ def _resolve_path(base: Path, value: str) -> Path:
     return path if path.is_absolute() else (base / path).resolve()
 
 
-def _sha256(path: Path) -> str:
-    digest = hashlib.sha256()
-    with path.open("rb") as handle:
-        while True:
-            chunk = handle.read(1024 * 1024)
-            if not chunk:
-                break
-            digest.update(chunk)
-    return digest.hexdigest()
+def _out_root(args: argparse.Namespace, run_dir: Path) -> Path:
+    if args.out_root:
+        return Path(args.out_root)
+    # <out_root>/runs/<timestamp>_<profile>
+    resolved = run_dir.resolve()
+    return resolved.parent.parent if resolved.parent.name == "runs" else resolved
+
+
+def _stat_matches(src_stat: os.stat_result, dst_stat: os.stat_result) -> bool:
+    return src_stat.st_size == dst_stat.st_size and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
 
 
 def _game_path_to_uasset_rel(game_path: str) -> Path:
@@ -85,48 +93,83 @@ def _copy_with_backup(
     backup_root: Path,
     verify_hash: bool,
     backup_before_overwrite: bool,
+    skip_by_stat: bool = True,
+    hash_cache: HashCache | None = None,
 ) -> Dict[str, Any]:
     src = src.resolve()
+    hash_fn: Callable[[Path], str] = hash_cache.sha256 if hash_cache is not None else sha256_file
     status = "create"
     copied = True
     backup_path = ""
+    skip_reason = ""
+    bytes_copied = 0
+    transfer_method = ""
+    backup_method = ""
 
     src_hash = ""
     dst_hash_before = ""
+    dst_hash_after = ""
+    src_stat = src.stat()
 
     if dst.exists() and dst.is_file():
         status = "update"
-        if verify_hash:
-            src_hash = _sha256(src)
-            dst_hash_before = _sha256(dst)
+        dst_stat = dst.stat()
+        if skip_by_stat and _stat_matches(src_stat, dst_stat):
+            # copy2/copystat preserve mtime, so an identical size+mtime pair means a previous sync wrote it.
+            copied = False
+            status = "unchanged"
+            skip_reason = "size_mtime"
+        elif verify_hash and src_stat.st_size == dst_stat.st_size:
+            src_hash = hash_fn(src)
+            dst_hash_before = hash_fn(dst)
             if src_hash == dst_hash_before:
                 copied = False
                 status = "unchanged"
+                skip_reason = "hash"
+                # Align mtime so the next run can skip this file on stat alone.
+                shutil.copystat(src, dst)
+                if hash_cache is not None:
+                    hash_cache.record(dst, dst_hash_before)
 
     if copied:
         if dst.exists() and dst.is_file() and backup_before_overwrite:
             rel = dst.relative_to(_project_root()) if dst.is_relative_to(_project_root()) else Path(dst.name)
             backup_target = backup_root / rel
-            backup_target.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(dst, backup_target)
+            # dst is replaced (new inode), never rewritten in place, so the backup may share its inode.
+            backup_method = str(transfer_file(dst, backup_target, allow_hardlink=True)["method"])
             backup_path = str(backup_target.resolve())
 
-        dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, dst)
+        transfer = transfer_file(src, dst, hash_buffered=verify_hash)
+        transfer_method = str(transfer["method"])
+        bytes_copied = int(transfer["bytes"])
+        if verify_hash:
+            # Buffered copies hash while writing; reflink/copy_file_range need one read of dst.
+            dst_hash_after = str(transfer["sha256"]) or sha256_file(dst)
 
     verify_ok = True
-    dst_hash_after = ""
-    if verify_hash:
-        if not src_hash:
-            src_hash = _sha256(src)
-        dst_hash_after = _sha256(dst)
-        verify_ok = src_hash == dst_hash_after
+    if copied and verify_hash:
+        # The streamed digest is what landed on disk; also catch a source that changed mid-run.
+        verify_ok = bytes_copied == src_stat.st_size and dst.stat().st_size == bytes_copied
+        if src_hash:
+            verify_ok = verify_ok and src_hash == dst_hash_after
+        else:
+            src_hash = dst_hash_after
+        if hash_cache is not None and verify_ok:
+            hash_cache.record(dst, dst_hash_after)
+            if src.stat().st_mtime_ns == src_stat.st_mtime_ns:
+                hash_cache.record(src, src_hash, src_stat)
+    elif verify_hash and skip_reason == "hash":
+        dst_hash_after = dst_hash_before
 
     return {
         "source": str(src),
         "destination": str(dst),
         "status": status,
         "copied": copied,
+        "skip_reason": skip_reason,
+        "bytes_copied": bytes_copied,
+        "transfer_method": transfer_method,
+        "backup_method": backup_method,
         "backup_path": backup_path,
         "verify_ok": verify_ok,
         "src_hash": src_hash,
@@ -143,7 +186,12 @@ def _phase_sync(
     backup_root: Path,
     verify_hash: bool,
     backup_before_overwrite: bool,
+    skip_by_stat: bool = True,
+    max_workers: int = 4,
+    hash_cache: HashCache | None = None,
 ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    started = time.monotonic()
+    cache_before = hash_cache.stats() if hash_cache is not None else {"hits": 0, "misses": 0}
     files = _collect_files(reference_root, patterns)
     details: List[Dict[str, Any]] = []
     errors: List[Dict[str, Any]] = []
@@ -153,11 +201,12 @@ def _phase_sync(
     unchanged_count = 0
     copied_count = 0
     verified_count = 0
+    skipped_by_stat_count = 0
+    bytes_copied = 0
+    transfer_methods: Dict[str, int] = {}
 
-    for src in files:
-        rel = src.relative_to(reference_root)
-        dst = (project_root / rel).resolve()
-
+    def _sync_one(src: Path) -> Tuple[Path, Path, Dict[str, Any] | None, Exception | None]:
+        dst = (project_root / src.relative_to(reference_root)).resolve()
         try:
             result = _copy_with_backup(
                 src=src,
@@ -165,8 +214,19 @@ def _phase_sync(
                 backup_root=backup_root / phase_name,
                 verify_hash=verify_hash,
                 backup_before_overwrite=backup_before_overwrite,
+                skip_by_stat=skip_by_stat,
+                hash_cache=hash_cache,
             )
+            return src, dst, result, None
         except Exception as exc:
+            return src, dst, None, exc
+
+    # Bounded pool: large GeomCache files are I/O bound, so a few workers overlap hashing and copying.
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as pool:
+        outcomes = list(pool.map(_sync_one, files))
+
+    for src, dst, result, exc in outcomes:
+        if result is None:
             errors.append(
                 {
                     "phase": phase_name,
@@ -178,6 +238,12 @@ def _phase_sync(
             continue
 
         status = str(result["status"])
+        if result.get("skip_reason") == "size_mtime":
+            skipped_by_stat_count += 1
+        bytes_copied += int(result.get("bytes_copied", 0))
+        method = str(result.get("transfer_method", "") or "")
+        if method:
+            transfer_methods[method] = transfer_methods.get(method, 0) + 1
         if status == "create":
             created_count += 1
         elif status == "update":
@@ -206,11 +272,15 @@ def _phase_sync(
                 "destination": result["destination"],
                 "status": status,
                 "copied": bool(result["copied"]),
+                "skip_reason": result.get("skip_reason", ""),
+                "transfer_method": result.get("transfer_method", ""),
+                "backup_method": result.get("backup_method", ""),
                 "verify_ok": bool(result["verify_ok"]),
                 "backup_path": result["backup_path"],
             }
         )
 
+    cache_after = hash_cache.stats() if hash_cache is not None else {"hits": 0, "misses": 0}
     summary = {
         "phase": phase_name,
         "patterns": patterns,
@@ -220,6 +290,13 @@ def _phase_sync(
         "unchanged_count": unchanged_count,
         "copied_count": copied_count,
         "verified_count": verified_count,
+        "skipped_by_stat_count": skipped_by_stat_count,
+        "bytes_copied": bytes_copied,
+        "transfer_methods": transfer_methods,
+        "hash_cache_hits": int(cache_after["hits"]) - int(cache_before["hits"]),
+        "hash_cache_misses": int(cache_after["misses"]) - int(cache_before["misses"]),
+        "max_workers": max(1, int(max_workers)),
+        "duration_sec": round(time.monotonic() - started, 3),
         "error_count": len(errors),
         "files": details,
     }
@@ -233,6 +310,8 @@ def _sync_rollback_maps(
     backup_root: Path,
     verify_hash: bool,
     backup_before_overwrite: bool,
+    skip_by_stat: bool = True,
+    hash_cache: HashCache | None = None,
 ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     rows: List[Dict[str, Any]] = []
     errors: List[Dict[str, Any]] = []
@@ -257,6 +336,8 @@ def _sync_rollback_maps(
                 backup_root=backup_root / "rollback_maps",
                 verify_hash=verify_hash,
                 backup_before_overwrite=backup_before_overwrite,
+                skip_by_stat=skip_by_stat,
+                hash_cache=hash_cache,
             )
         except Exception as exc:
             errors.append(
@@ -276,6 +357,7 @@ def _sync_rollback_maps(
                 "destination": str(dst),
                 "status": result.get("status", ""),
                 "copied": bool(result.get("copied", False)),
+                "transfer_method": result.get("transfer_method", ""),
                 "verify_ok": bool(result.get("verify_ok", False)),
                 "backup_path": result.get("backup_path", ""),
             }
@@ -309,7 +391,8 @@ def main() -> int:
     )
 
     try:
-        cfg = load_config(args.config)
+        config = load_pipeline_config(args.config, run_dir)
+        cfg = config.raw
         baseline_cfg = require_nested(cfg, ("reference_baseline",))
 
         enabled = bool(baseline_cfg.get("enabled", False))
@@ -320,7 +403,7 @@ def main() -> int:
                 outputs={"enabled": False, "skipped": True, "reason": "reference_baseline.enabled=false"},
                 errors=[],
             )
-            write_json(report_path, report)
+            write_report(report_path, report)
             return 0
 
         project_root = _project_root()
@@ -339,37 +422,55 @@ def main() -> int:
         verify_hash = bool(sync_cfg.get("verify_hash", True))
         backup_before_overwrite = bool(sync_cfg.get("backup_before_overwrite", True))
         rollback_maps = [str(v) for v in sync_cfg.get("rollback_maps", [])]
+        skip_by_stat = bool(sync_cfg.get("skip_by_size_mtime", True))
+        max_workers = int(sync_cfg.get("max_workers", 4))
+        hash_cache: HashCache | None = None
+        if bool(sync_cfg.get("hash_cache", True)):
+            hash_cache = HashCache(_out_root(args, run_dir) / "cache" / "baseline_sync_hashes.json")
 
         backup_root = run_dir / "workspace" / "backups" / "baseline_sync" / timestamp_compact()
         backup_root.mkdir(parents=True, exist_ok=True)
 
-        phase1, phase1_errors = _phase_sync(
-            phase_name="phase1",
-            patterns=phase1_patterns,
-            reference_root=reference_root,
-            project_root=project_root,
-            backup_root=backup_root,
-            verify_hash=verify_hash,
-            backup_before_overwrite=backup_before_overwrite,
-        )
-        phase2, phase2_errors = _phase_sync(
-            phase_name="phase2",
-            patterns=phase2_patterns,
-            reference_root=reference_root,
-            project_root=project_root,
-            backup_root=backup_root,
-            verify_hash=verify_hash,
-            backup_before_overwrite=backup_before_overwrite,
-        )
+        with profile_span("phase1"):
+            phase1, phase1_errors = _phase_sync(
+                phase_name="phase1",
+                patterns=phase1_patterns,
+                reference_root=reference_root,
+                project_root=project_root,
+                backup_root=backup_root,
+                verify_hash=verify_hash,
+                backup_before_overwrite=backup_before_overwrite,
+                skip_by_stat=skip_by_stat,
+                max_workers=max_workers,
+                hash_cache=hash_cache,
+            )
+        with profile_span("phase2"):
+            phase2, phase2_errors = _phase_sync(
+                phase_name="phase2",
+                patterns=phase2_patterns,
+                reference_root=reference_root,
+                project_root=project_root,
+                backup_root=backup_root,
+                verify_hash=verify_hash,
+                backup_before_overwrite=backup_before_overwrite,
+                skip_by_stat=skip_by_stat,
+                max_workers=max_workers,
+                hash_cache=hash_cache,
+            )
 
-        rollback_rows, rollback_errors = _sync_rollback_maps(
-            rollback_maps=rollback_maps,
-            reference_root=reference_root,
-            project_root=project_root,
-            backup_root=backup_root,
-            verify_hash=verify_hash,
-            backup_before_overwrite=backup_before_overwrite,
-        )
+        with profile_span("rollback_maps"):
+            rollback_rows, rollback_errors = _sync_rollback_maps(
+                rollback_maps=rollback_maps,
+                reference_root=reference_root,
+                project_root=project_root,
+                backup_root=backup_root,
+                verify_hash=verify_hash,
+                backup_before_overwrite=backup_before_overwrite,
+                skip_by_stat=skip_by_stat,
+                hash_cache=hash_cache,
+            )
+        if hash_cache is not None:
+            hash_cache.save()
 
         errors = phase1_errors + phase2_errors + rollback_errors
         status = "success" if not errors else "failed"
@@ -386,12 +487,15 @@ def main() -> int:
                 "backup_root": str(backup_root.resolve()),
                 "verify_hash": verify_hash,
                 "backup_before_overwrite": backup_before_overwrite,
+                "skip_by_size_mtime": skip_by_stat,
+                "max_workers": max_workers,
+                "hash_cache": hash_cache.stats() if hash_cache is not None else {"enabled": False},
                 "phases": [phase1, phase2],
                 "rollback_maps": rollback_rows,
             },
             errors=errors,
         )
-        write_json(report_path, report)
+        write_report(report_path, report)
         return 0 if status == "success" else 1
 
     except (ConfigError, RuntimeError, Exception) as exc:
@@ -406,7 +510,7 @@ def main() -> int:
                 }
             ],
         )
-        write_json(report_path, report)
+        write_report(report_path, report)
         return 1
 
 
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Training cache: fingerprint a deformer's effective setup and keep trained assets per fingerprint.
+
+The fingerprint covers the deformer's package, the setup dump (model type, skeletal mesh, training
+inputs, NNM sections, model overrides), the content hash of every referenced /Game uasset and the
+determinism settings. An entry holds the trained deformer .uasset, the network file it produced
+(recorded relative to the project dir) and a meta.json.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from common import atomic_write_text, utc_now_iso
+from file_transfer import transfer_file
+
+CACHE_VERSION = 2
+
+# Setup dump fields that change the trained weights; test_anim and deformer_graph only affect preview.
+FINGERPRINT_FIELDS = (
+    "model_type",
+    "skeletal_mesh",
+    "training_input_anims_json",
+    "nnm_sections_json",
+    "model_overrides_json",
+)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, float):
+        return round(value, 8)
+    return value
+
+
+def _parse_json_field(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    raw = value.strip()
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except Exception:
+        return raw
+
+
+def package_name(game_path: str) -> str:
+    """'/Game/A/B.B' -> '/Game/A/B'."""
+    path = str(game_path or "").strip()
+    leaf = path.rsplit("/", 1)[-1]
+    if "." in leaf:
+        path = path[: len(path) - len(leaf)] + leaf.split(".", 1)[0]
+    return path
+
+
+def game_path_to_file(project_dir: Path, game_path: str) -> Path:
+    pkg = package_name(game_path)
+    if not pkg.startswith("/Game/"):
+        raise RuntimeError(f"Only /Game/ assets can be fingerprinted: {game_path}")
+    return project_dir / "Content" / f"{pkg[len('/Game/'):]}.uasset"
+
+
+def referenced_assets(dump: Dict[str, Any]) -> List[str]:
+    """All /Game packages referenced by the skeletal mesh, training inputs and NNM sections."""
+    found: set[str] = set()
+
+    def _walk(value: Any) -> None:
+        if isinstance(value, dict):
+            for v in value.values():
+                _walk(v)
+        elif isinstance(value, list):
+            for v in value:
+                _walk(v)
+        elif isinstance(value, str) and value.startswith("/Game/"):
+            found.add(package_name(value))
+
+    _walk(str(dump.get("skeletal_mesh", "") or ""))
+    _walk(_parse_json_field(dump.get("training_input_anims_json", "[]")))
+    _walk(_parse_json_field(dump.get("nnm_sections_json", "[]")))
+    return sorted(found)
+
+
+def setup_fingerprint(
+    asset_path: str,
+    dump: Dict[str, Any],
+    project_dir: Path,
+    determinism: Dict[str, Any],
+    hash_file: Callable[[Path], str],
+) -> Dict[str, Any]:
+    """Return {"fingerprint", "inputs"}; missing referenced files hash to '' so they never match a real entry.
+
+    The deformer's own package is part of the key: two deformers with identical setups still own
+    separate .uasset files and must not restore each other's.
+    """
+    setup = {field: _normalize(_parse_json_field(dump.get(field, ""))) for field in FINGERPRINT_FIELDS}
+    asset_hashes: Dict[str, str] = {}
+    for pkg in referenced_assets(dump):
+        path = game_path_to_file(project_dir, pkg)
+        asset_hashes[pkg] = hash_file(path) if path.is_file() else ""
+
+    inputs = {
+        "version": CACHE_VERSION,
+        "asset": package_name(asset_path),
+        "setup": setup,
+        "asset_hashes": asset_hashes,
+        "determinism": _normalize(determinism),
+    }
+    canonical = json.dumps(inputs, ensure_ascii=True, sort_keys=True, separators=(",", ":"))
+    return {"fingerprint": hashlib.sha256(canonical.encode("utf-8")).hexdigest(), "inputs": inputs}
+
+
+class TrainCache:
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def entry_dir(self, fingerprint: str) -> Path:
+        return self.root / fingerprint[:2] / fingerprint
+
+    def lookup(self, fingerprint: str) -> Dict[str, Any] | None:
+        entry = self.entry_dir(fingerprint)
+        meta_path = entry / "meta.json"
+        if not meta_path.is_file():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except Exception:
+            return None
+        if not isinstance(meta, dict) or int(meta.get("version", 0)) != CACHE_VERSION:
+            return None
+        if not (entry / str(meta.get("asset_file", ""))).is_file():
+            return None
+        meta["entry_dir"] = str(entry)
+        return meta
+
+    def store(
+        self,
+        fingerprint: str,
+        project_dir: Path,
+        asset_file: Path,
+        network_file: Path | None,
+        result: Dict[str, Any],
+        inputs: Dict[str, Any],
+    ) -> Path:
+        entry = self.entry_dir(fingerprint)
+        entry.mkdir(parents=True, exist_ok=True)
+        transfer_file(asset_file, entry / asset_file.name)
+        network_name = ""
+        network_rel = ""
+        if network_file is not None and network_file.is_file():
+            try:
+                network_rel = network_file.resolve().relative_to(Path(project_dir).resolve()).as_posix()
+            except ValueError:
+                # Outside the project: nowhere to put it back in another checkout, so it is not cached.
+                network_rel = ""
+        if network_rel:
+            network_name = network_file.name
+            transfer_file(network_file, entry / network_name)
+
+        meta = {
+            "version": CACHE_VERSION,
+            "fingerprint": fingerprint,
+            "created_at": utc_now_iso(),
+            "asset_path": result.get("asset_path", ""),
+            "model_type": result.get("model_type", ""),
+            "asset_file": asset_file.name,
+            "network_file": network_name,
+            "network_file_relpath": network_rel,
+            "training_result_code": result.get("training_result_code", -1),
+            "duration_sec": result.get("duration_sec", 0.0),
+            "network_loaded": bool(result.get("network_loaded", False)),
+            "inputs": inputs,
+        }
+        # meta.json last: an entry without it is ignored by lookup().
+        atomic_write_text(entry / "meta.json", json.dumps(meta, ensure_ascii=True, indent=2))
+        return entry
+
+    def restore(self, meta: Dict[str, Any], project_dir: Path, asset_file: Path) -> str:
+        """Copy the cached asset (and network file, to its path under project_dir) back; returns the network path."""
+        entry = Path(str(meta["entry_dir"]))
+        transfer_file(entry / str(meta["asset_file"]), asset_file)
+        network_rel = str(meta.get("network_file_relpath", "") or "")
+        network_name = str(meta.get("network_file", "") or "")
+        if not (network_rel and network_name and (entry / network_name).is_file()):
+            return ""
+        network_path = Path(project_dir) / network_rel
+        transfer_file(entry / network_name, network_path)
+        return str(network_path)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Training telemetry: stream per-iteration progress from the editor log into JSONL, then summarize it.
+
+`train_deformer_asset` blocks the editor main thread, so a background thread tails the editor log
+for the trainer's progress lines and samples process RSS. Each JSONL record carries
+ts, elapsed_sec, iteration, loss, samples_per_sec and rss_mb.
+"""
+
+from __future__ import annotations
+
+import calendar
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from common import current_rss_bytes, percentile, utc_now_iso
+
+DEFAULT_ITERATION_REGEX = r"(?i)\biter(?:ation)?s?\b\D{0,4}(\d+)"
+DEFAULT_LOSS_REGEX = r"(?i)\bloss\b\D{0,4}([-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)"
+# UE log prefix with LogTimes=UTC: [2026.01.31-12.34.56:789][ 42]LogPython: ...
+_UE_LOG_TIME = re.compile(r"^\[(\d{4})\.(\d{2})\.(\d{2})-(\d{2})\.(\d{2})\.(\d{2}):(\d{3})\]")
+
+# Convergence = first iteration that achieved this share of the total loss reduction.
+CONVERGENCE_SHARE = 0.95
+
+
+def latest_log_file(log_dir: Path) -> Path | None:
+    candidates = [p for p in log_dir.glob("*.log") if p.is_file()] if log_dir.is_dir() else []
+    if not candidates:
+        return None
+    return max(candidates, key=lambda p: p.stat().st_mtime)
+
+
+class TelemetryRecorder:
+    """Background sampler; use as a context manager around the blocking training call."""
+
+    def __init__(
+        self,
+        out_path: Path,
+        log_path: Path | None,
+        batch_size: int = 0,
+        interval_sec: float = 1.0,
+        iteration_regex: str = DEFAULT_ITERATION_REGEX,
+        loss_regex: str = DEFAULT_LOSS_REGEX,
+    ) -> None:
+        self.out_path = out_path
+        self.log_path = log_path
+        self.batch_size = max(0, int(batch_size))
+        self.interval_sec = max(0.1, float(interval_sec))
+        self._iter_re = re.compile(iteration_regex)
+        self._loss_re = re.compile(loss_regex)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._offset = 0
+        self._partial = ""
+        self._started = 0.0
+        self._started_wall = 0.0
+        self._last_iter: tuple[int, float] | None = None
+
+    def __enter__(self) -> "TelemetryRecorder":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        self.out_path.write_text("", encoding="utf-8")
+        if self.log_path is not None and self.log_path.exists():
+            self._offset = self.log_path.stat().st_size
+        self._started = time.monotonic()
+        self._started_wall = time.time()
+        self._thread = threading.Thread(target=self._run, name="hou2ue_train_telemetry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(5.0, self.interval_sec * 4))
+        try:
+            self._poll()
+        except Exception:
+            pass
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            try:
+                self._poll()
+            except Exception:
+                # Telemetry must never take down training.
+                continue
+
+    def _read_new_lines(self) -> List[str]:
+        if self.log_path is None or not self.log_path.exists():
+            return []
+        size = self.log_path.stat().st_size
+        if size < self._offset:
+            self._offset = 0
+        if size == self._offset:
+            return []
+        with self.log_path.open("rb") as handle:
+            handle.seek(self._offset)
+            chunk = handle.read(size - self._offset)
+        self._offset = size
+        text = self._partial + chunk.decode("utf-8", errors="ignore")
+        lines = text.split("\n")
+        self._partial = lines.pop()
+        return lines
+
+    def _line_elapsed(self, line: str, poll_elapsed: float) -> float:
+        """Prefer the log line's own timestamp; poll time batches every line read in one poll."""
+        match = _UE_LOG_TIME.match(line)
+        if match is None:
+            return poll_elapsed
+        y, mo, d, h, mi, sec, ms = (int(g) for g in match.groups())
+        elapsed = calendar.timegm((y, mo, d, h, mi, sec, 0, 0, 0)) + ms / 1000.0 - self._started_wall
+        # Out of range means the log is not in UTC; fall back to poll time.
+        return elapsed if -5.0 <= elapsed <= poll_elapsed + 5.0 else poll_elapsed
+
+    def _poll(self) -> None:
+        poll_elapsed = time.monotonic() - self._started
+        rss_mb = round(current_rss_bytes() / (1024.0 * 1024.0), 1)
+        records: List[Dict[str, Any]] = []
+        for line in self._read_new_lines():
+            iter_match = self._iter_re.search(line)
+            loss_match = self._loss_re.search(line)
+            if iter_match is None or loss_match is None:
+                continue
+            iteration = int(iter_match.group(1))
+            loss = float(loss_match.group(1))
+            elapsed = self._line_elapsed(line, poll_elapsed)
+            samples_per_sec = 0.0
+            if self._last_iter is not None and iteration > self._last_iter[0] and elapsed > self._last_iter[1]:
+                iters_per_sec = (iteration - self._last_iter[0]) / (elapsed - self._last_iter[1])
+                samples_per_sec = round(iters_per_sec * self.batch_size, 3) if self.batch_size else 0.0
+            if self._last_iter is None or iteration != self._last_iter[0]:
+                self._last_iter = (iteration, elapsed)
+            records.append(
+                {
+                    "ts": utc_now_iso(),
+                    "elapsed_sec": round(elapsed, 3),
+                    "iteration": iteration,
+                    "loss": loss,
+                    "samples_per_sec": samples_per_sec,
+                    "rss_mb": rss_mb,
+                }
+            )
+        if not records:
+            # Heartbeat keeps the RSS curve continuous through phases without progress lines.
+            records.append({"ts": utc_now_iso(), "elapsed_sec": round(poll_elapsed, 3), "rss_mb": rss_mb})
+        with self.out_path.open("a", encoding="utf-8") as handle:
+            for rec in records:
+                handle.write(json.dumps(rec, ensure_ascii=True) + "\n")
+
+
+def summarize_telemetry(path: Path) -> Dict[str, Any]:
+    rows: List[Dict[str, Any]] = []
+    if path.exists():
+        for raw in path.read_text(encoding="utf-8", errors="ignore").splitlines():
+            try:
+                rows.append(json.loads(raw))
+            except ValueError:
+                continue
+
+    rss = [float(r["rss_mb"]) for r in rows if "rss_mb" in r]
+    progress = [r for r in rows if "iteration" in r and "loss" in r]
+    summary: Dict[str, Any] = {
+        "telemetry_path": str(path.resolve()) if path.exists() else str(path),
+        "record_count": len(rows),
+        "progress_count": len(progress),
+        "rss_peak_mb": max(rss) if rss else 0.0,
+    }
+    if not progress:
+        return summary
+
+    # Iteration time from consecutive progress records (log lines may be every N iterations).
+    iter_times: List[float] = []
+    for prev, cur in zip(progress, progress[1:]):
+        d_iter = int(cur["iteration"]) - int(prev["iteration"])
+        d_t = float(cur["elapsed_sec"]) - float(prev["elapsed_sec"])
+        if d_iter > 0 and d_t > 0:
+            iter_times.append(d_t / d_iter)
+    throughput = [float(r["samples_per_sec"]) for r in progress if float(r.get("samples_per_sec", 0.0)) > 0]
+
+    losses = [float(r["loss"]) for r in progress]
+    first_loss, min_loss = losses[0], min(losses)
+    target = min_loss + (1.0 - CONVERGENCE_SHARE) * (first_loss - min_loss)
+    converged = next(r for r in progress if float(r["loss"]) <= target)
+
+    summary.update(
+        {
+            "last_iteration": int(progress[-1]["iteration"]),
+            "iteration_time_p50_sec": round(percentile(iter_times, 50), 6) if iter_times else 0.0,
+            "iteration_time_p95_sec": round(percentile(iter_times, 95), 6) if iter_times else 0.0,
+            "samples_per_sec_p50": round(percentile(throughput, 50), 3) if throughput else 0.0,
+            "first_loss": first_loss,
+            "final_loss": losses[-1],
+            "min_loss": min_loss,
+            "convergence_share": CONVERGENCE_SHARE,
+            "convergence_iteration": int(converged["iteration"]),
+            "convergence_elapsed_sec": float(converged["elapsed_sec"]),
+        }
+    )
+    return summary
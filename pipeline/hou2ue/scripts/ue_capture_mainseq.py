@@ -5,17 +5,15 @@ from __future__ import annotations
 
 import argparse
 import json
-import os
-import re
 import shutil
-import subprocess
-import time
 import traceback
-from collections import deque
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
-from common import finalize_report, load_config, make_report, require_nested, stage_report_path, write_json
+from common import finalize_report, make_report, require_nested, stage_report_path
+from editor_process import resolve_editor_cmd, run_guarded_process
+from pipeline_config import load_pipeline_config
+from report_store import write_report
 
 
 def parse_args() -> argparse.Namespace:
@@ -36,128 +34,6 @@ def _resolve_path(base: Path, value: str) -> Path:
     return path if path.is_absolute() else (base / path).resolve()
 
 
-def _resolve_editor_cmd(ue_editor_exe: str) -> Path:
-    exe_path = Path(ue_editor_exe)
-    if not exe_path.exists():
-        raise RuntimeError(f"UE editor executable not found: {exe_path}")
-
-    if exe_path.name.lower() == "unrealeditor-cmd.exe":
-        return exe_path
-    candidate = exe_path.with_name("UnrealEditor-Cmd.exe")
-    if candidate.exists():
-        return candidate
-    return exe_path
-
-
-def _tail_lines(path: Path, max_lines: int = 120) -> List[str]:
-    if not path.exists():
-        return []
-    out: deque[str] = deque(maxlen=max_lines)
-    with path.open("r", encoding="utf-8", errors="ignore") as handle:
-        for line in handle:
-            out.append(line.rstrip("\n"))
-    return list(out)
-
-
-def _detect_repeated_error_line(log_paths: List[Path], threshold: int) -> Tuple[str, int]:
-    if threshold <= 0:
-        return "", 0
-
-    pattern = re.compile(r"(error|exception|traceback|fatal|failed|assert)", flags=re.IGNORECASE)
-    counts: Dict[str, int] = {}
-    for log_path in log_paths:
-        for raw in _tail_lines(log_path, max_lines=500):
-            line = raw.strip()
-            if not line or not pattern.search(line):
-                continue
-            counts[line] = counts.get(line, 0) + 1
-
-    if not counts:
-        return "", 0
-    line, count = max(counts.items(), key=lambda kv: kv[1])
-    if count >= threshold:
-        return line, count
-    return "", 0
-
-
-def _kill_process_tree(pid: int) -> None:
-    if pid <= 0:
-        return
-    if os.name == "nt":
-        subprocess.run(["taskkill", "/PID", str(pid), "/T", "/F"], check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        return
-    try:
-        os.kill(pid, 9)
-    except OSError:
-        pass
-
-
-def _run_guarded_process(
-    cmd: List[str],
-    stdout_path: Path,
-    stderr_path: Path,
-    timeout_minutes: int,
-    no_activity_minutes: int,
-    repeated_error_threshold: int,
-) -> Dict[str, Any]:
-    stdout_path.parent.mkdir(parents=True, exist_ok=True)
-    stderr_path.parent.mkdir(parents=True, exist_ok=True)
-    stdout_path.unlink(missing_ok=True)
-    stderr_path.unlink(missing_ok=True)
-
-    start = time.monotonic()
-    last_activity = start
-    last_sizes = (0, 0)
-    abort_reason = ""
-    repeated_error_line = ""
-
-    with stdout_path.open("w", encoding="utf-8", errors="ignore") as out_handle, stderr_path.open("w", encoding="utf-8", errors="ignore") as err_handle:
-        proc = subprocess.Popen(cmd, stdout=out_handle, stderr=err_handle)
-
-        while proc.poll() is None:
-            time.sleep(5)
-
-            std_size = stdout_path.stat().st_size if stdout_path.exists() else 0
-            err_size = stderr_path.stat().st_size if stderr_path.exists() else 0
-            if (std_size, err_size) != last_sizes:
-                last_sizes = (std_size, err_size)
-                last_activity = time.monotonic()
-
-            line, count = _detect_repeated_error_line([stdout_path, stderr_path], repeated_error_threshold)
-            if line:
-                abort_reason = "repeated_error"
-                repeated_error_line = f"{line} (x{count})"
-                _kill_process_tree(proc.pid)
-                break
-
-            now = time.monotonic()
-            if now - start > timeout_minutes * 60:
-                abort_reason = "timeout"
-                _kill_process_tree(proc.pid)
-                break
-            if now - last_activity > no_activity_minutes * 60:
-                abort_reason = "no_activity"
-                _kill_process_tree(proc.pid)
-                break
-
-        try:
-            exit_code = proc.wait(timeout=20)
-        except subprocess.TimeoutExpired:
-            _kill_process_tree(proc.pid)
-            exit_code = -9
-
-    return {
-        "exit_code": int(exit_code),
-        "duration_sec": round(time.monotonic() - start, 3),
-        "abort_reason": abort_reason,
-        "repeated_error_line": repeated_error_line,
-        "stdout_path": str(stdout_path.resolve()),
-        "stderr_path": str(stderr_path.resolve()),
-        "stdout_tail": _tail_lines(stdout_path, 80),
-        "stderr_tail": _tail_lines(stderr_path, 80),
-    }
-
-
 def _count_frames(frame_dir: Path, ext: str) -> Tuple[int, str, str]:
     files = sorted([p for p in frame_dir.rglob(f"*.{ext.lower()}") if p.is_file()])
     if not files:
@@ -241,7 +117,8 @@ def main() -> int:
     )
 
     try:
-        cfg = load_config(args.config)
+        config = load_pipeline_config(args.config, run_dir)
+        cfg = config.raw
         ue_cfg = require_nested(cfg, ("ue",))
         gt_cfg = require_nested(ue_cfg, ("ground_truth",))
 
@@ -253,7 +130,7 @@ def main() -> int:
                 outputs={"enabled": False, "skipped": True, "reason": "ue.ground_truth.enabled=false"},
                 errors=[],
             )
-            write_json(report_path, report)
+            write_report(report_path, report)
             return 0
 
         driver = str(gt_cfg.get("driver", "main_sequence_direct") or "main_sequence_direct")
@@ -287,7 +164,7 @@ def main() -> int:
         executor_sync_files: List[str] = []
         if args.capture_kind == "reference":
             executor_sync_files = _ensure_runtime_executor_available(uproject_path, project_root)
-        editor_cmd = _resolve_editor_cmd(str(require_nested(cfg, ("paths", "ue_editor_exe"))))
+        editor_cmd = resolve_editor_cmd(str(require_nested(cfg, ("paths", "ue_editor_exe"))))
 
         gt_root = run_dir / "workspace" / "staging" / args.profile / "gt" / args.capture_kind
         frame_dir = gt_root / "frames"
@@ -332,7 +209,7 @@ def main() -> int:
         if frame_window != "full_sequence":
             raise RuntimeError(f"Unsupported frame_window mode: {frame_window}")
 
-        process_result = _run_guarded_process(
+        process_result = run_guarded_process(
             cmd=cmd,
             stdout_path=stdout_path,
             stderr_path=stderr_path,
@@ -370,7 +247,7 @@ def main() -> int:
 
             cmd = list(cmd)
             cmd[1] = str(source_uproject)
-            process_result = _run_guarded_process(
+            process_result = run_guarded_process(
                 cmd=cmd,
                 stdout_path=stdout_path,
                 stderr_path=stderr_path,
@@ -399,7 +276,7 @@ def main() -> int:
             report_json.unlink(missing_ok=True)
 
             cmd = [arg for arg in cmd if arg != "-game"]
-            process_result = _run_guarded_process(
+            process_result = run_guarded_process(
                 cmd=cmd,
                 stdout_path=stdout_path,
                 stderr_path=stderr_path,
@@ -459,7 +336,7 @@ def main() -> int:
             },
             errors=errors,
         )
-        write_json(report_path, report)
+        write_report(report_path, report)
         return 0 if success else 1
 
     except Exception as exc:
@@ -469,7 +346,7 @@ def main() -> int:
             outputs={},
             errors=[{"message": str(exc), "traceback": traceback.format_exc()}],
         )
-        write_json(report_path, report)
+        write_report(report_path, report)
         return 1
 
 
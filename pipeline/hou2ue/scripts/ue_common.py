@@ -4,39 +4,20 @@
 from __future__ import annotations
 
 import datetime as _dt
-import json
 import os
 from pathlib import Path
 from typing import Any, Dict, Iterable
 
+# Span profiler shared with the host-side scripts; UE stages put this directory on sys.path first.
+from common import begin_report_profile, profile_span, report_profile_spans  # noqa: F401
+from pipeline_config import load_pipeline_config
+from report_store import write_report
+
 
 def utc_now_iso() -> str:
     return _dt.datetime.now(_dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
-def _load_config_file(path: Path) -> Dict[str, Any]:
-    raw = path.read_text(encoding="utf-8").lstrip("\ufeff")
-    try:
-        parsed = json.loads(raw)
-        if isinstance(parsed, dict):
-            return parsed
-    except json.JSONDecodeError:
-        pass
-
-    try:
-        import yaml  # type: ignore
-
-        parsed = yaml.safe_load(raw)
-        if isinstance(parsed, dict):
-            return parsed
-    except ModuleNotFoundError as exc:
-        raise RuntimeError(
-            "Pipeline config is not JSON-compatible and PyYAML is not installed in UE Python."
-        ) from exc
-
-    raise RuntimeError(f"Unable to parse config file: {path}")
-
-
 def _require_env(name: str) -> str:
     val = os.environ.get(name, "").strip()
     if not val:
@@ -49,17 +30,19 @@ def get_context() -> Dict[str, Any]:
     run_dir = Path(_require_env("HOU2UE_RUN_DIR"))
     profile = _require_env("HOU2UE_PROFILE")
 
-    config = _load_config_file(config_path)
+    # The orchestrator leaves a compiled snapshot in run_dir; reuse it instead of re-validating here.
+    pipeline_config = load_pipeline_config(config_path, run_dir)
     return {
         "config_path": config_path,
         "run_dir": run_dir,
         "profile": profile,
-        "config": config,
+        "config": pipeline_config.raw,
+        "pipeline_config": pipeline_config,
     }
 
 
 def make_report(stage: str, profile: str, inputs: Dict[str, Any] | None = None) -> Dict[str, Any]:
-    return {
+    report = {
         "stage": stage,
         "profile": profile,
         "started_at": utc_now_iso(),
@@ -69,6 +52,8 @@ def make_report(stage: str, profile: str, inputs: Dict[str, Any] | None = None)
         "outputs": {},
         "errors": [],
     }
+    begin_report_profile(report)
+    return report
 
 
 def finalize_report(
@@ -81,14 +66,12 @@ def finalize_report(
     report["status"] = status
     report["outputs"] = outputs or {}
     report["errors"] = errors or []
+    report["outputs"]["profile_spans"] = report_profile_spans(report)
     return report
 
 
 def write_stage_report(run_dir: Path, stage: str, report: Dict[str, Any]) -> Path:
-    out_path = run_dir / "reports" / f"{stage}_report.json"
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(json.dumps(report, ensure_ascii=True, indent=2), encoding="utf-8")
-    return out_path
+    return write_report(run_dir / "reports" / f"{stage}_report.json", report)
 
 
 def get_nested(data: Dict[str, Any], keys: Iterable[str], default: Any = None) -> Any:
@@ -20,7 +20,9 @@ from collections import deque
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
-from common import finalize_report, load_config, make_report, require_nested, stage_report_path, write_json
+from common import finalize_report, make_report, require_nested, stage_report_path
+from pipeline_config import load_pipeline_config
+from report_store import write_report
 
 
 def parse_args() -> argparse.Namespace:
@@ -262,7 +264,8 @@ def main() -> int:
     )
 
     try:
-        cfg = load_config(args.config)
+        config = load_pipeline_config(args.config, run_dir)
+        cfg = config.raw
         project_root = _script_project_root()
 
         ue_cfg = require_nested(cfg, ("ue",))
@@ -299,7 +302,7 @@ def main() -> int:
                 },
                 errors=[],
             )
-            write_json(report_path, report)
+            write_report(report_path, report)
             return 0
 
         driver = str(demo_cfg.get("driver", "runtime_mrq_python_executor"))
@@ -542,7 +545,7 @@ def main() -> int:
             },
             errors=errors,
         )
-        write_json(report_path, report)
+        write_report(report_path, report)
         return 0 if status == "success" else 1
 
     except Exception as exc:
@@ -557,7 +560,7 @@ def main() -> int:
                 }
             ],
         )
-        write_json(report_path, report)
+        write_report(report_path, report)
         return 1
 
 
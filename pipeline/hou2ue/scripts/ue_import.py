@@ -3,11 +3,14 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import sys
+import time
 import traceback
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import unreal
 
@@ -15,12 +18,17 @@ _THIS_DIR = Path(__file__).resolve().parent
 if str(_THIS_DIR) not in sys.path:
     sys.path.insert(0, str(_THIS_DIR))
 
+from hash_cache import HashCache
+from import_ledger import ImportLedger, source_fingerprint
+from train_cache import game_path_to_file
 from ue_common import (
     apply_template,
     finalize_report,
     get_context,
     make_report,
+    profile_span,
     require_nested,
+    save_asset,
     write_stage_report,
 )
 
@@ -46,55 +54,100 @@ def _asset_exists(asset_path: str) -> bool:
     return unreal.EditorAssetLibrary.does_asset_exist(asset_path)
 
 
-def _build_fbx_options(import_kind: str, skeleton: Optional[unreal.Skeleton]) -> unreal.FbxImportUI:
-    options = unreal.FbxImportUI()
-    _set_prop_safe(options, "automated_import_should_detect_type", False)
-    _set_prop_safe(options, "import_materials", False)
-    _set_prop_safe(options, "import_textures", False)
-
-    if import_kind == "skeletal_mesh":
-        _set_prop_safe(options, "import_mesh", True)
-        _set_prop_safe(options, "import_as_skeletal", True)
-        _set_prop_safe(options, "import_animations", False)
-        _set_prop_safe(options, "mesh_type_to_import", unreal.FBXImportType.FBXIT_SKELETAL_MESH)
-    elif import_kind == "animation":
-        _set_prop_safe(options, "import_mesh", False)
-        _set_prop_safe(options, "import_as_skeletal", False)
-        _set_prop_safe(options, "import_animations", True)
-        _set_prop_safe(options, "mesh_type_to_import", unreal.FBXImportType.FBXIT_ANIMATION)
-        if skeleton is not None:
-            _set_prop_safe(options, "skeleton", skeleton)
-    else:
+# Bump when _build_fbx_options / _build_abc_options change in a way the option values below do not show.
+IMPORT_OPTIONS_VERSION = 1
+
+_FBX_COMMON_OPTIONS: Dict[str, Any] = {
+    "automated_import_should_detect_type": False,
+    "import_materials": False,
+    "import_textures": False,
+}
+# Enum values are FBXImportType member names.
+_FBX_KIND_OPTIONS: Dict[str, Dict[str, Any]] = {
+    "skeletal_mesh": {
+        "import_mesh": True,
+        "import_as_skeletal": True,
+        "import_animations": False,
+        "mesh_type_to_import": "FBXIT_SKELETAL_MESH",
+    },
+    "animation": {
+        "import_mesh": False,
+        "import_as_skeletal": False,
+        "import_animations": True,
+        "mesh_type_to_import": "FBXIT_ANIMATION",
+    },
+}
+# Disable UE's built-in axis conversion — the Houdini side already
+# baked Y<->Z swap + x100 scale in the VEX coord transform.  Leaving
+# the default Maya preset would double-apply the axis rotation.
+_ABC_CONVERSION_OPTIONS: Dict[str, Any] = {
+    "preset": "CUSTOM",
+    "flip_u": False,
+    "flip_v": False,
+    "rotation": [0.0, 0.0, 0.0],
+    "scale": [1.0, 1.0, 1.0],
+}
+# Keep source track/object names so MLDeformer can match against skeletal mesh geometry parts.
+_ABC_GEOMETRY_CACHE_OPTIONS: Dict[str, Any] = {
+    "flatten_tracks": False,
+    "store_imported_vertex_numbers": True,
+    "b_store_imported_vertex_numbers": True,
+}
+
+
+def _fbx_option_values(import_kind: str) -> Dict[str, Any]:
+    if import_kind not in _FBX_KIND_OPTIONS:
         raise RuntimeError(f"Unsupported FBX import kind: {import_kind}")
+    return dict(_FBX_COMMON_OPTIONS, **_FBX_KIND_OPTIONS[import_kind])
+
+
+def _abc_option_values() -> Dict[str, Any]:
+    return {
+        "import_type": "GEOMETRY_CACHE",
+        "conversion_settings": dict(_ABC_CONVERSION_OPTIONS),
+        "geometry_cache_settings": dict(_ABC_GEOMETRY_CACHE_OPTIONS),
+    }
+
+
+def _options_key(label: str, values: Dict[str, Any]) -> str:
+    """Ledger key for an options set: label plus a digest of the option values and IMPORT_OPTIONS_VERSION."""
+    payload = json.dumps({"version": IMPORT_OPTIONS_VERSION, "values": values}, sort_keys=True, separators=(",", ":"))
+    return f"{label}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]}"
 
+
+def _build_fbx_options(import_kind: str, skeleton: Optional[unreal.Skeleton]) -> unreal.FbxImportUI:
+    options = unreal.FbxImportUI()
+    for key, value in _fbx_option_values(import_kind).items():
+        if key == "mesh_type_to_import":
+            value = getattr(unreal.FBXImportType, value)
+        _set_prop_safe(options, key, value)
+    if import_kind == "animation" and skeleton is not None:
+        _set_prop_safe(options, "skeleton", skeleton)
     return options
 
 
 def _build_abc_options() -> Optional[unreal.AbcImportSettings]:
+    values = _abc_option_values()
     try:
         options = unreal.AbcImportSettings()
-        _set_prop_safe(options, "import_type", unreal.AlembicImportType.GEOMETRY_CACHE)
-        # Disable UE's built-in axis conversion — the Houdini side already
-        # baked Y<->Z swap + x100 scale in the VEX coord transform.  Leaving
-        # the default Maya preset would double-apply the axis rotation.
+        _set_prop_safe(options, "import_type", getattr(unreal.AlembicImportType, values["import_type"]))
         try:
             conv = options.get_editor_property("conversion_settings")
             if conv is not None:
-                _set_prop_safe(conv, "preset", unreal.AbcConversionPreset.CUSTOM)
-                _set_prop_safe(conv, "flip_u", False)
-                _set_prop_safe(conv, "flip_v", False)
-                _set_prop_safe(conv, "rotation", unreal.Vector(0.0, 0.0, 0.0))
-                _set_prop_safe(conv, "scale", unreal.Vector(1.0, 1.0, 1.0))
+                conv_values = values["conversion_settings"]
+                _set_prop_safe(conv, "preset", getattr(unreal.AbcConversionPreset, conv_values["preset"]))
+                _set_prop_safe(conv, "flip_u", conv_values["flip_u"])
+                _set_prop_safe(conv, "flip_v", conv_values["flip_v"])
+                _set_prop_safe(conv, "rotation", unreal.Vector(*conv_values["rotation"]))
+                _set_prop_safe(conv, "scale", unreal.Vector(*conv_values["scale"]))
                 _set_prop_safe(options, "conversion_settings", conv)
         except Exception:
             pass
-        # Keep source track/object names so MLDeformer can match against skeletal mesh geometry parts.
         try:
             gc_settings = options.get_editor_property("geometry_cache_settings")
             if gc_settings is not None:
-                _set_prop_safe(gc_settings, "flatten_tracks", False)
-                _set_prop_safe(gc_settings, "store_imported_vertex_numbers", True)
-                _set_prop_safe(gc_settings, "b_store_imported_vertex_numbers", True)
+                for key, value in values["geometry_cache_settings"].items():
+                    _set_prop_safe(gc_settings, key, value)
                 _set_prop_safe(options, "geometry_cache_settings", gc_settings)
         except Exception:
             pass
@@ -103,16 +156,10 @@ def _build_abc_options() -> Optional[unreal.AbcImportSettings]:
         return None
 
 
-def _run_import_task(
-    source_file: Path,
-    destination_asset: str,
-    options: Any,
-) -> Dict[str, Any]:
+def _make_import_task(source_file: Path, destination_asset: str, options: Any, save: bool) -> unreal.AssetImportTask:
     folder, name = _split_asset(destination_asset)
     _ensure_folder(folder)
 
-    existed = _asset_exists(destination_asset)
-
     task = unreal.AssetImportTask()
     task.filename = str(source_file)
     task.destination_path = folder
@@ -120,12 +167,19 @@ def _run_import_task(
     task.automated = True
     task.replace_existing = True
     task.replace_existing_settings = True
-    task.save = True
+    task.save = save
     if options is not None:
         task.options = options
+    return task
 
-    unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks([task])
 
+def _task_result(
+    task: unreal.AssetImportTask,
+    source_file: Path,
+    destination_asset: str,
+    options: Any,
+    existed: bool,
+) -> Dict[str, Any]:
     imported = [str(v) for v in task.get_editor_property("imported_object_paths")]
     status = "update" if existed else "create"
 
@@ -164,6 +218,112 @@ def _run_import_task(
     return result
 
 
+def _run_import_batch(
+    jobs: List[tuple[Path, str]],
+    build_options: Callable[[], Any],
+    save: bool = True,
+) -> List[Dict[str, Any]]:
+    """Import (source, destination) pairs in a single import_asset_tasks call.
+
+    Each task gets its own options object from build_options(): importers write per-file state
+    (e.g. the Alembic frame range) back into their settings, so a shared object would leak it.
+    With save=False packages stay dirty in memory; the caller saves them with _save_imported_assets.
+    If the batch call raises, each job is retried alone so one bad source cannot fail its neighbours.
+    """
+    if not jobs:
+        return []
+
+    existed = [_asset_exists(dst) for _, dst in jobs]
+    task_options = [build_options() for _ in jobs]
+    tasks = [_make_import_task(src, dst, options, save) for (src, dst), options in zip(jobs, task_options)]
+    started = time.perf_counter()
+    try:
+        unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks(tasks)
+    except Exception as exc:
+        if len(jobs) == 1:
+            src, dst = jobs[0]
+            return [
+                {
+                    "source": str(src),
+                    "destination": dst,
+                    "status": "failed",
+                    "imported_object_paths": [],
+                    "success": False,
+                    "error": f"import_asset_tasks raised: {exc}",
+                }
+            ]
+        unreal.log_warning(f"[ue_import] Batch of {len(jobs)} imports raised ({exc}); retrying one by one")
+        return [row for job in jobs for row in _run_import_batch([job], build_options, save=save)]
+    batch_sec = round(time.perf_counter() - started, 3)
+
+    results: List[Dict[str, Any]] = []
+    for task, (src, dst), options, was_present in zip(tasks, jobs, task_options, existed):
+        result = _task_result(task, src, dst, options, was_present)
+        result["batch_size"] = len(jobs)
+        result["batch_sec"] = batch_sec
+        results.append(result)
+    return results
+
+
+def _run_import_task(
+    source_file: Path,
+    destination_asset: str,
+    build_options: Callable[[], Any],
+) -> Dict[str, Any]:
+    return _run_import_batch([(source_file, destination_asset)], build_options, save=True)[0]
+
+
+def _save_imported_assets(asset_paths: List[str]) -> Dict[str, Any]:
+    """Save every imported package in one pass instead of one save per import task."""
+    started = time.perf_counter()
+    packages: List[Any] = []
+    for asset_path in asset_paths:
+        asset = unreal.load_asset(asset_path)
+        if asset is None:
+            continue
+        try:
+            packages.append(asset.get_outermost())
+        except Exception:
+            continue
+
+    saved_via = "save_packages"
+    failed: List[str] = []
+    utils = getattr(unreal, "EditorLoadingAndSavingUtils", None)
+    if packages and len(packages) == len(asset_paths) and hasattr(utils, "save_packages"):
+        if not utils.save_packages(packages, False):
+            failed = list(asset_paths)
+    else:
+        saved_via = "save_asset"
+        failed = [path for path in asset_paths if not save_asset(path)]
+
+    return {
+        "asset_count": len(asset_paths),
+        "saved_via": saved_via,
+        "failed": failed,
+        "duration_sec": round(time.perf_counter() - started, 3),
+    }
+
+
+def _cache_dir(run_dir: Path) -> Path:
+    out_root = str(os.environ.get("HOU2UE_OUT_ROOT", "") or "").strip()
+    return Path(out_root) / "cache" if out_root else run_dir / "workspace" / "cache"
+
+
+def _project_dir() -> Path:
+    return Path(unreal.Paths.convert_relative_path_to_full(unreal.Paths.project_dir()))
+
+
+def _skip_row(source_file: Path, destination_asset: str, fingerprint: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "source": str(source_file),
+        "destination": destination_asset,
+        "status": "skip_unchanged",
+        "imported_object_paths": [],
+        "success": True,
+        "source_sha256": fingerprint["sha256"],
+    }
+
+
 def _load_body_skeleton(body_mesh_asset: str) -> Optional[unreal.Skeleton]:
     skm = unreal.load_asset(body_mesh_asset)
     if skm is None:
@@ -287,24 +447,88 @@ def main() -> int:
 
         coord_manifest = _load_coord_manifest(run_dir)
         coord_entries = coord_manifest.get("entries", {}) if isinstance(coord_manifest.get("entries"), dict) else {}
-        houdini_cfg = cfg.get("houdini", {}) if isinstance(cfg.get("houdini"), dict) else {}
-        coord_cfg = houdini_cfg.get("coord_system", {}) if isinstance(houdini_cfg.get("coord_system"), dict) else {}
-        validate_cfg = coord_cfg.get("validate", {}) if isinstance(coord_cfg.get("validate"), dict) else {}
-        coord_validate_enabled = bool(validate_cfg.get("enabled", False))
-        coord_tolerance = float(validate_cfg.get("tolerance", 0.15))
-        coord_fail_on_mismatch = bool(validate_cfg.get("fail_on_mismatch", True))
+        coord_system = ctx["pipeline_config"].coord_system
+        coord_validate_enabled = coord_system.validate_enabled
+        coord_tolerance = coord_system.validate_tolerance
+        coord_fail_on_mismatch = coord_system.validate_fail_on_mismatch
 
         import_cfg = require_nested(cfg, ("ue", "imports"))
         skm_jobs = list(require_nested(import_cfg, ("skeletal_meshes",)))
         anim_jobs = list(require_nested(import_cfg, ("animations",)))
         baseline_cfg = cfg.get("reference_baseline", {}) if isinstance(cfg.get("reference_baseline"), dict) else {}
         skip_static_imports = bool(baseline_cfg.get("enabled", False))
+        batched = bool(import_cfg.get("batched", True))
+        skip_unchanged = bool(import_cfg.get("skip_unchanged", True))
+
+        project_dir = _project_dir()
+        ledger: Optional[ImportLedger] = None
+        source_hashes: Optional[HashCache] = None
+        if skip_unchanged:
+            cache_dir = _cache_dir(run_dir)
+            ledger = ImportLedger(cache_dir / f"import_ledger_{project_dir.name}.json")
+            source_hashes = HashCache(cache_dir / "import_source_hashes.json")
+        # (destination, source fingerprint, options key) of every import still to be recorded after save.
+        pending_ledger: List[tuple[str, Dict[str, Any], str]] = []
+        skip_reasons: Dict[str, str] = {}
 
         results: List[Dict[str, Any]] = []
         errors: List[Dict[str, Any]] = []
         coord_targets: Dict[str, str] = {}
-
-        # 1) Skeletal meshes.
+        imported_assets: List[str] = []
+
+        def _import_jobs(
+            jobs: List[tuple[Path, str]],
+            build_options: Callable[[], Any],
+            options_key: str,
+            error_message: str,
+            allow_skip: bool = True,
+        ) -> List[Dict[str, Any]]:
+            skipped: List[Dict[str, Any]] = []
+            to_import: List[tuple[Path, str]] = []
+            fingerprints: Dict[str, Dict[str, Any]] = {}
+            for src, dst in jobs:
+                if ledger is None or source_hashes is None:
+                    to_import.append((src, dst))
+                    continue
+                fingerprint = source_fingerprint(src, source_hashes.sha256)
+                fingerprints[dst] = fingerprint
+                reason = ledger.check(dst, fingerprint, options_key, game_path_to_file(project_dir, dst))
+                if not reason and not _asset_exists(dst):
+                    reason = "asset_missing"
+                if not reason and not allow_skip:
+                    reason = "dependency_reimported"
+                if reason:
+                    skip_reasons[dst] = reason
+                    to_import.append((src, dst))
+                else:
+                    skipped.append(_skip_row(src, dst, fingerprint))
+
+            with profile_span(f"import:{options_key}") as span:
+                if batched:
+                    rows = _run_import_batch(to_import, build_options, save=False)
+                else:
+                    rows = [_run_import_task(src, dst, build_options) for src, dst in to_import]
+                span["assets"] = len(to_import)
+                span["skipped"] = len(skipped)
+            for row in rows:
+                dst = row["destination"]
+                if dst in skip_reasons:
+                    row["reimport_reason"] = skip_reasons[dst]
+                if row["success"]:
+                    imported_assets.append(dst)
+                    if dst in fingerprints:
+                        row["source_sha256"] = fingerprints[dst]["sha256"]
+                        pending_ledger.append((dst, fingerprints[dst], options_key))
+                else:
+                    if ledger is not None:
+                        ledger.forget(dst)
+                    errors.append({"message": row.get("error", error_message), "destination": dst})
+            results.extend(skipped)
+            results.extend(rows)
+            return skipped + rows
+
+        # 1) Skeletal meshes, one batch (animations below depend on the body skeleton).
+        skm_pending: List[tuple[Path, str]] = []
         for job in skm_jobs:
             dst = str(require_nested(job, ("destination",)))
             if skip_static_imports:
@@ -326,17 +550,27 @@ def main() -> int:
             if not src.exists():
                 errors.append({"message": f"Missing source file: {src}", "destination": dst})
                 continue
-            options = _build_fbx_options("skeletal_mesh", skeleton=None)
-            result = _run_import_task(src, dst, options)
-            results.append(result)
-            if not result["success"]:
-                errors.append({"message": result.get("error", "Import failed"), "destination": dst})
+            skm_pending.append((src, dst))
+        _import_jobs(
+            skm_pending,
+            lambda: _build_fbx_options("skeletal_mesh", skeleton=None),
+            _options_key("fbx:skeletal_mesh", _fbx_option_values("skeletal_mesh")),
+            "Import failed",
+        )
 
         # 2) Load skeleton from body mesh for animation import.
         body_mesh_asset = "/Game/Characters/Emil/Models/Body/skm_Emil"
         body_skeleton = _load_body_skeleton(body_mesh_asset)
+        body_reimported = body_mesh_asset in imported_assets
+        skeleton_path = ""
+        if body_skeleton is not None:
+            try:
+                skeleton_path = str(body_skeleton.get_path_name())
+            except Exception:
+                skeleton_path = ""
 
-        # 3) Animations.
+        # 3) Animations, one batch sharing the body skeleton.
+        anim_pending: List[tuple[Path, str]] = []
         for job in anim_jobs:
             dst = str(require_nested(job, ("destination",)))
             if skip_static_imports:
@@ -358,13 +592,19 @@ def main() -> int:
             if not src.exists():
                 errors.append({"message": f"Missing source file: {src}", "destination": dst})
                 continue
-            options = _build_fbx_options("animation", skeleton=body_skeleton)
-            result = _run_import_task(src, dst, options)
-            results.append(result)
-            if not result["success"]:
-                errors.append({"message": result.get("error", "Import failed"), "destination": dst})
+            anim_pending.append((src, dst))
+        # A re-imported body mesh may have changed its skeleton, so its animations are never skipped.
+        _import_jobs(
+            anim_pending,
+            lambda: _build_fbx_options("animation", skeleton=body_skeleton),
+            _options_key(f"fbx:animation:{skeleton_path}", _fbx_option_values("animation")),
+            "Import failed",
+            allow_skip=not body_reimported,
+        )
 
         # 4) Dynamic flesh geometry cache from convert stage output.
+        abc_pending: List[tuple[Path, str]] = []
+        abc_entries: Dict[str, str] = {}
         dynamic_cfg = require_nested(cfg, ("ue", "dynamic_assets"))
         gc_dst_template = str(require_nested(dynamic_cfg, ("flesh_geom_cache_destination_template",)))
         gc_dst = apply_template(gc_dst_template, profile)
@@ -377,12 +617,8 @@ def main() -> int:
                 "destination": gc_dst,
             })
         else:
-            result = _run_import_task(gc_src, gc_dst, _build_abc_options())
-            results.append(result)
-            if not result["success"]:
-                errors.append({"message": result.get("error", "GeomCache import failed"), "destination": gc_dst})
-            else:
-                coord_targets["flesh"] = gc_dst
+            abc_pending.append((gc_src, gc_dst))
+            abc_entries[gc_dst] = "flesh"
 
         # 5) Optional NNM geometry caches (upper/lower costume), exported during convert stage.
         for key in (
@@ -406,13 +642,31 @@ def main() -> int:
                 )
                 continue
 
-            result = _run_import_task(src_abc, dst_asset, _build_abc_options())
-            results.append(result)
-            if not result["success"]:
-                errors.append({"message": result.get("error", "GeomCache import failed"), "destination": dst_asset})
-            else:
-                entry_name = "nnm_upper" if "upper" in key.lower() else "nnm_lower"
-                coord_targets[entry_name] = dst_asset
+            abc_pending.append((src_abc, dst_asset))
+            abc_entries[dst_asset] = "nnm_upper" if "upper" in key.lower() else "nnm_lower"
+
+        # All Alembics use the same option values, so they go in one batch too (each task gets its own settings object).
+        abc_options_key = _options_key("abc:geometry_cache", _abc_option_values())
+        for row in _import_jobs(abc_pending, _build_abc_options, abc_options_key, "GeomCache import failed"):
+            if row["success"]:
+                coord_targets[abc_entries[row["destination"]]] = row["destination"]
+
+        # 6) One bulk save for everything imported above (batched tasks run with save=False).
+        save_summary: Dict[str, Any] = {}
+        if batched and imported_assets:
+            with profile_span("bulk_save"):
+                save_summary = _save_imported_assets(imported_assets)
+            for asset_path in save_summary["failed"]:
+                errors.append({"message": "Failed to save imported asset", "destination": asset_path})
+
+        # Ledger entries are written only for saved assets, so their .uasset stat is the final one.
+        unsaved = set(save_summary.get("failed", []))
+        if ledger is not None and source_hashes is not None:
+            for dst, fingerprint, options_key in pending_ledger:
+                if dst not in unsaved:
+                    ledger.record(dst, fingerprint, options_key, game_path_to_file(project_dir, dst))
+            ledger.save()
+            source_hashes.save()
 
         coord_rows: List[Dict[str, Any]] = []
         coord_errors: List[Dict[str, Any]] = []
@@ -517,6 +771,12 @@ def main() -> int:
                 "failed_count": len(errors),
                 "body_skeleton_loaded": body_skeleton is not None,
                 "skip_static_imports": skip_static_imports,
+                "batched": batched,
+                "bulk_save": save_summary,
+                "skip_unchanged": skip_unchanged,
+                "skipped_unchanged_count": len([r for r in results if r.get("status") == "skip_unchanged"]),
+                "import_ledger": ledger.stats() if ledger is not None else {},
+                "source_hash_cache": source_hashes.stats() if source_hashes is not None else {},
                 "coord_validation_enabled": coord_validate_enabled,
                 "coord_validation_status": coord_status,
                 "coord_validation_report": str(coord_report_path.resolve()),
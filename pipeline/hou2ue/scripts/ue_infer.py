@@ -4,7 +4,7 @@
 from __future__ import annotations
 
 import csv
-import json
+import os
 import sys
 import traceback
 from pathlib import Path
@@ -16,7 +16,14 @@ _THIS_DIR = Path(__file__).resolve().parent
 if str(_THIS_DIR) not in sys.path:
     sys.path.insert(0, str(_THIS_DIR))
 
-from ue_common import finalize_report, get_context, make_report, require_nested, write_stage_report
+from common import percentile
+from report_store import load_report
+from ue_common import finalize_report, get_context, make_report, profile_span, require_nested, write_stage_report
+
+LATENCY_STATS = ("p50", "p95", "p99", "max")
+MEMORY_FIELDS = ("main_mem_bytes", "gpu_mem_bytes")
+# Model properties that size the runtime network; reported next to memory so growth can be explained.
+CAPACITY_PROPERTIES = ("num_basis_per_section", "hidden_layer_dims", "num_morph_targets_per_bone", "global_num_morphs")
 
 
 def _load_map(map_path: str) -> bool:
@@ -77,6 +84,23 @@ def _model_mem_metrics(model: Any) -> Dict[str, int]:
     }
 
 
+def _model_capacity(model: Any) -> Dict[str, Any]:
+    settings: Dict[str, Any] = {}
+    for name in CAPACITY_PROPERTIES:
+        try:
+            value = model.get_editor_property(name)
+        except Exception:
+            continue
+        if isinstance(value, (bool, int, float)):
+            settings[name] = value
+            continue
+        try:
+            settings[name] = [int(v) for v in value]
+        except Exception:
+            settings[name] = str(value)
+    return settings
+
+
 def _collect_deformer_metrics(asset_paths: List[str]) -> List[Dict[str, Any]]:
     rows: List[Dict[str, Any]] = []
     for asset_path in asset_paths:
@@ -101,6 +125,7 @@ def _collect_deformer_metrics(asset_paths: List[str]) -> List[Dict[str, Any]]:
         if model is not None:
             mem = _model_mem_metrics(model)
             entry.update(mem)
+            entry["model_capacity"] = _model_capacity(model)
 
         rows.append(entry)
 
@@ -123,11 +148,220 @@ def _write_csv(path: Path, rows: List[Dict[str, Any]]) -> None:
             )
 
 
+def _previous_profiling_summary(run_dir: Path, profile: str) -> tuple[Path, Dict[str, Dict[str, int]]]:
+    """Read latest/<profile>/reports/profiling_summary.csv (the last published run) keyed by asset_path."""
+    out_root = str(os.environ.get("HOU2UE_OUT_ROOT", "") or "").strip()
+    root = Path(out_root) if out_root else run_dir.parent.parent
+    path = root / "latest" / profile / "reports" / "profiling_summary.csv"
+    rows: Dict[str, Dict[str, int]] = {}
+    if not path.exists():
+        return path, rows
+    try:
+        with path.open("r", newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                if str(row.get("loaded", "")).lower() != "true":
+                    continue
+                rows[str(row.get("asset_path", ""))] = {field: int(float(row.get(field) or 0)) for field in MEMORY_FIELDS}
+    except Exception:
+        return path, {}
+    return path, rows
+
+
+def _check_memory(
+    metrics: List[Dict[str, Any]],
+    previous: Dict[str, Dict[str, int]],
+    memory_cfg: Dict[str, Any],
+) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Compare each loaded deformer against its byte budgets and the previous run.
+
+    Returns (rows, budget_violations, regressions); the caller decides whether each list fails the stage.
+    """
+    budgets = memory_cfg.get("budgets_bytes", {}) if isinstance(memory_cfg.get("budgets_bytes"), dict) else {}
+    max_growth_pct = float(memory_cfg.get("max_growth_pct", 10.0))
+    rows: List[Dict[str, Any]] = []
+    violations: List[Dict[str, Any]] = []
+    regressions: List[Dict[str, Any]] = []
+
+    for entry in metrics:
+        if not entry.get("loaded"):
+            continue
+        asset_path = str(entry["asset_path"])
+        budget = budgets.get(asset_path, {}) if isinstance(budgets.get(asset_path), dict) else {}
+        prev = previous.get(asset_path)
+        row: Dict[str, Any] = {
+            "asset_path": asset_path,
+            "model_capacity": entry.get("model_capacity", {}),
+            "budget_bytes": {},
+            "previous_bytes": prev or {},
+            "growth_pct": {},
+        }
+        for field in MEMORY_FIELDS:
+            current = int(entry.get(field, 0))
+            if field in budget:
+                limit = int(budget[field])
+                row["budget_bytes"][field] = limit
+                if current > limit:
+                    violations.append(
+                        {
+                            "message": "Deformer memory over budget",
+                            "asset_path": asset_path,
+                            "field": field,
+                            "measured_bytes": current,
+                            "budget_bytes": limit,
+                        }
+                    )
+            # A zero baseline means the metric was unavailable last time, not that the asset was free.
+            if prev is not None and int(prev.get(field, 0)) > 0:
+                growth = 100.0 * (current - prev[field]) / prev[field]
+                row["growth_pct"][field] = round(growth, 3)
+                if growth > max_growth_pct:
+                    regressions.append(
+                        {
+                            "message": "Deformer memory grew past max_growth_pct",
+                            "asset_path": asset_path,
+                            "field": field,
+                            "previous_bytes": prev[field],
+                            "measured_bytes": current,
+                            "growth_pct": round(growth, 3),
+                            "max_growth_pct": max_growth_pct,
+                            "model_capacity": row["model_capacity"],
+                        }
+                    )
+        rows.append(row)
+    return rows, violations, regressions
+
+
+def _benchmark_request_class():
+    for name in ("MldBenchmarkRequest", "FMldBenchmarkRequest"):
+        cls = getattr(unreal, name, None)
+        if cls is not None:
+            return cls
+    return None
+
+
+def _latency_budget(budgets: Dict[str, Any], asset_path: str, model_type: str) -> Dict[str, float]:
+    """Per-asset budget wins over the per-model-type one; both map stat name -> ms."""
+    for key in (asset_path, model_type.lower()):
+        budget = budgets.get(key)
+        if isinstance(budget, dict):
+            return {stat: float(budget[stat]) for stat in LATENCY_STATS if stat in budget}
+    return {}
+
+
+def _benchmark_latency(
+    asset_paths: List[str],
+    anim_paths: List[str],
+    bench_cfg: Dict[str, Any],
+) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Tick every deformer over every test animation and reduce the frame times to percentiles.
+
+    An editor built without the benchmark entry point yields a single skipped error row, which the
+    caller routes through fail_on_budget like a budget breach.
+    """
+    lib = getattr(unreal, "MLDTrainAutomationLibrary", None)
+    fn = getattr(lib, "benchmark_deformer_inference", None) if lib is not None else None
+    request_cls = _benchmark_request_class()
+    if fn is None or request_cls is None:
+        if lib is None:
+            detail = "MLDTrainAutomationLibrary class missing"
+        elif fn is None:
+            detail = "benchmark_deformer_inference function missing on MLDTrainAutomationLibrary"
+        else:
+            detail = "Cannot find MldBenchmarkRequest struct in Unreal Python API"
+        return [], [{"message": "Latency benchmark skipped", "status": "skipped: benchmark function unavailable", "error": detail}]
+
+    budgets = bench_cfg.get("budgets_ms", {}) if isinstance(bench_cfg.get("budgets_ms"), dict) else {}
+    rows: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for asset_path in asset_paths:
+        for anim_path in anim_paths:
+            req = request_cls()
+            req.set_editor_property("asset_path", asset_path)
+            req.set_editor_property("anim_sequence", anim_path)
+            req.set_editor_property("frame_count", int(bench_cfg.get("frames", 300)))
+            req.set_editor_property("warmup_frames", int(bench_cfg.get("warmup_frames", 30)))
+            req.set_editor_property("delta_seconds", float(bench_cfg.get("delta_seconds", 1.0 / 30.0)))
+            result = fn(req)
+
+            success = bool(result.get_editor_property("success"))
+            times = [float(v) for v in result.get_editor_property("frame_times_ms")]
+            model_type = str(result.get_editor_property("model_type"))
+            row: Dict[str, Any] = {
+                "asset_path": asset_path,
+                "anim_sequence": anim_path,
+                "model_type": model_type,
+                "success": success,
+                "message": str(result.get_editor_property("message")),
+                "frames": len(times),
+                "mean_ms": round(sum(times) / len(times), 4) if times else 0.0,
+                "p50_ms": round(percentile(times, 50), 4),
+                "p95_ms": round(percentile(times, 95), 4),
+                "p99_ms": round(percentile(times, 99), 4),
+                "max_ms": round(max(times), 4) if times else 0.0,
+            }
+            budget = _latency_budget(budgets, asset_path, model_type)
+            exceeded = [stat for stat, limit in budget.items() if row[f"{stat}_ms"] > limit]
+            row["budget_ms"] = budget
+            row["over_budget"] = exceeded
+            row["within_budget"] = success and not exceeded
+            rows.append(row)
+
+            if not success:
+                errors.append({"message": "Latency benchmark failed", "asset_path": asset_path, "anim_sequence": anim_path, "error": row["message"]})
+            elif exceeded:
+                errors.append(
+                    {
+                        "message": "Inference latency over budget",
+                        "asset_path": asset_path,
+                        "anim_sequence": anim_path,
+                        "over_budget": {stat: {"measured_ms": row[f"{stat}_ms"], "budget_ms": budget[stat]} for stat in exceeded},
+                    }
+                )
+    return rows, errors
+
+
+def _write_latency_csv(path: Path, rows: List[Dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(
+            [
+                "asset_path",
+                "anim_sequence",
+                "model_type",
+                "frames",
+                "mean_ms",
+                "p50_ms",
+                "p95_ms",
+                "p99_ms",
+                "max_ms",
+                "budget_p95_ms",
+                "within_budget",
+            ]
+        )
+        for row in rows:
+            writer.writerow(
+                [
+                    row["asset_path"],
+                    row["anim_sequence"],
+                    row["model_type"],
+                    row["frames"],
+                    row["mean_ms"],
+                    row["p50_ms"],
+                    row["p95_ms"],
+                    row["p99_ms"],
+                    row["max_ms"],
+                    row["budget_ms"].get("p95", ""),
+                    row["within_budget"],
+                ]
+            )
+
+
 def _load_demo_report(path: Path) -> Dict[str, Any]:
     if not path.exists():
         return {}
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        return load_report(path)
     except Exception:
         return {}
 
@@ -162,6 +396,14 @@ def main() -> int:
         if not isinstance(gt_cfg, dict):
             gt_cfg = {}
         gt_enabled = bool(gt_cfg.get("enabled", False))
+        bench_cfg = infer_cfg.get("latency_benchmark", {})
+        if not isinstance(bench_cfg, dict):
+            raise RuntimeError("ue.infer.latency_benchmark must be an object when provided")
+        bench_enabled = bool(bench_cfg.get("enabled", False))
+        memory_cfg = infer_cfg.get("memory_budget", {})
+        if not isinstance(memory_cfg, dict):
+            raise RuntimeError("ue.infer.memory_budget must be an object when provided")
+        memory_enabled = bool(memory_cfg.get("enabled", False))
 
         map_loaded = _load_map(map_path)
         command_results = _execute_console_commands(stat_commands)
@@ -170,8 +412,11 @@ def main() -> int:
         for anim_path in test_anims:
             anim_checks.append({"asset": anim_path, "loaded": unreal.load_asset(anim_path) is not None})
 
-        deformer_metrics = _collect_deformer_metrics(deformer_assets)
+        with profile_span("deformer_metrics"):
+            deformer_metrics = _collect_deformer_metrics(deformer_assets)
         profiling_csv = run_dir / "reports" / "profiling_summary.csv"
+        # Read the baseline first: when the run dir is latest/<profile> itself, the write below replaces it.
+        previous_csv, previous_memory = _previous_profiling_summary(run_dir, profile) if memory_enabled else (Path(), {})
         _write_csv(profiling_csv, deformer_metrics)
 
         loaded_deformers = [d for d in deformer_metrics if d.get("loaded")]
@@ -182,6 +427,26 @@ def main() -> int:
         ood_pass = map_loaded and all(item["loaded"] for item in anim_checks) and len(loaded_deformers) == len(deformer_assets)
 
         errors: List[Dict[str, Any]] = []
+        latency_rows: List[Dict[str, Any]] = []
+        latency_csv = run_dir / "reports" / "infer_latency.csv"
+        latency_warnings: List[Dict[str, Any]] = []
+        if bench_enabled:
+            with profile_span("latency_benchmark"):
+                latency_rows, latency_errors = _benchmark_latency(deformer_assets, test_anims, bench_cfg)
+            _write_latency_csv(latency_csv, latency_rows)
+            if bool(bench_cfg.get("fail_on_budget", True)):
+                errors.extend(latency_errors)
+            else:
+                latency_warnings = latency_errors
+        memory_rows: List[Dict[str, Any]] = []
+        memory_warnings: List[Dict[str, Any]] = []
+        if memory_enabled:
+            memory_rows, budget_violations, regressions = _check_memory(deformer_metrics, previous_memory, memory_cfg)
+            for items, action in (
+                (budget_violations, str(memory_cfg.get("budget_action", "fail"))),
+                (regressions, str(memory_cfg.get("regression_action", "fail"))),
+            ):
+                (errors if action == "fail" else memory_warnings).extend(items)
         demo_report_path = run_dir / "reports" / "infer_demo_report.json"
         demo_report = {}
         demo_status = "disabled"
@@ -263,6 +528,15 @@ def main() -> int:
                 "total_gpu_mem_bytes": total_gpu_mem,
                 "ood_stability": "pass" if ood_pass else "fail",
                 "profiling_summary_csv": str(profiling_csv.resolve()),
+                "latency_benchmark_enabled": bench_enabled,
+                "latency_csv": str(latency_csv.resolve()) if bench_enabled else "",
+                "latency": latency_rows,
+                "latency_warnings": latency_warnings,
+                "memory_budget_enabled": memory_enabled,
+                "memory_baseline_csv": str(previous_csv) if memory_enabled else "",
+                "memory_baseline_found": bool(previous_memory),
+                "memory_checks": memory_rows,
+                "memory_warnings": memory_warnings,
                 "demo_capture_enabled": demo_enabled,
                 "demo_capture_report": str(demo_report_path.resolve()),
                 "demo_capture_status": demo_status,
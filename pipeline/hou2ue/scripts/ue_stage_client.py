@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Launcher for the warm UE stage server: start it on demand, dispatch one stage, relay exit code."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from common import file_lock, get_nested, load_config, require_nested
+from editor_process import resolve_editor_cmd
+
+ENV_PREFIX = "HOU2UE_"
+# Clients of one server wait for each other's stage runs, which can take hours.
+DISPATCH_LOCK_TIMEOUT_SEC = 24 * 3600.0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a UE Python stage through the warm stage server")
+    parser.add_argument("--config", required=True)
+    parser.add_argument("--profile", required=True, choices=["smoke", "full"])
+    parser.add_argument("--run-dir", required=True)
+    parser.add_argument("--script", default="", help="UE stage script to dispatch (ue_import.py, ue_train.py, ...)")
+    parser.add_argument("--env", action="append", default=[], help="Extra KEY=VALUE passed to the stage")
+    parser.add_argument("--uproject", default="", help="Override paths.uproject for the server instance")
+    parser.add_argument("--shutdown", action="store_true", help="Stop the server for this run, if any")
+    return parser.parse_args()
+
+
+def _project_root() -> Path:
+    return Path(__file__).resolve().parents[3]
+
+
+def _resolve_path(base: Path, value: str) -> Path:
+    path = Path(value)
+    return path if path.is_absolute() else (base / path).resolve()
+
+
+def server_info_path(run_dir: Path, uproject: Path) -> Path:
+    return run_dir / "workspace" / "stage_server" / f"{uproject.stem}.json"
+
+
+def _load_info(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def send_request(info: Dict[str, Any], payload: Dict[str, Any], timeout: float | None = None) -> Dict[str, Any]:
+    request = dict(payload)
+    request["token"] = str(info.get("token", ""))
+    with socket.create_connection((str(info["host"]), int(info["port"])), timeout=10.0) as conn:
+        conn.settimeout(timeout)
+        conn.sendall(json.dumps(request, ensure_ascii=True).encode("utf-8") + b"\n")
+        buf = b""
+        while b"\n" not in buf:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            buf += chunk
+    line = buf.split(b"\n", 1)[0]
+    if not line:
+        raise RuntimeError("stage server closed the connection without a response")
+    response = json.loads(line.decode("utf-8"))
+    if not isinstance(response, dict):
+        raise RuntimeError("stage server returned a non-object response")
+    return response
+
+
+def _ping(info: Dict[str, Any]) -> bool:
+    if not info:
+        return False
+    try:
+        return bool(send_request(info, {"op": "ping"}, timeout=10.0).get("ok", False))
+    except (OSError, ValueError, RuntimeError, KeyError):
+        return False
+
+
+def _start_server(
+    cfg: Dict[str, Any],
+    server_cfg: Dict[str, Any],
+    uproject: Path,
+    run_dir: Path,
+    info_path: Path,
+) -> Dict[str, Any]:
+    editor_cmd = resolve_editor_cmd(str(require_nested(cfg, ("paths", "ue_editor_exe"))))
+    server_script = (Path(__file__).resolve().parent / "ue_stage_server.py").resolve()
+    startup_timeout = float(server_cfg.get("startup_timeout_sec", 900))
+
+    info_path.unlink(missing_ok=True)
+    log_dir = run_dir / "reports" / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    env = os.environ.copy()
+    env["HOU2UE_STAGE_SERVER_INFO"] = str(info_path.resolve())
+    env["HOU2UE_STAGE_SERVER_HOST"] = str(server_cfg.get("host", "127.0.0.1") or "127.0.0.1")
+    env["HOU2UE_STAGE_SERVER_PORT"] = str(int(server_cfg.get("port", 0)))
+    env["HOU2UE_STAGE_SERVER_IDLE_MINUTES"] = str(float(server_cfg.get("idle_timeout_minutes", 60)))
+
+    cmd = [
+        str(editor_cmd),
+        str(uproject),
+        f"-ExecutePythonScript={server_script.as_posix()}",
+        "-unattended",
+        "-nop4",
+        "-nosplash",
+        "-NoSound",
+        "-stdout",
+        "-FullStdOutLogOutput",
+    ]
+    popen_kwargs: Dict[str, Any] = {}
+    if os.name == "nt":
+        popen_kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        popen_kwargs["start_new_session"] = True
+
+    out_handle = (log_dir / f"ue_stage_server_{uproject.stem}.stdout.log").open("ab")
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            env=env,
+            cwd=str(_project_root()),
+            stdin=subprocess.DEVNULL,
+            stdout=out_handle,
+            stderr=subprocess.STDOUT,
+            **popen_kwargs,
+        )
+    finally:
+        out_handle.close()
+
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"UE stage server exited during startup (exit code {proc.returncode})")
+        info = _load_info(info_path)
+        if _ping(info):
+            return info
+        time.sleep(2.0)
+
+    proc.kill()
+    raise RuntimeError(f"UE stage server did not come up within {startup_timeout:.0f}s")
+
+
+def _stage_env(args: argparse.Namespace, run_dir: Path) -> Dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if k.startswith(ENV_PREFIX)}
+    env.setdefault("HOU2UE_CONFIG", str(Path(args.config).resolve()))
+    env.setdefault("HOU2UE_PROFILE", args.profile)
+    env.setdefault("HOU2UE_RUN_DIR", str(run_dir.resolve()))
+    for item in args.env:
+        key, sep, value = str(item).partition("=")
+        if not sep or not key.strip():
+            raise RuntimeError(f"--env expects KEY=VALUE, got: {item}")
+        env[key.strip()] = value
+    for key in ("HOU2UE_STAGE_SERVER_INFO", "HOU2UE_STAGE_SERVER_HOST", "HOU2UE_STAGE_SERVER_PORT"):
+        env.pop(key, None)
+    return env
+
+
+def main() -> int:
+    args = parse_args()
+    run_dir = Path(args.run_dir)
+    cfg = load_config(args.config)
+    server_cfg = get_nested(cfg, ("ue", "stage_server"), {})
+    if not isinstance(server_cfg, dict):
+        server_cfg = {}
+
+    project_root = _project_root()
+    uproject_value = args.uproject or str(require_nested(cfg, ("paths", "uproject")))
+    uproject = _resolve_path(project_root, uproject_value)
+    info_path = server_info_path(run_dir, uproject)
+    if not args.shutdown and not args.script:
+        raise RuntimeError("--script is required unless --shutdown is given")
+
+    # One client at a time per server: a second client must not mistake a server that is busy
+    # with the first client's stage for a dead one and boot another editor on the same project.
+    with file_lock(info_path, timeout_sec=DISPATCH_LOCK_TIMEOUT_SEC):
+        info = _load_info(info_path)
+        if args.shutdown:
+            if _ping(info):
+                send_request(info, {"op": "shutdown"}, timeout=60.0)
+                print(f"[ue_stage_client] stage server stopped: {uproject.name}", flush=True)
+            info_path.unlink(missing_ok=True)
+            return 0
+
+        if not _ping(info):
+            print(f"[ue_stage_client] starting warm editor for {uproject.name}", flush=True)
+            info = _start_server(cfg, server_cfg, uproject, run_dir, info_path)
+
+        script_path = Path(args.script).resolve()
+        response = send_request(
+            info,
+            {"op": "run_stage", "script": str(script_path), "env": _stage_env(args, run_dir)},
+        )
+    print(json.dumps(response, ensure_ascii=True), flush=True)
+    if not response.get("ok", False):
+        lines: List[str] = [f"[ue_stage_client] stage dispatch failed: {response.get('error', '')}"]
+        if response.get("traceback"):
+            lines.append(str(response["traceback"]))
+        print("\n".join(lines), flush=True)
+        rc = int(response.get("exit_code", 1))
+        return rc if rc > 0 else 1
+    return int(response.get("exit_code", 1))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
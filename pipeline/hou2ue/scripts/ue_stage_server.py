@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""Resident UE Python stage server: run pipeline stage scripts inside one warm editor.
+
+Launched once per run via `-ExecutePythonScript=ue_stage_server.py`. The server binds a
+loopback TCP socket, publishes `{host, port, token, pid}` to `HOU2UE_STAGE_SERVER_INFO`,
+then serves newline-delimited JSON requests until `shutdown` or the idle timeout.
+
+Request:  {"token": ..., "op": "run_stage", "script": "<path>", "env": {"HOU2UE_*": ...}}
+Response: {"ok": bool, "exit_code": int, "duration_sec": float, "error": str}
+
+Every stage keeps writing its own `<stage>_report.json`; the server only dispatches `main()`.
+Stage calls run on the editor main thread, exactly as they would under a cold launch; a listener
+thread accepts connections and answers `ping` even while a stage runs (`"busy": true`), so a
+client can tell a busy server from a dead one. Stage requests queue up and run one at a time.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import runpy
+import secrets
+import socket
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+_THIS_DIR = Path(__file__).resolve().parent
+if str(_THIS_DIR) not in sys.path:
+    sys.path.insert(0, str(_THIS_DIR))
+
+from ue_common import utc_now_iso
+
+ENV_PREFIX = "HOU2UE_"
+MAX_REQUEST_BYTES = 1024 * 1024
+# A client has this long to send its request line; the listener thread serves one connection at a time.
+REQUEST_READ_TIMEOUT_SEC = 30.0
+MAIN_THREAD_OPS = ("run_stage", "shutdown")
+
+
+def _log(msg: str) -> None:
+    try:
+        import unreal
+
+        unreal.log(f"[hou2ue_stage_server] {msg}")
+    except Exception:
+        print(f"[hou2ue_stage_server] {msg}", flush=True)
+
+
+def _resolve_stage_script(script: str) -> Path:
+    path = Path(str(script or "")).resolve()
+    if path.parent != _THIS_DIR:
+        raise RuntimeError(f"Stage script must live in {_THIS_DIR}: {path}")
+    if path.suffix.lower() != ".py" or not path.is_file():
+        raise RuntimeError(f"Stage script not found: {path}")
+    if path.name == Path(__file__).name:
+        raise RuntimeError("Refusing to dispatch the stage server into itself")
+    return path
+
+
+def purge_pipeline_modules() -> List[str]:
+    """Drop every module imported from the scripts dir (except this server) from sys.modules.
+
+    run_path only re-executes the stage script itself; helpers such as common (profile spans) and
+    pipeline_config (config memo) would otherwise keep their state from the previous stage and
+    never pick up edits made between dispatches.
+    """
+    this_file = Path(__file__).resolve()
+    purged: List[str] = []
+    for name, module in list(sys.modules.items()):
+        module_file = getattr(module, "__file__", None)
+        if not module_file:
+            continue
+        try:
+            path = Path(module_file).resolve()
+        except (OSError, ValueError):
+            continue
+        if path.parent == _THIS_DIR and path != this_file:
+            del sys.modules[name]
+            purged.append(name)
+    return purged
+
+
+def _run_stage_main(script_path: Path) -> int:
+    # Fresh helper modules per dispatch, then a fresh module body for the stage script itself.
+    purge_pipeline_modules()
+    module_globals = runpy.run_path(str(script_path), run_name="hou2ue_stage")
+    main_fn = module_globals.get("main")
+    if not callable(main_fn):
+        raise RuntimeError(f"Stage script has no main(): {script_path}")
+    try:
+        rc = main_fn()
+    except SystemExit as exc:
+        rc = exc.code
+    if rc is None:
+        return 0
+    return int(rc) if isinstance(rc, int) else 1
+
+
+class StageDispatcher:
+    """Apply a request's HOU2UE_* env, run the stage `main()`, then restore the process env."""
+
+    def __init__(self, token: str, runner: Callable[[Path], int] = _run_stage_main) -> None:
+        self.token = token
+        self.runner = runner
+        self.stage_count = 0
+        self.current_script = ""
+
+    def on_main_thread(self, request: Any) -> bool:
+        """True for authenticated requests that have to wait for the main thread (stage runs, shutdown)."""
+        return (
+            isinstance(request, dict)
+            and secrets.compare_digest(str(request.get("token", "")), self.token)
+            and str(request.get("op", "") or "") in MAIN_THREAD_OPS
+        )
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(request, dict):
+            return {"ok": False, "exit_code": -1, "error": "request must be a JSON object"}
+        if not secrets.compare_digest(str(request.get("token", "")), self.token):
+            return {"ok": False, "exit_code": -1, "error": "invalid token"}
+
+        op = str(request.get("op", "") or "")
+        if op == "ping":
+            return {
+                "ok": True,
+                "exit_code": 0,
+                "pid": os.getpid(),
+                "stage_count": self.stage_count,
+                "busy": bool(self.current_script),
+                "stage": self.current_script,
+            }
+        if op == "shutdown":
+            return {"ok": True, "exit_code": 0, "shutdown": True}
+        if op != "run_stage":
+            return {"ok": False, "exit_code": -1, "error": f"unknown op: {op}"}
+
+        env = request.get("env", {})
+        if not isinstance(env, dict):
+            return {"ok": False, "exit_code": -1, "error": "env must be an object"}
+
+        started = time.monotonic()
+        saved_env = dict(os.environ)
+        try:
+            script_path = _resolve_stage_script(str(request.get("script", "")))
+            for key in [k for k in os.environ if k.startswith(ENV_PREFIX)]:
+                del os.environ[key]
+            for key, value in env.items():
+                os.environ[str(key)] = str(value)
+
+            _log(f"run_stage {script_path.name} run_dir={os.environ.get('HOU2UE_RUN_DIR', '')}")
+            self.current_script = script_path.name
+            try:
+                exit_code = self.runner(script_path)
+            finally:
+                self.current_script = ""
+            self.stage_count += 1
+            return {
+                "ok": True,
+                "exit_code": exit_code,
+                "script": str(script_path),
+                "duration_sec": round(time.monotonic() - started, 3),
+                "error": "",
+            }
+        except Exception as exc:
+            return {
+                "ok": False,
+                "exit_code": 1,
+                "script": str(request.get("script", "")),
+                "duration_sec": round(time.monotonic() - started, 3),
+                "error": str(exc),
+                "traceback": traceback.format_exc(),
+            }
+        finally:
+            os.environ.clear()
+            os.environ.update(saved_env)
+
+
+def _read_request(conn: socket.socket) -> Dict[str, Any]:
+    buf = b""
+    while b"\n" not in buf:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        buf += chunk
+        if len(buf) > MAX_REQUEST_BYTES:
+            raise RuntimeError("request too large")
+    line = buf.split(b"\n", 1)[0]
+    return json.loads(line.decode("utf-8")) if line else {}
+
+
+def _write_response(conn: socket.socket, payload: Dict[str, Any]) -> None:
+    conn.sendall(json.dumps(payload, ensure_ascii=True).encode("utf-8") + b"\n")
+
+
+def _reply(conn: socket.socket, payload: Dict[str, Any]) -> None:
+    with conn:
+        try:
+            _write_response(conn, payload)
+        except OSError as exc:
+            _log(f"client went away before response: {exc}")
+
+
+def _listen(
+    srv: socket.socket,
+    dispatcher: StageDispatcher,
+    pending: "queue.Queue[Tuple[socket.socket, Dict[str, Any]]]",
+    stop: threading.Event,
+) -> None:
+    """Accept loop (listener thread): answer ping and bad requests at once, queue the rest for serve()."""
+    while not stop.is_set():
+        try:
+            conn, _ = srv.accept()
+        except socket.timeout:
+            continue
+        except OSError:
+            return
+        try:
+            conn.settimeout(REQUEST_READ_TIMEOUT_SEC)
+            request = _read_request(conn)
+        except Exception as exc:
+            _reply(conn, {"ok": False, "exit_code": -1, "error": f"bad request: {exc}"})
+            continue
+        if dispatcher.on_main_thread(request):
+            # Stage runs can take hours; the client waits on this connection without a timeout.
+            conn.settimeout(None)
+            pending.put((conn, request))
+        else:
+            _reply(conn, dispatcher.handle(request))
+
+
+def _write_info(path: Path, payload: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def serve(
+    info_path: Path,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    idle_timeout_sec: float = 3600.0,
+    dispatcher: StageDispatcher | None = None,
+) -> int:
+    dispatcher = dispatcher or StageDispatcher(secrets.token_hex(16))
+    pending: "queue.Queue[Tuple[socket.socket, Dict[str, Any]]]" = queue.Queue()
+    stop = threading.Event()
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as srv:
+        srv.bind((host, int(port)))
+        srv.listen(8)
+        # Short accept timeout so the listener thread notices stop promptly.
+        srv.settimeout(0.5)
+        bound_host, bound_port = srv.getsockname()[:2]
+        _write_info(
+            info_path,
+            {
+                "host": bound_host,
+                "port": bound_port,
+                "token": dispatcher.token,
+                "pid": os.getpid(),
+                "started_at": utc_now_iso(),
+            },
+        )
+        _log(f"listening on {bound_host}:{bound_port}")
+        listener = threading.Thread(
+            target=_listen, args=(srv, dispatcher, pending, stop), name="hou2ue_stage_listener", daemon=True
+        )
+        listener.start()
+
+        try:
+            while True:
+                try:
+                    # Only stage and shutdown requests count as activity; pings do not keep the editor alive.
+                    conn, request = pending.get(timeout=max(1.0, float(idle_timeout_sec)))
+                except queue.Empty:
+                    _log(f"idle for {idle_timeout_sec:.0f}s, shutting down")
+                    return 0
+
+                response = dispatcher.handle(request)
+                _reply(conn, response)
+                if response.get("shutdown"):
+                    _log(f"shutdown requested after {dispatcher.stage_count} stage(s)")
+                    return 0
+        finally:
+            stop.set()
+            listener.join(timeout=5.0)
+            info_path.unlink(missing_ok=True)
+            while not pending.empty():
+                conn, _ = pending.get_nowait()
+                _reply(conn, {"ok": False, "exit_code": -1, "error": "stage server shut down before running the request"})
+
+
+def main() -> int:
+    info_raw = str(os.environ.get("HOU2UE_STAGE_SERVER_INFO", "") or "").strip()
+    if not info_raw:
+        raise RuntimeError("HOU2UE_STAGE_SERVER_INFO is required")
+    host = str(os.environ.get("HOU2UE_STAGE_SERVER_HOST", "127.0.0.1") or "127.0.0.1")
+    port = int(os.environ.get("HOU2UE_STAGE_SERVER_PORT", "0") or 0)
+    idle_minutes = float(os.environ.get("HOU2UE_STAGE_SERVER_IDLE_MINUTES", "60") or 60)
+    return serve(Path(info_raw), host=host, port=port, idle_timeout_sec=idle_minutes * 60.0)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -16,10 +16,23 @@ _THIS_DIR = Path(__file__).resolve().parent
 if str(_THIS_DIR) not in sys.path:
     sys.path.insert(0, str(_THIS_DIR))
 
+from hash_cache import HashCache
+from network_locator import NETWORK_SUFFIXES, NetworkFileIndex, network_roots
+from pipeline_config import DeterminismConfig
+from train_cache import TrainCache, game_path_to_file, package_name, setup_fingerprint
+from train_telemetry import (
+    DEFAULT_ITERATION_REGEX,
+    DEFAULT_LOSS_REGEX,
+    TelemetryRecorder,
+    latest_log_file,
+    summarize_telemetry,
+)
 from ue_common import (
     finalize_report,
     get_context,
+    get_nested,
     make_report,
+    profile_span,
     require_nested,
     save_asset,
     write_stage_report,
@@ -49,10 +62,12 @@ def _request_class():
     raise RuntimeError("Cannot find MldTrainRequest struct in Unreal Python API")
 
 
-def _snapshot_network_files(project_dir: Path) -> Dict[str, float]:
-    suffixes = (".nmn", ".ubnne")
-    roots = [project_dir / "Intermediate", project_dir / "Saved", project_dir / "Content"]
+def _snapshot_network_files(project_dir: Path, index: NetworkFileIndex | None = None) -> Dict[str, float]:
+    roots = network_roots(project_dir)
+    if index is not None:
+        return index.snapshot(roots)
 
+    suffixes = NETWORK_SUFFIXES
     snap: Dict[str, float] = {}
     for root in roots:
         if not root.exists():
@@ -74,6 +89,7 @@ def _latest_network_path(
     before: Dict[str, float],
     after: Dict[str, float],
     model_type: str,
+    prefer_name: str = "",
 ) -> str:
     target_ext = ".nmn" if model_type.upper() == "NMM" else ".ubnne"
 
@@ -85,6 +101,12 @@ def _latest_network_path(
         if old is None or mtime > old:
             changed.append((path, mtime))
 
+    if prefer_name:
+        # Sharded runs train concurrently; prefer files named after this asset when there are any.
+        named = [item for item in changed if prefer_name.lower() in Path(item[0]).name.lower()]
+        if named:
+            changed = named
+
     if changed:
         changed.sort(key=lambda item: item[1], reverse=True)
         return changed[0][0]
@@ -134,16 +156,12 @@ def _env_or_default(name: str, default: Any) -> Any:
     return value
 
 
-def _resolve_determinism(cfg: Dict[str, Any]) -> Dict[str, Any]:
-    ue_cfg = cfg.get("ue", {}) if isinstance(cfg.get("ue"), dict) else {}
-    training_cfg = ue_cfg.get("training", {}) if isinstance(ue_cfg.get("training"), dict) else {}
-    det_cfg = training_cfg.get("determinism", {}) if isinstance(training_cfg.get("determinism"), dict) else {}
-
-    enabled = _as_bool(det_cfg.get("enabled", True), True)
-    seed = int(det_cfg.get("seed", 3407))
-    torch_deterministic = _as_bool(det_cfg.get("torch_deterministic", True), True)
-    cudnn_deterministic = _as_bool(det_cfg.get("cudnn_deterministic", True), True)
-    cudnn_benchmark = _as_bool(det_cfg.get("cudnn_benchmark", False), False)
+def _resolve_determinism(determinism: DeterminismConfig) -> Dict[str, Any]:
+    enabled = determinism.enabled
+    seed = determinism.seed
+    torch_deterministic = determinism.torch_deterministic
+    cudnn_deterministic = determinism.cudnn_deterministic
+    cudnn_benchmark = determinism.cudnn_benchmark
 
     enabled = _as_bool(_env_or_default("HOU2UE_TRAIN_DETERMINISM_ENABLED", enabled), enabled)
     seed = int(_env_or_default("HOU2UE_TRAIN_SEED", seed))
@@ -175,12 +193,79 @@ def _apply_determinism_env(settings: Dict[str, Any]) -> Dict[str, str]:
     return applied
 
 
+def _cache_dir(run_dir: Path) -> Path:
+    out_root = str(os.environ.get("HOU2UE_OUT_ROOT", "") or "").strip()
+    return Path(out_root) / "cache" if out_root else run_dir / "workspace" / "cache"
+
+
+def _network_index_path(run_dir: Path, project_dir: Path) -> Path:
+    return _cache_dir(run_dir) / f"network_index_{project_dir.resolve().name}.json"
+
+
+def _dump_setup(asset_path: str) -> Dict[str, Any]:
+    lib = getattr(unreal, "MLDTrainAutomationLibrary", None)
+    fn = getattr(lib, "dump_deformer_setup", None) if lib is not None else None
+    if fn is None:
+        raise RuntimeError("dump_deformer_setup missing in MLDTrainAutomationLibrary")
+    req_cls = getattr(unreal, "MldDumpRequest", None) or getattr(unreal, "FMldDumpRequest", None)
+    if req_cls is None:
+        raise RuntimeError("Cannot find MldDumpRequest struct in Unreal Python API")
+
+    req = req_cls()
+    _set_field_safe(req, "asset_path", asset_path)
+    result = fn(req)
+    if not bool(_get_field_safe(result, "success", False)):
+        raise RuntimeError(f"dump_deformer_setup failed for {asset_path}: {_get_field_safe(result, 'message', '')}")
+    return {
+        key: str(_get_field_safe(result, key, default))
+        for key, default in (
+            ("model_type", ""),
+            ("skeletal_mesh", ""),
+            ("training_input_anims_json", "[]"),
+            ("nnm_sections_json", "[]"),
+            ("model_overrides_json", "{}"),
+        )
+    }
+
+
+def _reload_asset_package(asset_path: str) -> bool:
+    utils = getattr(unreal, "EditorLoadingAndSavingUtils", None)
+    reload_fn = getattr(utils, "reload_packages", None) if utils is not None else None
+    if reload_fn is None:
+        return False
+    pkg_name = package_name(asset_path)
+    find_fn = getattr(unreal, "find_package", None)
+    pkg = find_fn(pkg_name) if find_fn is not None else None
+    if pkg is None:
+        pkg = unreal.load_package(pkg_name)
+    mode_enum = getattr(unreal, "ReloadPackagesInteractionMode", None)
+    mode = getattr(mode_enum, "ASSUME_POSITIVE", None) if mode_enum is not None else None
+    result = reload_fn([pkg], mode)
+    return bool(result[0] if isinstance(result, tuple) else result)
+
+
+def _shard_keys(order: List[str]) -> Tuple[List[str], str]:
+    """Restrict training_order to HOU2UE_TRAIN_KEYS when running as a ue_train_shards.py shard."""
+    raw = str(os.environ.get("HOU2UE_TRAIN_KEYS", "") or "").strip()
+    if not raw:
+        return order, ""
+    wanted = [k.strip() for k in raw.split(",") if k.strip()]
+    return [k for k in order if k in wanted], str(os.environ.get("HOU2UE_TRAIN_SHARD", "") or "")
+
+
 def _write_json(path: Path, payload: Dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
 
 
-def _train_single_asset(asset_path: str, model_type: str, project_dir: Path) -> Dict[str, Any]:
+def _train_single_asset(
+    asset_path: str,
+    model_type: str,
+    project_dir: Path,
+    network_index: NetworkFileIndex | None = None,
+    sharded: bool = False,
+    telemetry: TelemetryRecorder | None = None,
+) -> Dict[str, Any]:
     train_lib = getattr(unreal, "MLDTrainAutomationLibrary", None)
     if train_lib is None:
         raise RuntimeError("MLDTrainAutomationLibrary is not available")
@@ -189,12 +274,17 @@ def _train_single_asset(asset_path: str, model_type: str, project_dir: Path) ->
     if train_fn is None:
         raise RuntimeError("train_deformer_asset function missing on MLDTrainAutomationLibrary")
 
-    before = _snapshot_network_files(project_dir)
+    before = _snapshot_network_files(project_dir, network_index)
     req = _build_request(asset_path, model_type)
-    result = train_fn(req)
-    after = _snapshot_network_files(project_dir)
+    if telemetry is not None:
+        with telemetry:
+            result = train_fn(req)
+    else:
+        result = train_fn(req)
+    after = _snapshot_network_files(project_dir, network_index)
 
-    network_path = _latest_network_path(before, after, model_type)
+    prefer_name = asset_path.rsplit("/", 1)[-1].split(".", 1)[0] if sharded else ""
+    network_path = _latest_network_path(before, after, model_type, prefer_name)
 
     success = bool(_get_field_safe(result, "success", False))
     result_code = int(_get_field_safe(result, "training_result_code", -1))
@@ -204,7 +294,7 @@ def _train_single_asset(asset_path: str, model_type: str, project_dir: Path) ->
 
     save_asset(asset_path)
 
-    return {
+    out = {
         "asset_path": asset_path,
         "model_type": model_type,
         "success": success,
@@ -214,6 +304,77 @@ def _train_single_asset(asset_path: str, model_type: str, project_dir: Path) ->
         "network_file_path": network_path,
         "message": message,
     }
+    if telemetry is not None:
+        out["telemetry"] = summarize_telemetry(telemetry.out_path)
+    return out
+
+
+def _make_telemetry(
+    telemetry_cfg: Dict[str, Any],
+    run_dir: Path,
+    key: str,
+    item: Dict[str, Any],
+) -> TelemetryRecorder | None:
+    if not _as_bool(telemetry_cfg.get("enabled", False), False):
+        return None
+    overrides = item.get("model_overrides", {}) if isinstance(item.get("model_overrides"), dict) else {}
+    # Shards pass their own -abslog; the newest file in the shared project log dir may be another shard's.
+    shard_log = str(os.environ.get("HOU2UE_TRAIN_EDITOR_LOG", "") or "").strip()
+    log_path = Path(shard_log) if shard_log else latest_log_file(Path(unreal.Paths.project_log_dir()))
+    return TelemetryRecorder(
+        out_path=run_dir / "reports" / "train_telemetry" / f"{key}.jsonl",
+        log_path=log_path,
+        batch_size=int(overrides.get("batch_size", 0) or 0),
+        interval_sec=float(telemetry_cfg.get("interval_sec", 1.0)),
+        iteration_regex=str(telemetry_cfg.get("iteration_regex", "") or DEFAULT_ITERATION_REGEX),
+        loss_regex=str(telemetry_cfg.get("loss_regex", "") or DEFAULT_LOSS_REGEX),
+    )
+
+
+def _train_with_cache(
+    asset_path: str,
+    model_type: str,
+    project_dir: Path,
+    determinism: Dict[str, Any],
+    cache: TrainCache,
+    hash_cache: HashCache,
+    network_index: NetworkFileIndex | None = None,
+    sharded: bool = False,
+    telemetry: TelemetryRecorder | None = None,
+) -> Dict[str, Any]:
+    asset_file = game_path_to_file(project_dir, asset_path)
+    fp = setup_fingerprint(asset_path, _dump_setup(asset_path), project_dir, determinism, hash_cache.sha256)
+    cache_row: Dict[str, Any] = {"fingerprint": fp["fingerprint"], "hit": False, "stored": False, "reason": "miss"}
+
+    meta = cache.lookup(fp["fingerprint"])
+    if meta is not None:
+        if not hasattr(getattr(unreal, "EditorLoadingAndSavingUtils", None), "reload_packages"):
+            cache_row["reason"] = "reload_packages_unavailable"
+        else:
+            network_path = cache.restore(meta, project_dir, asset_file)
+            if _reload_asset_package(asset_path):
+                cache_row.update({"hit": True, "reason": "restored", "entry_dir": meta["entry_dir"]})
+                return {
+                    "asset_path": asset_path,
+                    "model_type": model_type,
+                    "success": True,
+                    "training_result_code": int(meta.get("training_result_code", 0)),
+                    "duration_sec": 0.0,
+                    "network_loaded": bool(meta.get("network_loaded", True)),
+                    "network_file_path": network_path,
+                    "message": f"Restored from training cache ({meta.get('created_at', '')})",
+                    "train_cache": cache_row,
+                }
+            # The restored file is overwritten by the retrain below.
+            cache_row["reason"] = "reload_failed"
+
+    result = _train_single_asset(asset_path, model_type, project_dir, network_index, sharded, telemetry)
+    if result["success"] and result["network_loaded"] and asset_file.is_file():
+        network_file = Path(result["network_file_path"]) if result["network_file_path"] else None
+        entry = cache.store(fp["fingerprint"], project_dir, asset_file, network_file, result, fp["inputs"])
+        cache_row.update({"stored": True, "entry_dir": str(entry)})
+    result["train_cache"] = cache_row
+    return result
 
 
 def main() -> int:
@@ -235,9 +396,19 @@ def main() -> int:
     try:
         project_dir = Path(unreal.Paths.project_dir())
         deformer_cfg = require_nested(cfg, ("ue", "deformer_assets"))
-        order = list(require_nested(cfg, ("ue", "training_order")))
-        determinism = _resolve_determinism(cfg)
+        order, shard = _shard_keys(list(require_nested(cfg, ("ue", "training_order"))))
+        shard_report = str(os.environ.get("HOU2UE_TRAIN_SHARD_REPORT", "") or "").strip()
+        determinism = _resolve_determinism(ctx["pipeline_config"].training.determinism)
         applied_env = _apply_determinism_env(determinism)
+        network_index = NetworkFileIndex(_network_index_path(run_dir, project_dir))
+        cache_cfg = get_nested(cfg, ("ue", "training", "cache"), {})
+        cache_enabled = isinstance(cache_cfg, dict) and _as_bool(cache_cfg.get("enabled", False), False)
+        cache_enabled = _as_bool(_env_or_default("HOU2UE_TRAIN_CACHE_ENABLED", cache_enabled), cache_enabled)
+        train_cache = TrainCache(_cache_dir(run_dir) / "train_cache") if cache_enabled else None
+        asset_hashes = HashCache(_cache_dir(run_dir) / "ue_asset_hashes.json") if cache_enabled else None
+        telemetry_cfg = get_nested(cfg, ("ue", "training", "telemetry"), {})
+        if not isinstance(telemetry_cfg, dict):
+            telemetry_cfg = {}
 
         results: List[Dict[str, Any]] = []
         errors: List[Dict[str, Any]] = []
@@ -252,7 +423,25 @@ def main() -> int:
             model_type = str(require_nested(item, ("model_type",)))
 
             try:
-                train_result = _train_single_asset(asset_path, model_type, project_dir)
+                telemetry = _make_telemetry(telemetry_cfg, run_dir, key, item)
+                with profile_span(f"train:{key}"):
+                    if train_cache is not None and asset_hashes is not None:
+                        train_result = _train_with_cache(
+                            asset_path,
+                            model_type,
+                            project_dir,
+                            determinism,
+                            train_cache,
+                            asset_hashes,
+                            network_index,
+                            bool(shard),
+                            telemetry,
+                        )
+                    else:
+                        train_result = _train_single_asset(
+                            asset_path, model_type, project_dir, network_index, bool(shard), telemetry
+                        )
+                train_result["key"] = key
                 train_result["determinism"] = determinism
                 results.append(train_result)
 
@@ -279,7 +468,41 @@ def main() -> int:
                     }
                 )
 
+        try:
+            network_index.save()
+            if asset_hashes is not None:
+                asset_hashes.save()
+        except OSError as exc:
+            unreal.log_warning(f"[ue_train] could not persist train caches: {exc}")
+
+        cache_rows = [r.get("train_cache", {}) for r in results]
+        train_cache_summary = {
+            "enabled": train_cache is not None,
+            "root": str(train_cache.root) if train_cache is not None else "",
+            "hits": len([c for c in cache_rows if c.get("hit")]),
+            "misses": len([c for c in cache_rows if c and not c.get("hit")]),
+            "stored": len([c for c in cache_rows if c.get("stored")]),
+        }
+
         status = "success" if not errors else "failed"
+        if shard_report:
+            # ue_train_shards.py merges shard reports into train_report.json and the determinism report.
+            finalize_report(
+                report,
+                status=status,
+                outputs={
+                    "shard": shard,
+                    "results": results,
+                    "determinism": determinism,
+                    "applied_env": applied_env,
+                    "network_index": network_index.stats(),
+                    "train_cache": train_cache_summary,
+                },
+                errors=errors,
+            )
+            _write_json(Path(shard_report), report)
+            return 0 if status == "success" else 1
+
         determinism_report = make_report(
             "train_determinism",
             profile,
@@ -308,6 +531,13 @@ def main() -> int:
                 "trained_count": len([r for r in results if r.get("success")]),
                 "failed_count": len(errors),
                 "determinism": determinism,
+                "network_index": network_index.stats(),
+                "train_cache": train_cache_summary,
+                "train_telemetry_dir": (
+                    str((run_dir / "reports" / "train_telemetry").resolve())
+                    if _as_bool(telemetry_cfg.get("enabled", False), False)
+                    else ""
+                ),
                 "train_determinism_report": str((run_dir / "reports" / "train_determinism_report.json").resolve()),
             },
             errors=errors,
@@ -322,7 +552,11 @@ def main() -> int:
             outputs={},
             errors=[{"message": str(exc), "traceback": traceback.format_exc()}],
         )
-        write_stage_report(run_dir, "train", report)
+        shard_report = str(os.environ.get("HOU2UE_TRAIN_SHARD_REPORT", "") or "").strip()
+        if shard_report:
+            _write_json(Path(shard_report), report)
+        else:
+            write_stage_report(run_dir, "train", report)
         return 1
 
 
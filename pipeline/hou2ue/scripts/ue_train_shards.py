@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""Shard ue.training_order across N UnrealEditor-Cmd processes and merge their results into train_report.json."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List
+
+from common import (
+    finalize_report,
+    make_report,
+    require_nested,
+    stage_report_path,
+    write_json,
+)
+from editor_process import kill_process_tree, resolve_editor_cmd, tail_lines
+from pipeline_config import load_pipeline_config
+from report_store import write_report
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run ue_train.py sharded across several editor processes")
+    parser.add_argument("--config", required=True)
+    parser.add_argument("--profile", required=True, choices=["smoke", "full"])
+    parser.add_argument("--run-dir", required=True)
+    parser.add_argument("--out-root", default="")
+    parser.add_argument("--shards", type=int, default=0, help="Shard count; 0 uses ue.training.parallel.shards")
+    return parser.parse_args()
+
+
+def _project_root() -> Path:
+    return Path(__file__).resolve().parents[3]
+
+
+def _resolve_path(base: Path, value: str) -> Path:
+    path = Path(value)
+    return path if path.is_absolute() else (base / path).resolve()
+
+
+def _load_json(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8-sig"))
+    except Exception:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+# Model types whose trainer writes one fixed network file under the project Intermediate dir,
+# whatever the asset: two such assets training at once overwrite each other's network.
+SHARED_NETWORK_FILES: Dict[str, str] = {"NNM": "NearestNeighborModel.ubnne"}
+
+
+def shard_groups(order: List[str], deformer_cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Split training_order into units that must run in one shard.
+
+    Assets sharing a fixed network file (SHARED_NETWORK_FILES) form one group and train one after
+    another; every other asset is a group of its own.
+    """
+    groups: List[Dict[str, Any]] = []
+    by_file: Dict[str, Dict[str, Any]] = {}
+    for key in order:
+        item = deformer_cfg.get(key)
+        model_type = str(item.get("model_type", "")).upper() if isinstance(item, dict) else ""
+        shared = SHARED_NETWORK_FILES.get(model_type, "")
+        if shared and shared in by_file:
+            by_file[shared]["keys"].append(key)
+            continue
+        group = {"keys": [key], "shared_network_file": shared}
+        groups.append(group)
+        if shared:
+            by_file[shared] = group
+    return groups
+
+
+def shard_keys(order: List[str], shard_count: int, deformer_cfg: Dict[str, Any] | None = None) -> List[List[str]]:
+    """Deal shard_groups onto at most shard_count non-empty shards, each group to the lightest shard.
+
+    Keys keep their training_order position inside a shard.
+    """
+    groups = shard_groups(order, deformer_cfg or {})
+    count = max(1, min(int(shard_count), len(groups)))
+    shards: List[List[str]] = [[] for _ in range(count)]
+    for group in groups:
+        min(shards, key=len).extend(group["keys"])
+    position = {key: i for i, key in enumerate(order)}
+    return [sorted(keys, key=position.__getitem__) for keys in shards if keys]
+
+
+def shard_report_path(run_dir: Path, index: int) -> Path:
+    return run_dir / "reports" / "train_shards" / f"train_shard_{index}_report.json"
+
+
+def shard_editor_log_path(run_dir: Path, index: int) -> Path:
+    return run_dir / "reports" / "logs" / f"train_shard_{index}.editor.log"
+
+
+def _run_shards(
+    editor_cmd: Path,
+    uproject: Path,
+    train_script: Path,
+    shards: List[List[str]],
+    base_env: Dict[str, str],
+    run_dir: Path,
+    timeout_minutes: float,
+) -> List[Dict[str, Any]]:
+    log_dir = run_dir / "reports" / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    running: List[Dict[str, Any]] = []
+    for index, keys in enumerate(shards):
+        report_path = shard_report_path(run_dir, index)
+        report_path.unlink(missing_ok=True)
+        env = dict(base_env)
+        env["HOU2UE_TRAIN_KEYS"] = ",".join(keys)
+        env["HOU2UE_TRAIN_SHARD"] = f"{index}/{len(shards)}"
+        env["HOU2UE_TRAIN_SHARD_REPORT"] = str(report_path.resolve())
+        # Every shard logs to its own file; the project Saved/Logs dir is shared by all of them.
+        editor_log = shard_editor_log_path(run_dir, index).resolve()
+        env["HOU2UE_TRAIN_EDITOR_LOG"] = str(editor_log)
+        cmd = [
+            str(editor_cmd),
+            str(uproject),
+            f"-ExecutePythonScript={train_script.as_posix()}",
+            "-unattended",
+            "-nop4",
+            "-nosplash",
+            "-NoSound",
+            "-stdout",
+            "-FullStdOutLogOutput",
+            f"-abslog={editor_log}",
+        ]
+        log_path = log_dir / f"train_shard_{index}.stdout.log"
+        handle = log_path.open("w", encoding="utf-8", errors="ignore")
+        proc = subprocess.Popen(cmd, env=env, stdout=handle, stderr=subprocess.STDOUT)
+        print(f"[ue_train_shards] shard {index}: pid={proc.pid} keys={keys}", flush=True)
+        running.append(
+            {
+                "index": index,
+                "keys": keys,
+                "proc": proc,
+                "handle": handle,
+                "log_path": log_path,
+                "report_path": report_path,
+                "started": time.monotonic(),
+                "abort_reason": "",
+            }
+        )
+
+    deadline = time.monotonic() + timeout_minutes * 60.0
+    while any(item["proc"].poll() is None for item in running):
+        if time.monotonic() > deadline:
+            for item in running:
+                if item["proc"].poll() is None:
+                    item["abort_reason"] = "timeout"
+                    kill_process_tree(item["proc"].pid)
+            break
+        time.sleep(5)
+
+    outcomes: List[Dict[str, Any]] = []
+    for item in running:
+        proc = item["proc"]
+        try:
+            exit_code = proc.wait(timeout=20)
+        except subprocess.TimeoutExpired:
+            kill_process_tree(proc.pid)
+            exit_code = -9
+        item["handle"].close()
+        outcomes.append(
+            {
+                "index": item["index"],
+                "keys": item["keys"],
+                "pid": proc.pid,
+                "exit_code": int(exit_code),
+                "abort_reason": item["abort_reason"],
+                "duration_sec": round(time.monotonic() - item["started"], 3),
+                "report_path": str(item["report_path"].resolve()),
+                "log_path": str(item["log_path"].resolve()),
+                "editor_log_path": str(shard_editor_log_path(run_dir, item["index"]).resolve()),
+            }
+        )
+    return outcomes
+
+
+def merge_shard_reports(order: List[str], outcomes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge per-shard reports back into training_order; missing or failed shards become errors."""
+    by_key: Dict[str, Dict[str, Any]] = {}
+    errors: List[Dict[str, Any]] = []
+    determinism: Dict[str, Any] = {}
+    applied_env: Dict[str, str] = {}
+    network_index: List[Dict[str, Any]] = []
+    train_cache: Dict[str, Any] = {"enabled": False, "hits": 0, "misses": 0, "stored": 0}
+
+    for outcome in outcomes:
+        report = _load_json(Path(outcome["report_path"]))
+        outcome["status"] = str(report.get("status", "missing")) if report else "missing"
+        if not report:
+            errors.append(
+                {
+                    "message": f"Shard {outcome['index']} wrote no report (exit code {outcome['exit_code']})",
+                    "shard": outcome["index"],
+                    "keys": outcome["keys"],
+                    "abort_reason": outcome["abort_reason"],
+                    "log_tail": tail_lines(Path(outcome["log_path"]), 40),
+                }
+            )
+            continue
+
+        outputs = report.get("outputs", {}) if isinstance(report.get("outputs"), dict) else {}
+        for row in outputs.get("results", []):
+            if isinstance(row, dict):
+                row = dict(row)
+                row["shard"] = outcome["index"]
+                by_key[str(row.get("key", ""))] = row
+        for err in report.get("errors", []):
+            err = dict(err) if isinstance(err, dict) else {"message": str(err)}
+            err["shard"] = outcome["index"]
+            errors.append(err)
+        if not determinism and isinstance(outputs.get("determinism"), dict):
+            determinism = outputs["determinism"]
+        if not applied_env and isinstance(outputs.get("applied_env"), dict):
+            applied_env = outputs["applied_env"]
+        if isinstance(outputs.get("network_index"), dict):
+            network_index.append(outputs["network_index"])
+        shard_cache = outputs.get("train_cache")
+        if isinstance(shard_cache, dict):
+            train_cache["enabled"] = train_cache["enabled"] or bool(shard_cache.get("enabled", False))
+            train_cache["root"] = str(shard_cache.get("root", train_cache.get("root", "")))
+            for field in ("hits", "misses", "stored"):
+                train_cache[field] += int(shard_cache.get(field, 0))
+
+    results = [by_key[key] for key in order if key in by_key]
+
+    # Concurrent shards write network files at the same time; flag any file claimed twice.
+    claimed: Dict[str, List[str]] = {}
+    for row in results:
+        path = str(row.get("network_file_path", "") or "")
+        if path:
+            claimed.setdefault(path, []).append(str(row.get("asset_path", "")))
+    for path, assets in claimed.items():
+        if len(assets) > 1:
+            errors.append({"message": f"Network file attributed to several assets: {path}", "assets": assets})
+
+    return {
+        "results": results,
+        "errors": errors,
+        "determinism": determinism,
+        "applied_env": applied_env,
+        "network_index": network_index,
+        "train_cache": train_cache,
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    run_dir = Path(args.run_dir)
+    report_path = stage_report_path(run_dir, "train")
+    report = make_report(
+        stage="train",
+        profile=args.profile,
+        inputs={
+            "config": str(Path(args.config).resolve()),
+            "run_dir": str(run_dir.resolve()),
+            "profile": args.profile,
+        },
+    )
+
+    try:
+        config = load_pipeline_config(args.config, run_dir)
+        cfg = config.raw
+        project_root = _project_root()
+        order = [str(v) for v in require_nested(cfg, ("ue", "training_order"))]
+        deformer_cfg = require_nested(cfg, ("ue", "deformer_assets"))
+        training = config.training
+        shard_count = args.shards if args.shards > 0 else training.shards if training.parallel_enabled else 1
+
+        editor_cmd = resolve_editor_cmd(str(require_nested(cfg, ("paths", "ue_editor_exe"))))
+        uproject = _resolve_path(project_root, str(require_nested(cfg, ("paths", "uproject"))))
+        train_script = (Path(__file__).resolve().parent / "ue_train.py").resolve()
+
+        base_env = os.environ.copy()
+        base_env["HOU2UE_CONFIG"] = str(Path(args.config).resolve())
+        base_env["HOU2UE_PROFILE"] = args.profile
+        base_env["HOU2UE_RUN_DIR"] = str(run_dir.resolve())
+        if args.out_root:
+            base_env["HOU2UE_OUT_ROOT"] = str(Path(args.out_root).resolve())
+
+        groups = shard_groups(order, deformer_cfg)
+        shards = shard_keys(order, shard_count, deformer_cfg)
+        started = time.monotonic()
+        outcomes = _run_shards(editor_cmd, uproject, train_script, shards, base_env, run_dir, training.timeout_minutes)
+        merged = merge_shard_reports(order, outcomes)
+        results = merged["results"]
+        errors = merged["errors"]
+        missing_keys = [key for key in order if key not in {str(r.get("key", "")) for r in results}]
+        if missing_keys and not errors:
+            errors.append({"message": "Shards reported no result for some keys", "keys": missing_keys})
+
+        determinism_report = make_report(
+            "train_determinism",
+            args.profile,
+            {
+                "config": str(Path(args.config).resolve()),
+                "run_dir": str(run_dir.resolve()),
+                "profile": args.profile,
+            },
+        )
+        finalize_report(
+            determinism_report,
+            status="success" if merged["determinism"] else "failed",
+            outputs={
+                "settings": merged["determinism"],
+                "applied_env": merged["applied_env"],
+                "shard_count": len(shards),
+            },
+            errors=[] if merged["determinism"] else [{"message": "No shard reported determinism settings"}],
+        )
+        determinism_path = run_dir / "reports" / "train_determinism_report.json"
+        write_json(determinism_path, determinism_report)
+
+        status = "success" if not errors and not missing_keys else "failed"
+        finalize_report(
+            report,
+            status=status,
+            outputs={
+                "results": results,
+                "trained_count": len([r for r in results if r.get("success")]),
+                "failed_count": len(errors),
+                "determinism": merged["determinism"],
+                "network_index": merged["network_index"],
+                "train_cache": merged["train_cache"],
+                "train_determinism_report": str(determinism_path.resolve()),
+                "sharding": {
+                    "shard_count": len(shards),
+                    "configured_shards": shard_count,
+                    "shared_network_groups": [g for g in groups if g["shared_network_file"]],
+                    "missing_keys": missing_keys,
+                    "wall_sec": round(time.monotonic() - started, 3),
+                    "shards": outcomes,
+                },
+            },
+            errors=errors,
+        )
+        write_report(report_path, report)
+        return 0 if status == "success" else 1
+
+    except Exception as exc:
+        finalize_report(
+            report,
+            status="failed",
+            outputs={},
+            errors=[{"message": str(exc), "traceback": traceback.format_exc()}],
+        )
+        write_report(report_path, report)
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
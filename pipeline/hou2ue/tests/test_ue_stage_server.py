@@ -0,0 +1,177 @@
+"""ue_stage_server dispatch layer against a fake `unreal` module, over a real loopback socket."""
+import json
+import os
+import pathlib
+import sys
+import textwrap
+import threading
+import time
+import types
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "scripts"))
+
+import ue_stage_client as client  # noqa: E402
+import ue_stage_server as server  # noqa: E402
+
+
+@pytest.fixture
+def fake_unreal(monkeypatch):
+    unreal = types.ModuleType("unreal")
+    unreal.messages = []
+    unreal.log = unreal.messages.append
+    monkeypatch.setitem(sys.modules, "unreal", unreal)
+    return unreal
+
+
+def _start(tmp_path, dispatcher):
+    info_path = tmp_path / "server.json"
+    thread = threading.Thread(target=server.serve, args=(info_path,), kwargs={"dispatcher": dispatcher}, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not info_path.exists():
+        assert time.monotonic() < deadline, "server did not publish its info file"
+        time.sleep(0.01)
+    return json.loads(info_path.read_text(encoding="utf-8")), thread, info_path
+
+
+@pytest.fixture
+def running(tmp_path, fake_unreal):
+    """Start serve() with a recording runner; yields (info, calls, gate)."""
+    calls = []
+    gate = threading.Event()
+    gate.set()
+
+    def runner(script_path):
+        calls.append((script_path.name, {k: v for k, v in os.environ.items() if k.startswith("HOU2UE_")}))
+        gate.wait(10)
+        return int(os.environ.get("HOU2UE_TEST_RC", "0"))
+
+    info, thread, info_path = _start(tmp_path, server.StageDispatcher("secret", runner))
+    yield info, calls, gate
+    gate.set()
+    client.send_request(info, {"op": "shutdown"}, timeout=10)
+    thread.join(10)
+    assert not thread.is_alive()
+    assert not info_path.exists()
+
+
+def _run(info, script, env=None, timeout=10):
+    return client.send_request(info, {"op": "run_stage", "script": str(script), "env": env or {}}, timeout=timeout)
+
+
+def test_run_stage_applies_request_env_and_restores_it(running, monkeypatch):
+    info, calls, _ = running
+    monkeypatch.setenv("HOU2UE_LEFTOVER", "from the editor launch")
+    response = _run(info, server._THIS_DIR / "ue_train.py", {"HOU2UE_RUN_DIR": "/runs/a", "HOU2UE_TEST_RC": "3"})
+    assert (response["ok"], response["exit_code"]) == (True, 3)
+    assert calls == [("ue_train.py", {"HOU2UE_RUN_DIR": "/runs/a", "HOU2UE_TEST_RC": "3"})]
+    assert os.environ["HOU2UE_LEFTOVER"] == "from the editor launch"
+    assert "HOU2UE_RUN_DIR" not in os.environ
+
+
+def test_ping_answers_while_a_stage_runs(running):
+    info, calls, gate = running
+    gate.clear()
+    results = []
+    stage = threading.Thread(target=lambda: results.append(_run(info, server._THIS_DIR / "ue_infer.py")))
+    stage.start()
+    deadline = time.monotonic() + 10
+    while not calls:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    pong = client.send_request(info, {"op": "ping"}, timeout=2)
+    assert pong["ok"] and pong["busy"] and pong["stage"] == "ue_infer.py"
+    assert client._ping(info)
+
+    gate.set()
+    stage.join(10)
+    assert results[0]["ok"]
+    assert client.send_request(info, {"op": "ping"}, timeout=2)["busy"] is False
+
+
+def test_stage_requests_queue_behind_each_other(running):
+    info, calls, gate = running
+    gate.clear()
+    results = []
+    threads = [
+        threading.Thread(target=lambda name=name: results.append(_run(info, server._THIS_DIR / name)))
+        for name in ("ue_import.py", "ue_setup_assets.py")
+    ]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.2)
+    assert len(calls) == 1
+    gate.set()
+    for thread in threads:
+        thread.join(10)
+    assert [c[0] for c in calls] == ["ue_import.py", "ue_setup_assets.py"]
+    assert all(r["ok"] for r in results)
+
+
+def test_rejects_bad_token_unknown_op_and_foreign_scripts(running, tmp_path):
+    info, calls, _ = running
+    assert client.send_request(dict(info, token="wrong"), {"op": "ping"}, timeout=2)["error"] == "invalid token"
+    assert client.send_request(info, {"op": "reboot"}, timeout=2)["error"] == "unknown op: reboot"
+    outside = tmp_path / "evil.py"
+    outside.write_text("def main():\n    return 0\n", encoding="utf-8")
+    response = _run(info, outside)
+    assert not response["ok"] and "must live in" in response["error"]
+    assert not _run(info, server._THIS_DIR / "ue_stage_server.py")["ok"]
+    assert calls == []
+
+
+def test_each_dispatch_sees_fresh_helpers(tmp_path, monkeypatch, fake_unreal):
+    scripts = tmp_path / "scripts"
+    scripts.mkdir()
+    monkeypatch.setattr(server, "_THIS_DIR", scripts)
+    monkeypatch.syspath_prepend(str(scripts))
+    # Both helper versions have the same size and may share an mtime second; keep a stale .pyc out of it.
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    (scripts / "helper_state.py").write_text("SPANS = []\nVERSION = 1\n", encoding="utf-8")
+    stage = scripts / "stage_probe.py"
+    stage.write_text(
+        textwrap.dedent(
+            """
+            import os
+            import unreal
+            import helper_state
+
+            def main():
+                helper_state.SPANS.append(os.environ["HOU2UE_RUN_DIR"])
+                unreal.log(f"spans={len(helper_state.SPANS)} version={helper_state.VERSION}")
+                raise SystemExit(int(os.environ.get("HOU2UE_TEST_RC", "0")))
+            """
+        ),
+        encoding="utf-8",
+    )
+    dispatcher = server.StageDispatcher("secret")
+    request = {"token": "secret", "op": "run_stage", "script": str(stage)}
+
+    assert dispatcher.handle(dict(request, env={"HOU2UE_RUN_DIR": "a"}))["exit_code"] == 0
+    (scripts / "helper_state.py").write_text("SPANS = []\nVERSION = 2\n", encoding="utf-8")
+    response = dispatcher.handle(dict(request, env={"HOU2UE_RUN_DIR": "b", "HOU2UE_TEST_RC": "4"}))
+
+    assert (response["ok"], response["exit_code"]) == (True, 4)
+    stage_lines = [m for m in fake_unreal.messages if not m.startswith("[hou2ue_stage_server]")]
+    assert stage_lines == ["spans=1 version=1", "spans=1 version=2"]
+    assert dispatcher.stage_count == 2
+
+
+def test_stage_without_main_is_reported(tmp_path, monkeypatch, fake_unreal):
+    monkeypatch.setattr(server, "_THIS_DIR", tmp_path)
+    (tmp_path / "no_main.py").write_text("X = 1\n", encoding="utf-8")
+    response = server.StageDispatcher("secret").handle(
+        {"token": "secret", "op": "run_stage", "script": str(tmp_path / "no_main.py"), "env": {}}
+    )
+    assert not response["ok"] and "has no main()" in response["error"]
+
+
+def test_idle_timeout_shuts_the_server_down(tmp_path, fake_unreal):
+    info_path = tmp_path / "server.json"
+    started = time.monotonic()
+    assert server.serve(info_path, idle_timeout_sec=1.0, dispatcher=server.StageDispatcher("secret")) == 0
+    assert time.monotonic() - started < 10
+    assert not info_path.exists()
@@ -3,10 +3,18 @@ import argparse
 import datetime as dt
 import hashlib
 import json
+import os
 import pathlib
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import yaml
 
+from mesh_topology import topology_fingerprint
+
+DELTA_LIST_LIMIT = 1000
+
 VALID_EXT = {
     ".obj": "mesh",
     ".fbx": "mesh",
@@ -34,6 +42,14 @@ def hash_prefix(path: pathlib.Path, limit: int = 8 * 1024 * 1024) -> str:
     return h.hexdigest()
 
 
+def hash_full(path: pathlib.Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
 def split_for_hash(h: str) -> str:
     v = int(h[:8], 16) % 10
     if v < 8:
@@ -48,13 +64,175 @@ def load_manifest(path: pathlib.Path) -> dict:
         return yaml.safe_load(f)
 
 
+def _norm_path(value: str) -> str:
+    return str(value).replace("\\", "/").lower()
+
+
+class SourceAssetIndex:
+    """Maps manifest target_path entries to asset ids; lookups cost O(path depth^2), not O(assets).
+
+    Targets are keyed on whole path components ("raw/gated/amass/" matches every file below it), so a
+    file resolves by probing each component-aligned slice of its path. When several targets match,
+    the first asset in manifest order wins.
+    """
+
+    def __init__(self, assets: list[dict]):
+        self._targets: dict[str, tuple[int, str]] = {}
+        for order, asset in enumerate(assets):
+            target = _norm_path(asset.get("target_path", ""))
+            if not target.strip("/"):
+                continue
+            hit = (order, asset.get("asset_id", "unknown"))
+            # "raw/x.gltf" names a file; "raw/amass/" (or "raw/amass") also covers everything below it.
+            if not target.endswith("/"):
+                self._targets.setdefault(target.strip("/"), hit)
+            self._targets.setdefault(target.strip("/") + "/", hit)
+
+    def lookup(self, file_path: pathlib.Path) -> str:
+        parts = [p for p in _norm_path(file_path).split("/") if p]
+        best = None
+        for start in range(len(parts)):
+            for end in range(start + 1, len(parts) + 1):
+                key = "/".join(parts[start:end]) + ("/" if end < len(parts) else "")
+                hit = self._targets.get(key)
+                if hit is not None and (best is None or hit[0] < best[0]):
+                    best = hit
+        return best[1] if best is not None else "unknown"
+
+
 def guess_source_asset(file_path: pathlib.Path, assets: list[dict]) -> str:
-    fp = str(file_path).replace("\\", "/").lower()
-    for asset in assets:
-        target = str(asset.get("target_path", "")).replace("\\", "/").lower()
-        if target and target in fp:
-            return asset.get("asset_id", "unknown")
-    return "unknown"
+    return SourceAssetIndex(assets).lookup(file_path)
+
+
+def sample_id_for(relative_path: str) -> str:
+    # Derived from the path, not the enumeration index, so adding a file never renumbers the others.
+    return "sample_" + hashlib.sha256(relative_path.encode("utf-8")).hexdigest()[:16]
+
+
+def load_previous_records(path: pathlib.Path) -> dict[str, dict]:
+    if not path.exists():
+        return {}
+    records = {}
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(rec, dict) and rec.get("relative_path"):
+                records[rec["relative_path"]] = rec
+    return records
+
+
+def _done(value) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+class ContentIndex:
+    """Content identity per file from (size, prefix hash); the full sha256 is read only for files whose
+    (size, prefix hash) is shared with another file, to tell byte-identical files from ones that merely
+    share their first 8 MiB."""
+
+    def __init__(self):
+        self._groups: dict[tuple[int, str], tuple[threading.Lock, list[list]]] = {}
+        self._lock = threading.Lock()
+        self.full_hashes = 0
+
+    def _hash_full(self, path: pathlib.Path) -> str:
+        digest = hash_full(path)
+        with self._lock:
+            self.full_hashes += 1
+        return digest
+
+    def identify(self, file_path: pathlib.Path, size: int, prefix: str, sha256: str = "") -> tuple[str, str]:
+        """(content id, full sha256 or "" when it was not needed). Byte-identical files get the same id."""
+        with self._lock:
+            group_lock, members = self._groups.setdefault((size, prefix), (threading.Lock(), []))
+        base_id = f"{size}:{prefix}"
+        with group_lock:
+            if not members:
+                members.append([file_path, sha256])
+                return base_id, sha256
+            sha256 = sha256 or self._hash_full(file_path)
+            for index, member in enumerate(members):
+                if not member[1]:
+                    member[1] = self._hash_full(member[0])
+                if member[1] == sha256:
+                    return (base_id if index == 0 else f"{base_id}:{sha256}"), sha256
+            members.append([file_path, sha256])
+            return f"{base_id}:{sha256}", sha256
+
+
+class Fingerprinter:
+    """Content identity plus topology fingerprint per file; byte-identical files are parsed once and
+    share the first parser's result."""
+
+    def __init__(self):
+        self.contents = ContentIndex()
+        self._claims: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def seed(
+        self, file_path: pathlib.Path, size: int, prefix: str, sha256: str, topology: tuple[str, str]
+    ) -> tuple[str, str]:
+        content_id, sha256 = self.contents.identify(file_path, size, prefix, sha256)
+        with self._lock:
+            self._claims.setdefault(content_id, _done(topology))
+        return content_id, sha256
+
+    def fingerprint(self, file_path: pathlib.Path, size: int) -> tuple[str, str, str, Future]:
+        """(prefix hash, content id, full sha256 or "", future of (topology hash, method))."""
+        prefix = hash_prefix(file_path)
+        content_id, sha256 = self.contents.identify(file_path, size, prefix)
+        with self._lock:
+            owner = self._claims.get(content_id)
+            if owner is not None:
+                return prefix, content_id, sha256, owner
+            owner = self._claims[content_id] = Future()
+        try:
+            fp = topology_fingerprint(file_path)
+        except BaseException as exc:
+            owner.set_exception(exc)
+            raise
+        owner.set_result((fp, "faces") if fp else (prefix, "prefix"))
+        return prefix, content_id, sha256, owner
+
+
+def iter_fingerprinted(files: list[pathlib.Path], sizes: dict, workers: int, known: dict, fingerprinter: Fingerprinter):
+    """(path, prefix hash, content id, sha256 or "", topology hash, topology method) in input order.
+    Paths in known reuse their previous values; the rest go to a thread pool with a bounded look-ahead."""
+
+    def submit(pool: ThreadPoolExecutor, file_path: pathlib.Path) -> Future:
+        if file_path in known:
+            prefix, content_id, sha256, topology_hash, method = known[file_path]
+            return _done((prefix, content_id, sha256, _done((topology_hash, method))))
+        return pool.submit(fingerprinter.fingerprint, file_path, sizes[file_path])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        it = iter(files)
+        for file_path in it:
+            pending.append((file_path, submit(pool, file_path)))
+            if len(pending) >= workers * 4:
+                break
+        while pending:
+            file_path, future = pending.popleft()
+            prefix, content_id, sha256, owner = future.result()
+            # A duplicate may wait on a later file that claimed the parse first; that file is already running.
+            topology_hash, method = owner.result()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append((nxt, submit(pool, nxt)))
+            yield file_path, prefix, content_id, sha256, topology_hash, method
+
+
+def _delta_list(paths: list[str]) -> dict:
+    return {"count": len(paths), "paths": paths[:DELTA_LIST_LIMIT], "truncated": len(paths) > DELTA_LIST_LIMIT}
 
 
 def main() -> int:
@@ -62,6 +240,12 @@ def main() -> int:
     parser.add_argument("--data-root", default="D:/MLDPrototypeData")
     parser.add_argument("--manifest", default="prototype/config/assets.manifest.yaml")
     parser.add_argument("--out", default="processed/dataset_manifest.jsonl")
+    parser.add_argument("--workers", type=int, default=min(16, (os.cpu_count() or 4) * 2), help="Hashing threads")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse hashes from the previous manifest for files whose size and mtime are unchanged",
+    )
     args = parser.parse_args()
 
     data_root = pathlib.Path(args.data_root)
@@ -70,37 +254,112 @@ def main() -> int:
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
     manifest = load_manifest(pathlib.Path(args.manifest))
-    assets = manifest.get("assets", [])
-
-    files = [p for p in raw_root.rglob("*") if p.is_file() and p.suffix.lower() in VALID_EXT]
-    records = []
-    for idx, file_path in enumerate(sorted(files)):
-        topology_hash = hash_prefix(file_path)
-        modality = VALID_EXT[file_path.suffix.lower()]
-        qc_status = "passed" if file_path.stat().st_size > 0 else "failed_empty"
-        rec = {
-            "sample_id": f"sample_{idx:06d}",
-            "split": split_for_hash(topology_hash),
-            "mesh_topology_hash": topology_hash,
-            "frame_range": "0-0",
-            "modality": modality,
-            "source_asset": guess_source_asset(file_path, assets),
-            "qc_status": qc_status,
-            "relative_path": str(file_path.relative_to(data_root)).replace("\\", "/"),
-        }
-        records.append(rec)
+    source_index = SourceAssetIndex(manifest.get("assets", []))
+
+    files = sorted(p for p in raw_root.rglob("*") if p.is_file() and p.suffix.lower() in VALID_EXT)
+    stats = {p: p.stat() for p in files}
+    rel_paths = {p: str(p.relative_to(data_root)).replace("\\", "/") for p in files}
+
+    previous = load_previous_records(out_path) if args.incremental else {}
+    fingerprinter = Fingerprinter()
+    known = {}
+    for file_path in files:
+        prev = previous.get(rel_paths[file_path])
+        st = stats[file_path]
+        if (
+            prev
+            and prev.get("size_bytes") == st.st_size
+            and prev.get("mtime_ns") == st.st_mtime_ns
+            and prev.get("content_hash")
+            and prev.get("topology_method")
+        ):
+            topology = (prev["mesh_topology_hash"], prev["topology_method"])
+            content_id, sha256 = fingerprinter.seed(
+                file_path, st.st_size, prev["content_hash"], str(prev.get("sha256", "")), topology
+            )
+            known[file_path] = (prev["content_hash"], content_id, sha256) + topology
 
-    with out_path.open("w", encoding="utf-8") as f:
-        for rec in records:
+    record_count = 0
+    added, changed = [], []
+    # Dedup index: topology -> samples. Same-topology samples share one split (no train/test leakage);
+    # byte-identical files (same content id) are kept in the manifest but skipped by QC.
+    first_by_content: dict[str, str] = {}
+    topologies: dict[str, dict] = {}
+    methods: dict[str, int] = {}
+    sizes = {p: st.st_size for p, st in stats.items()}
+    # Records stream to a temp file as they are hashed; a crash never leaves a truncated manifest behind.
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        for file_path, content_hash, content_id, sha256, topology_hash, method in iter_fingerprinted(
+            files, sizes, max(1, args.workers), known, fingerprinter
+        ):
+            relative_path = rel_paths[file_path]
+            st = stats[file_path]
+            sample_id = sample_id_for(relative_path)
+            split = split_for_hash(topology_hash)
+            rec = {
+                "sample_id": sample_id,
+                "split": split,
+                "mesh_topology_hash": topology_hash,
+                "topology_method": method,
+                "content_hash": content_hash,
+                "frame_range": "0-0",
+                "modality": VALID_EXT[file_path.suffix.lower()],
+                "source_asset": source_index.lookup(file_path),
+                "qc_status": "passed" if st.st_size > 0 else "failed_empty",
+                "relative_path": relative_path,
+                "size_bytes": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+            }
+            # Only files that share (size, content_hash) with another file get a full-file hash.
+            if sha256:
+                rec["sha256"] = sha256
+            group = topologies.setdefault(topology_hash, {"split": split, "samples": [], "duplicates": {}})
+            # Empty or failed files keep their QC status; only passing files can be duplicates.
+            original = first_by_content.setdefault(content_id, sample_id) if rec["qc_status"] == "passed" else sample_id
+            if original != sample_id:
+                rec["qc_status"] = "skipped_duplicate"
+                rec["duplicate_of"] = original
+                group["duplicates"][sample_id] = original
+            else:
+                group["samples"].append(sample_id)
+            methods[method] = methods.get(method, 0) + 1
             f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            record_count += 1
+            prev = previous.get(relative_path)
+            if prev is None:
+                added.append(relative_path)
+            elif {k: v for k, v in prev.items() if k != "mtime_ns"} != {k: v for k, v in rec.items() if k != "mtime_ns"}:
+                changed.append(relative_path)
+    tmp_path.replace(out_path)
+    removed = sorted(set(previous) - set(rel_paths.values()))
+
+    dedup_path = out_path.with_name("dataset_dedup_index.json")
+    with dedup_path.open("w", encoding="utf-8") as f:
+        json.dump({"topologies": topologies}, f, ensure_ascii=False, indent=1)
 
     summary = {
         "generated_at": dt.datetime.now(dt.timezone.utc).isoformat().replace("+00:00", "Z"),
         "data_root": str(data_root),
         "raw_file_count": len(files),
-        "record_count": len(records),
+        "record_count": record_count,
         "output": str(out_path),
+        "incremental": bool(args.incremental),
+        "hashed_count": len(files) - len(known),
+        "reused_hash_count": len(known),
+        "full_hash_count": fingerprinter.contents.full_hashes,
+        "topology_methods": methods,
+        "unique_topology_count": len(topologies),
+        "shared_topology_groups": sum(1 for g in topologies.values() if len(g["samples"]) > 1),
+        "duplicate_count": sum(len(g["duplicates"]) for g in topologies.values()),
+        "dedup_index": str(dedup_path),
     }
+    if args.incremental:
+        summary["delta"] = {
+            "added": _delta_list(added),
+            "removed": _delta_list(removed),
+            "changed": _delta_list(changed),
+        }
     summary_path = out_path.with_name("dataset_summary.json")
     with summary_path.open("w", encoding="utf-8") as f:
         json.dump(summary, f, ensure_ascii=False, indent=2)
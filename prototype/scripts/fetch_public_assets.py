@@ -2,12 +2,20 @@
 import argparse
 import datetime as dt
 import hashlib
+import http.client
 import json
 import pathlib
+import time
+import urllib.error
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 
 import yaml
 
+CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_RETRIES = 3
+RETRY_ERRORS = (urllib.error.URLError, http.client.HTTPException, ConnectionError, TimeoutError)
+
 
 def sha256_file(path: pathlib.Path) -> str:
     h = hashlib.sha256()
@@ -36,12 +44,163 @@ def save_state(path: pathlib.Path, state: dict) -> None:
         json.dump(state, f, ensure_ascii=False, indent=2)
 
 
-def download_file(url: str, target: pathlib.Path) -> None:
+def _part_meta_path(tmp: pathlib.Path) -> pathlib.Path:
+    return tmp.with_name(tmp.name + ".json")
+
+
+def _validator(headers) -> dict:
+    """The response's strong ETag and Last-Modified: what a .part has to match to be resumed."""
+    etag = headers.get("ETag", "") or ""
+    return {"etag": "" if etag.startswith("W/") else etag, "last_modified": headers.get("Last-Modified", "") or ""}
+
+
+def _same_version(saved: dict, remote: dict) -> bool:
+    if saved.get("etag") and remote.get("etag"):
+        return saved["etag"] == remote["etag"]
+    if saved.get("last_modified") and remote.get("last_modified"):
+        return saved["last_modified"] == remote["last_modified"]
+    return False
+
+
+def _load_part_meta(tmp: pathlib.Path, url: str) -> dict:
+    """Validator saved next to tmp, or {} when the .part cannot be resumed safely."""
+    try:
+        meta = json.loads(_part_meta_path(tmp).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(meta, dict) or meta.get("url") != url or not (meta.get("etag") or meta.get("last_modified")):
+        return {}
+    return meta
+
+
+def _discard_part(tmp: pathlib.Path) -> None:
+    tmp.unlink(missing_ok=True)
+    _part_meta_path(tmp).unlink(missing_ok=True)
+
+
+def _fetch_into(url: str, tmp: pathlib.Path, timeout: float) -> tuple[str, int, int]:
+    """Stream url into tmp, continuing an existing .part with a Range request when the server allows it.
+
+    A .part is only resumed while the remote ETag / Last-Modified still matches the one saved with it
+    (sent as If-Range and checked on the response); otherwise the download starts over.
+    Returns (sha256, total bytes, bytes resumed from). Raises on short reads; the .part is kept for the next try.
+    """
+    meta = _load_part_meta(tmp, url) if tmp.exists() else {}
+    if tmp.exists() and not meta:
+        _discard_part(tmp)
+    h = hashlib.sha256()
+    offset = 0
+    if tmp.exists():
+        with tmp.open("rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                h.update(chunk)
+                offset += len(chunk)
+    req = urllib.request.Request(url)
+    if offset:
+        req.add_header("Range", f"bytes={offset}-")
+        req.add_header("If-Range", meta["etag"] or meta["last_modified"])
+    try:
+        resp = urllib.request.urlopen(req, timeout=timeout)
+    except urllib.error.HTTPError as exc:
+        if exc.code != 416 or not offset:
+            raise
+        # Range not satisfiable: the .part is either complete already or stale.
+        content_range = exc.headers.get("Content-Range", "")
+        if content_range == f"bytes */{offset}" and _same_version(meta, _validator(exc.headers)):
+            return h.hexdigest(), offset, offset
+        _discard_part(tmp)
+        return _fetch_into(url, tmp, timeout)
+
+    stale = False
+    with resp:
+        remote = _validator(resp.headers)
+        content_range = resp.headers.get("Content-Range", "")
+        ranged = resp.status == 206 and content_range.startswith(f"bytes {offset}-")
+        if offset and ranged and not _same_version(meta, remote):
+            # The server ignored If-Range and sent a range of a file that has changed since.
+            stale = True
+        else:
+            if offset and not ranged:
+                # Server ignored the range (or If-Range did not match) and is sending the whole file.
+                h, offset = hashlib.sha256(), 0
+            if not offset:
+                _part_meta_path(tmp).write_text(json.dumps({"url": url, **remote}), encoding="utf-8")
+            resumed_from = offset
+            expected = resp.headers.get("Content-Length")
+            received = 0
+            with tmp.open("ab" if offset else "wb") as out:
+                for chunk in iter(lambda: resp.read(CHUNK_SIZE), b""):
+                    out.write(chunk)
+                    h.update(chunk)
+                    received += len(chunk)
+    if stale:
+        _discard_part(tmp)
+        return _fetch_into(url, tmp, timeout)
+    if expected is not None and received != int(expected):
+        raise http.client.IncompleteRead(b"", int(expected) - received)
+    return h.hexdigest(), resumed_from + received, resumed_from
+
+
+def download_file(url: str, target: pathlib.Path, timeout: float = 120, retries: int = DOWNLOAD_RETRIES) -> dict:
+    """Download url to target via target.part, hashing while streaming; returns sha256, bytes and resumed_from."""
     target.parent.mkdir(parents=True, exist_ok=True)
     tmp = target.with_suffix(target.suffix + ".part")
-    with urllib.request.urlopen(url, timeout=120) as resp, tmp.open("wb") as out:
-        out.write(resp.read())
+    for attempt in range(retries + 1):
+        try:
+            digest, size, resumed_from = _fetch_into(url, tmp, timeout)
+            break
+        except RETRY_ERRORS as exc:
+            if attempt == retries or (isinstance(exc, urllib.error.HTTPError) and exc.code < 500):
+                raise
+            time.sleep(min(2**attempt, 10))
     tmp.replace(target)
+    _part_meta_path(tmp).unlink(missing_ok=True)
+    return {"sha256": digest, "bytes": size, "resumed_from": resumed_from}
+
+
+def fetch_asset(asset: dict, data_root: pathlib.Path) -> dict:
+    asset_id = asset.get("asset_id", "unknown")
+    target_path = data_root / asset.get("target_path", "raw/public/unknown.bin")
+    url = ((asset.get("download") or {}).get("url") or "").strip()
+    checksum = (asset.get("checksum") or "").strip().lower()
+    result = {
+        "asset_id": asset_id,
+        "gated": False,
+        "target_path": str(target_path),
+        "status": "pending",
+        "message": "",
+    }
+
+    try:
+        if target_path.exists():
+            if checksum:
+                file_hash = sha256_file(target_path)
+                if file_hash != checksum:
+                    result["status"] = "checksum_mismatch"
+                    result["message"] = f"expected={checksum}, actual={file_hash}"
+                else:
+                    result["status"] = "ready"
+                    result["message"] = "already_exists"
+            else:
+                result["status"] = "ready"
+                result["message"] = "already_exists"
+        elif not url:
+            result["status"] = "manual_pending"
+            result["message"] = "missing_public_url"
+        else:
+            download = download_file(url, target_path)
+            result["bytes"] = download["bytes"]
+            result["resumed_from"] = download["resumed_from"]
+            if checksum and download["sha256"] != checksum:
+                result["status"] = "checksum_mismatch"
+                result["message"] = f"expected={checksum}, actual={download['sha256']}"
+            else:
+                result["status"] = "ready"
+                result["message"] = "downloaded"
+    except Exception as exc:
+        result["status"] = "failed"
+        result["message"] = str(exc)
+    return result
 
 
 def main() -> int:
@@ -49,6 +208,7 @@ def main() -> int:
     parser.add_argument("--manifest", default="prototype/config/assets.manifest.yaml")
     parser.add_argument("--data-root", default="D:/MLDPrototypeData")
     parser.add_argument("--state", default="prototype/state/assets_status.json")
+    parser.add_argument("--jobs", type=int, default=4, help="Concurrent downloads")
     args = parser.parse_args()
 
     manifest = load_manifest(pathlib.Path(args.manifest))
@@ -58,58 +218,14 @@ def main() -> int:
     data_root = pathlib.Path(args.data_root)
     data_root.mkdir(parents=True, exist_ok=True)
 
-    assets = manifest.get("assets", [])
-    for asset in assets:
-        asset_id = asset.get("asset_id", "unknown")
-        if asset.get("gated", False):
-            continue
-
-        target_path = data_root / asset.get("target_path", "raw/public/unknown.bin")
-        url = ((asset.get("download") or {}).get("url") or "").strip()
-        checksum = (asset.get("checksum") or "").strip().lower()
-        result = {
-            "asset_id": asset_id,
-            "gated": False,
-            "target_path": str(target_path),
-            "status": "pending",
-            "message": "",
-        }
-
-        try:
-            if target_path.exists():
-                if checksum:
-                    file_hash = sha256_file(target_path)
-                    if file_hash != checksum:
-                        result["status"] = "checksum_mismatch"
-                        result["message"] = f"expected={checksum}, actual={file_hash}"
-                    else:
-                        result["status"] = "ready"
-                        result["message"] = "already_exists"
-                else:
-                    result["status"] = "ready"
-                    result["message"] = "already_exists"
-            elif not url:
-                result["status"] = "manual_pending"
-                result["message"] = "missing_public_url"
-            else:
-                download_file(url, target_path)
-                if checksum:
-                    file_hash = sha256_file(target_path)
-                    if file_hash != checksum:
-                        result["status"] = "checksum_mismatch"
-                        result["message"] = f"expected={checksum}, actual={file_hash}"
-                    else:
-                        result["status"] = "ready"
-                        result["message"] = "downloaded"
-                else:
-                    result["status"] = "ready"
-                    result["message"] = "downloaded"
-        except Exception as exc:
-            result["status"] = "failed"
-            result["message"] = str(exc)
-
-        state["assets"][asset_id] = result
-        print(f"[{asset_id}] {result['status']} - {result['message']}")
+    assets = [a for a in manifest.get("assets", []) if not a.get("gated", False)]
+    # Downloads run concurrently; results are recorded in manifest order.
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [pool.submit(fetch_asset, asset, data_root) for asset in assets]
+        for future in futures:
+            result = future.result()
+            state["assets"][result["asset_id"]] = result
+            print(f"[{result['asset_id']}] {result['status']} - {result['message']}")
 
     save_state(state_path, state)
     print(f"State saved: {state_path}")
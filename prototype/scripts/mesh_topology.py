@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Topology fingerprints for OBJ / PLY / glTF: a hash of the face-index arrays only.
+
+Vertex positions, normals, UVs and file headers do not contribute, so re-exports and different poses
+of one mesh share a fingerprint. Indices are 0-based in every format, so an OBJ and a PLY of the same
+triangle mesh also match. Formats without a parser (FBX, Alembic, USD, BVH, ...) return None, and the
+caller falls back to the prefix hash.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import pathlib
+import struct
+import urllib.parse
+
+import numpy as np
+
+TOPOLOGY_VERSION = b"mesh-topology-v1"
+
+PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+GLTF_INDEX_TYPES = {5121: "<u1", 5123: "<u2", 5125: "<u4"}
+GLTF_TRIANGLES = 4
+
+
+def _digest(parts: list[tuple[np.ndarray, np.ndarray]]) -> str:
+    """parts: (face sizes, flat 0-based indices) per mesh part, in file order."""
+    h = hashlib.sha256(TOPOLOGY_VERSION)
+    for sizes, indices in parts:
+        h.update(struct.pack("<QQ", len(sizes), len(indices)))
+        h.update(np.ascontiguousarray(sizes, dtype="<u4").tobytes())
+        h.update(np.ascontiguousarray(indices, dtype="<i8").tobytes())
+    return h.hexdigest()
+
+
+def obj_faces(path: pathlib.Path) -> list[tuple[np.ndarray, np.ndarray]] | None:
+    vertex_count = 0
+    face_lines = []
+    # Vertices declared before each face line; negative indices count back from there.
+    seen = []
+    with path.open("rb") as f:
+        for line in f:
+            head = line[:2]
+            if head == b"v " or head == b"v\t":
+                vertex_count += 1
+            elif head == b"f " or head == b"f\t":
+                face_lines.append(line[2:])
+                seen.append(vertex_count)
+    if not face_lines:
+        return None
+    sizes = np.fromiter((len(line.split()) for line in face_lines), dtype=np.int64, count=len(face_lines))
+    # "v/vt/vn" tokens: only the position index is topology.
+    indices = np.array([t.split(b"/", 1)[0] for t in b" ".join(face_lines).split()]).astype(np.int64)
+    indices = np.where(indices < 0, indices + np.repeat(np.array(seen, dtype=np.int64), sizes), indices - 1)
+    return [(sizes, indices)]
+
+
+def _ply_header(f) -> tuple[str, list[dict], int]:
+    if f.readline().strip() != b"ply":
+        raise ValueError("not a PLY file")
+    fmt = ""
+    elements: list[dict] = []
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("PLY header has no end_header")
+        words = line.decode("ascii", errors="replace").split()
+        if not words or words[0] in ("comment", "obj_info"):
+            continue
+        if words[0] == "end_header":
+            return fmt, elements, f.tell()
+        if words[0] == "format":
+            fmt = words[1]
+        elif words[0] == "element":
+            elements.append({"name": words[1], "count": int(words[2]), "props": []})
+        elif words[0] == "property" and elements:
+            if words[1] == "list":
+                elements[-1]["props"].append(("list", PLY_TYPES[words[2]], PLY_TYPES[words[3]], words[4]))
+            else:
+                elements[-1]["props"].append(("scalar", PLY_TYPES[words[1]], None, words[2]))
+
+
+def ply_faces(path: pathlib.Path) -> list[tuple[np.ndarray, np.ndarray]] | None:
+    with path.open("rb") as f:
+        fmt, elements, data_offset = _ply_header(f)
+        face_at = next((i for i, e in enumerate(elements) if e["name"] == "face"), None)
+        if face_at is None:
+            return None
+        face = elements[face_at]
+        if len(face["props"]) != 1 or face["props"][0][0] != "list":
+            return None
+        _, count_type, index_type, _ = face["props"][0]
+        if face["count"] == 0:
+            return [(np.zeros(0, np.int64), np.zeros(0, np.int64))]
+
+        if fmt == "ascii":
+            for element in elements[:face_at]:
+                for _ in range(element["count"]):
+                    f.readline()
+            tokens = b" ".join(f.readline() for _ in range(face["count"])).split()
+            values = np.array(tokens).astype(np.int64)
+            k = int(values[0])
+            if len(values) == face["count"] * (k + 1) and (values[:: k + 1] == k).all():
+                table = values.reshape(face["count"], k + 1)
+                return [(table[:, 0], table[:, 1:].reshape(-1))]
+            counts, flat, pos = [], [], 0
+            for _ in range(face["count"]):
+                n = int(values[pos])
+                counts.append(n)
+                flat.append(values[pos + 1 : pos + 1 + n])
+                pos += n + 1
+            return [(np.array(counts), np.concatenate(flat))]
+
+        endian = {"binary_little_endian": "<", "binary_big_endian": ">"}.get(fmt)
+        if endian is None:
+            return None
+        offset = data_offset
+        for element in elements[:face_at]:
+            if any(kind != "scalar" for kind, _, _, _ in element["props"]):
+                return None
+            offset += element["count"] * sum(np.dtype(t).itemsize for _, t, _, _ in element["props"])
+        count_dtype = np.dtype(endian + count_type)
+        index_dtype = np.dtype(endian + index_type)
+        f.seek(offset)
+        k = int(np.frombuffer(f.read(count_dtype.itemsize), count_dtype)[0])
+        # Fast path: every face has k corners (all triangles or all quads) -> one structured read.
+        record = np.dtype([("n", count_dtype), ("idx", index_dtype, (k,))])
+        table = np.fromfile(path, dtype=record, count=face["count"], offset=offset)
+        if len(table) == face["count"] and (table["n"] == k).all():
+            return [(table["n"], table["idx"].reshape(-1))]
+        f.seek(offset)
+        blob = f.read()
+    counts, flat, pos = [], [], 0
+    for _ in range(face["count"]):
+        n = int(np.frombuffer(blob, count_dtype, 1, pos)[0])
+        pos += count_dtype.itemsize
+        counts.append(n)
+        flat.append(np.frombuffer(blob, index_dtype, n, pos))
+        pos += n * index_dtype.itemsize
+    return [(np.array(counts), np.concatenate(flat).astype(np.int64))]
+
+
+def _gltf_document(path: pathlib.Path) -> tuple[dict, bytes | None]:
+    data = path.read_bytes()
+    if path.suffix.lower() != ".glb":
+        doc = json.loads(data.decode("utf-8"))
+        if not isinstance(doc, dict):
+            raise ValueError("glTF root is not an object")
+        return doc, None
+    magic, _, length = struct.unpack_from("<4sII", data, 0)
+    if magic != b"glTF":
+        raise ValueError("not a GLB file")
+    pos, doc, bin_chunk = 12, None, None
+    while pos < min(length, len(data)):
+        chunk_len, chunk_type = struct.unpack_from("<II", data, pos)
+        chunk = data[pos + 8 : pos + 8 + chunk_len]
+        if chunk_type == 0x4E4F534A:
+            doc = json.loads(chunk.decode("utf-8"))
+        elif chunk_type == 0x004E4942:
+            bin_chunk = chunk
+        pos += 8 + chunk_len
+    if not isinstance(doc, dict):
+        raise ValueError("GLB has no JSON object chunk")
+    return doc, bin_chunk
+
+
+def gltf_faces(path: pathlib.Path) -> list[tuple[np.ndarray, np.ndarray]] | None:
+    doc, bin_chunk = _gltf_document(path)
+    buffers: dict[int, bytes] = {}
+
+    def buffer(index: int) -> bytes:
+        if index not in buffers:
+            uri = doc["buffers"][index].get("uri")
+            if uri is None:
+                buffers[index] = bin_chunk or b""
+            elif uri.startswith("data:"):
+                buffers[index] = base64.b64decode(uri.split(",", 1)[1])
+            else:
+                buffers[index] = (path.parent / urllib.parse.unquote(uri)).read_bytes()
+        return buffers[index]
+
+    parts = []
+    for mesh in doc.get("meshes", []):
+        for prim in mesh.get("primitives", []):
+            mode = int(prim.get("mode", GLTF_TRIANGLES))
+            if "indices" in prim:
+                accessor = doc["accessors"][prim["indices"]]
+                view = doc["bufferViews"][accessor["bufferView"]]
+                indices = np.frombuffer(
+                    buffer(view["buffer"]),
+                    dtype=GLTF_INDEX_TYPES[accessor["componentType"]],
+                    count=accessor["count"],
+                    offset=view.get("byteOffset", 0) + accessor.get("byteOffset", 0),
+                ).astype(np.int64)
+            else:
+                indices = np.arange(doc["accessors"][prim["attributes"]["POSITION"]]["count"], dtype=np.int64)
+            if mode == GLTF_TRIANGLES:
+                sizes = np.full(len(indices) // 3, 3, dtype=np.int64)
+            else:
+                # Strips/fans/lines/points: keep the mode in the hash instead of expanding faces.
+                sizes = np.array([1000 + mode], dtype=np.int64)
+            parts.append((sizes, indices))
+    return parts or None
+
+
+PARSERS = {".obj": obj_faces, ".ply": ply_faces, ".gltf": gltf_faces, ".glb": gltf_faces}
+
+
+def topology_fingerprint(path: pathlib.Path) -> str | None:
+    """Face-index hash for supported formats, or None (unsupported, no faces, unreadable or malformed)."""
+    parser = PARSERS.get(path.suffix.lower())
+    if parser is None:
+        return None
+    try:
+        parts = parser(path)
+    except Exception:
+        # Malformed files fall back to the prefix hash; they must never stop a dataset build.
+        return None
+    return _digest(parts) if parts else None
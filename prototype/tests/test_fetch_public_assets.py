@@ -0,0 +1,204 @@
+"""fetch_public_assets download engine against a local http.server stand-in."""
+import functools
+import hashlib
+import http.server
+import json
+import os
+import pathlib
+import re
+import sys
+import threading
+import urllib.error
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "scripts"))
+
+import fetch_public_assets as fpa  # noqa: E402
+
+
+class Remote:
+    """The file the server currently serves, plus switches for misbehaving servers."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.version = 1
+        self.honour_if_range = True
+        self.drop_after = 0
+        self.requests = []
+
+    def replace(self, data: bytes) -> None:
+        self.data = data
+        self.version += 1
+
+    @property
+    def etag(self) -> str:
+        return f'"v{self.version}"'
+
+
+def _handler(remote: Remote):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            remote.requests.append((self.headers.get("Range"), self.headers.get("If-Range")))
+            if self.path != "/asset.bin":
+                self.send_error(404)
+                return
+            data = remote.data
+            match = re.match(r"bytes=(\d+)-$", self.headers.get("Range") or "")
+            if_range = self.headers.get("If-Range")
+            if match and remote.honour_if_range and if_range is not None and if_range != remote.etag:
+                match = None
+            start = int(match.group(1)) if match else 0
+            if match and start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("ETag", remote.etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206 if match else 200)
+            if match:
+                self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+            self.send_header("ETag", remote.etag)
+            self.send_header("Content-Length", str(len(data) - start))
+            self.end_headers()
+            body = data[start:]
+            if remote.drop_after:
+                body = body[: remote.drop_after]
+                remote.drop_after = 0
+                self.wfile.write(body)
+                self.wfile.flush()
+                self.close_connection = True
+                return
+            self.wfile.write(body)
+
+    return Handler
+
+
+def _serve(handler):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def remote():
+    remote = Remote(os.urandom(3 * fpa.CHUNK_SIZE + 123))
+    server = _serve(_handler(remote))
+    remote.url = f"http://127.0.0.1:{server.server_port}/asset.bin"
+    yield remote
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(fpa.time, "sleep", lambda _: None)
+
+
+def _part(target: pathlib.Path) -> pathlib.Path:
+    return target.with_suffix(target.suffix + ".part")
+
+
+def _interrupt(remote: Remote, target: pathlib.Path, keep: int) -> None:
+    """Leave a .part (with its validator) of `keep` bytes behind, as a killed download would."""
+    remote.drop_after = keep
+    with pytest.raises(Exception):
+        fpa.download_file(remote.url, target, retries=0)
+    assert _part(target).stat().st_size == keep
+
+
+def test_full_download_streams_and_hashes(remote, tmp_path):
+    target = tmp_path / "out" / "asset.bin"
+    result = fpa.download_file(remote.url, target)
+    assert result == {"sha256": hashlib.sha256(remote.data).hexdigest(), "bytes": len(remote.data), "resumed_from": 0}
+    assert target.read_bytes() == remote.data
+    assert sorted(p.name for p in target.parent.iterdir()) == ["asset.bin"]
+
+
+def test_resume_sends_range_and_if_range(remote, tmp_path):
+    target = tmp_path / "asset.bin"
+    _interrupt(remote, target, 777_777)
+    result = fpa.download_file(remote.url, target)
+    assert result["resumed_from"] == 777_777
+    assert remote.requests[-1] == ("bytes=777777-", remote.etag)
+    assert target.read_bytes() == remote.data
+
+
+def test_dropped_connection_is_retried_from_the_part(remote, tmp_path):
+    target = tmp_path / "asset.bin"
+    remote.drop_after = 1_000_000
+    result = fpa.download_file(remote.url, target)
+    assert result["resumed_from"] == 1_000_000
+    assert target.read_bytes() == remote.data
+
+
+@pytest.mark.parametrize("honour_if_range", [True, False])
+def test_changed_remote_restarts_instead_of_stitching(remote, tmp_path, honour_if_range):
+    target = tmp_path / "asset.bin"
+    _interrupt(remote, target, 500_000)
+    remote.replace(os.urandom(len(remote.data)))
+    remote.honour_if_range = honour_if_range
+    result = fpa.download_file(remote.url, target)
+    assert result["resumed_from"] == 0
+    assert result["sha256"] == hashlib.sha256(remote.data).hexdigest()
+    assert target.read_bytes() == remote.data
+
+
+def test_part_without_validator_is_discarded(remote, tmp_path):
+    target = tmp_path / "asset.bin"
+    _part(target).write_bytes(b"left over by an older version")
+    result = fpa.download_file(remote.url, target)
+    assert result["resumed_from"] == 0
+    assert remote.requests[-1] == (None, None)
+    assert target.read_bytes() == remote.data
+
+
+def test_complete_part_is_accepted_on_416(remote, tmp_path):
+    target = tmp_path / "asset.bin"
+    fpa.download_file(remote.url, target)
+    part = _part(target)
+    target.replace(part)
+    fpa._part_meta_path(part).write_text(json.dumps({"url": remote.url, "etag": remote.etag, "last_modified": ""}))
+    result = fpa.download_file(remote.url, target)
+    assert result["resumed_from"] == len(remote.data)
+    assert target.read_bytes() == remote.data
+
+
+def test_plain_http_server_without_range_support(tmp_path):
+    served = tmp_path / "srv"
+    served.mkdir()
+    data = os.urandom(fpa.CHUNK_SIZE + 5)
+    (served / "asset.bin").write_bytes(data)
+    server = _serve(functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(served)))
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/asset.bin"
+        target = tmp_path / "asset.bin"
+        assert fpa.download_file(url, target)["sha256"] == hashlib.sha256(data).hexdigest()
+        # The stock server ignores Range, so a resumable .part is replaced by the full body.
+        target.unlink()
+        _part(target).write_bytes(data[:100])
+        fpa._part_meta_path(_part(target)).write_text(json.dumps({"url": url, "etag": "", "last_modified": "x"}))
+        result = fpa.download_file(url, target)
+        assert (result["resumed_from"], result["bytes"]) == (0, len(data))
+        assert target.read_bytes() == data
+
+        with pytest.raises(urllib.error.HTTPError) as err:
+            fpa.download_file(f"http://127.0.0.1:{server.server_port}/missing.bin", tmp_path / "missing.bin")
+        assert err.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_fetch_asset_reports_checksum(remote, tmp_path):
+    asset = {"asset_id": "a", "target_path": "raw/a.bin", "download": {"url": remote.url}, "checksum": "00"}
+    result = fpa.fetch_asset(asset, tmp_path)
+    assert result["status"] == "checksum_mismatch"
+    assert result["bytes"] == len(remote.data)
+    asset["checksum"] = hashlib.sha256(remote.data).hexdigest()
+    (tmp_path / "raw" / "a.bin").unlink()
+    assert fpa.fetch_asset(asset, tmp_path)["status"] == "ready"